@@ -0,0 +1,35 @@
+"""Synthetic article generators shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+
+from src.models import Article
+
+_WORDS = [
+    "台積電", "TSMC", "製程", "降息", "Fed", "聯準會", "關稅", "tariff", "AI 伺服器",
+    "NVIDIA", "輝達", "半導體", "CoWoS", "HBM", "台股", "聯發科", "營收", "市場",
+    "投資人", "報價", "供應鏈", "earnings", "guidance", "shares", "rally", "outlook",
+]
+
+
+def iter_articles(n: int, seed: int = 42, dup_ratio: float = 0.1) -> Iterator[Article]:
+    """Yield ``n`` pseudo-random articles, a fraction of them duplicate links."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    for i in range(n):
+        if i and rng.random() < dup_ratio:
+            link_id = rng.randrange(i)
+        else:
+            link_id = i
+        title = " ".join(rng.choices(_WORDS, k=8))
+        summary = " ".join(rng.choices(_WORDS, k=60))
+        yield Article(
+            title=f"{title} #{i}",
+            link=f"https://news.example.com/a/{link_id}?utm_source=rss",
+            source=f"source-{i % 200}",
+            summary=summary,
+            published=now - timedelta(hours=rng.randrange(72)),
+        )
@@ -0,0 +1,56 @@
+"""Shared-prefix context caching against the fake Gemini server.
+
+Simulates chunked video summaries: every call shares a long summary prompt
+as its system instruction and sends one transcript chunk.
+
+Usage:
+    python -m benchmarks.bench_cache [N]
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+from benchmarks.fake_gemini import ModelProfile, serve
+from src.llm import ModelRouter
+
+_MODEL = "gemini-2.5-flash"
+_INSTRUCTIONS = "請依下列規則整理影片重點，標註股票代號與關鍵數據，使用繁體中文與 markdown。\n" * 120
+_CHUNK = "逐字稿內容 " * 400
+
+
+def _run(label: str, router: ModelRouter, n: int) -> None:
+    t0 = time.perf_counter()
+    for i in range(n):
+        router.generate(
+            "video_summary", _MODEL, f"第 {i} 段\n{_CHUNK}",
+            temperature=0.3, max_output_tokens=512, system_instruction=_INSTRUCTIONS,
+        )
+    elapsed = time.perf_counter() - t0
+    router.release_caches()
+    prompt = sum(r.prompt_tokens for r in router.records)
+    cached = sum(r.cached_tokens for r in router.records)
+    status = Counter(r.cache for r in router.records)
+    print(
+        f"  {label:<10} {elapsed:6.2f}s  {elapsed / n * 1000:6.1f} ms/call  "
+        f"input={prompt} tokens  uncached={prompt - cached}  {dict(status)}"
+    )
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    logging.basicConfig(level=logging.ERROR)
+    os.environ.setdefault("GEMINI_API_KEY", "fake")
+    os.environ.pop("GOOGLE_API_KEY", None)
+    _, url = serve(profiles={_MODEL: ModelProfile(median=0.05, sigma=0.0, per_token=50e-6)})
+    print(f"{n} calls, {len(_INSTRUCTIONS)}-char shared instructions, {len(_CHUNK)}-char chunks")
+    _run("inline", ModelRouter(base_url=url), n)
+    _run("cached", ModelRouter(base_url=url, cache=True), n)
+
+
+if __name__ == "__main__":
+    main()
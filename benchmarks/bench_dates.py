@@ -0,0 +1,55 @@
+"""Date parsing: dateutil for every item vs src.dates fast paths.
+
+Usage:
+    python -m benchmarks.bench_dates [N]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from dateutil import parser as dateparser
+
+from src.dates import parse_datetime
+
+
+def _timestamps(n: int, distinct: int) -> list[str]:
+    """Mix of ISO-8601 (NewsAPI/YouTube) and RFC-822 (RSS), with repeats."""
+    rng = random.Random(1)
+    base = datetime(2026, 10, 19, tzinfo=timezone.utc)
+    pool = []
+    for i in range(distinct):
+        dt = base - timedelta(seconds=rng.randrange(3 * 86400))
+        if i % 2:
+            pool.append(dt.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        else:
+            pool.append(format_datetime(dt.astimezone(timezone(timedelta(hours=8)))))
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def _run(label: str, fn, data: list[str]) -> float:
+    t0 = time.perf_counter()
+    for s in data:
+        fn(s)
+    elapsed = time.perf_counter() - t0
+    print(f"  {label:<28} {elapsed:7.3f}s  ({elapsed / len(data) * 1e6:6.2f} µs/item)")
+    return elapsed
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for distinct in (n, 2_000):
+        data = _timestamps(n, distinct)
+        print(f"{n} timestamps, {distinct} distinct")
+        slow = _run("dateutil.parser.parse", dateparser.parse, data)
+        parse_datetime.cache_clear()
+        fast = _run("parse_datetime", parse_datetime, data)
+        print(f"  speedup: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""News fetch layer at scale against the fake source server.
+
+Runs the same ``merge_streams`` fan-out as ``main`` over hundreds of
+synthetic RSS feeds plus HTML, Anue and NewsAPI sources, twice: once with
+clean sources and once with errors and slow responses injected. Reports
+wall time, per-fetcher time to last article, articles/s and what the
+server saw (requests, 304s, errors, bytes).
+
+Usage:
+    python -m benchmarks.bench_fetch [RSS_FEEDS] [SCRAPE_TARGETS]
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import time
+from collections import Counter
+
+from benchmarks.fake_sources import ServerConfig, SourceProfile, serve, source_config
+from src.fetchers import merge_streams
+from src.fetchers.newsapi_fetcher import iter_newsapi_articles
+from src.fetchers.rss_fetcher import iter_rss_feeds
+from src.fetchers.web_scraper import iter_news_sites
+
+
+def _timed(name: str, fn, last: dict):
+    def run():
+        for art in fn():
+            last[name] = time.perf_counter()
+            yield art
+    return run
+
+
+def _run(label: str, cfg: ServerConfig, rss: int, scrape: int) -> None:
+    server, url, stats = serve(cfg=cfg)
+    sources = source_config(url, rss=rss, html=scrape // 2, anue=scrape - scrape // 2)
+    last: dict[str, float] = {}
+    t0 = time.perf_counter()
+    articles = list(merge_streams({
+        "RSS": _timed("RSS", lambda: iter_rss_feeds(sources["rss_feeds"]), last),
+        "Scraper": _timed("Scraper", lambda: iter_news_sites(sources["scrape_targets"]), last),
+        "NewsAPI": _timed("NewsAPI", lambda: iter_newsapi_articles(sources["newsapi"], "fake"), last),
+    }))
+    elapsed = time.perf_counter() - t0
+    server.shutdown()
+
+    per_source = Counter(a.source for a in articles)
+    print(
+        f"  {label:<8} {elapsed:6.2f}s  {len(articles)} articles from {len(per_source)} sources  "
+        f"{len(articles) / elapsed:7.0f} art/s"
+    )
+    print("           last article: " + "  ".join(f"{k}={v - t0:.2f}s" for k, v in sorted(last.items())))
+    print(
+        f"           server: rss={stats.get('rss', 0)} html={stats.get('html', 0)} anue={stats.get('anue', 0)} "
+        f"newsapi={stats.get('newsapi', 0)} 304={stats.get('not_modified', 0)} "
+        f"errors={stats.get('errors', 0)} {stats.get('bytes', 0) / 2**20:.1f} MiB"
+    )
+
+
+def main() -> None:
+    rss = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    scrape = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    logging.basicConfig(level=logging.CRITICAL)
+    print(f"{rss} RSS feeds, {scrape} scrape targets, 1 NewsAPI query")
+
+    clean = SourceProfile(latency=0.05, sigma=0.5, padding_kb=20)
+    _run("clean", ServerConfig({k: clean for k in ("rss", "html", "anue", "newsapi")}), rss, scrape)
+
+    flaky = SourceProfile(latency=0.05, sigma=1.0, padding_kb=20, error_rate=0.05, stall_rate=0.01, stall_seconds=5)
+    _run("flaky", ServerConfig({k: flaky for k in ("rss", "html", "anue", "newsapi")}), rss, scrape)
+
+
+if __name__ == "__main__":
+    main()
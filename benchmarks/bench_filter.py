@@ -0,0 +1,36 @@
+"""Peak-memory benchmark for filter_and_rank: materialized list vs stream.
+
+Usage:
+    python -m benchmarks.bench_filter [N]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+
+from benchmarks._synthetic import iter_articles
+from src import config
+from src.filter import filter_and_rank
+
+
+def _measure(label: str, make_input) -> None:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    results = filter_and_rank(make_input(), config.KEYWORDS, config.MIN_SCORE, config.MAX_ARTICLES)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} kept={len(results):>4}  time={elapsed:6.2f}s  peak={peak / 2**20:8.1f} MiB")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"filter_and_rank over {n} articles (max_articles={config.MAX_ARTICLES})")
+    _measure("list", lambda: list(iter_articles(n)))
+    _measure("stream", lambda: iter_articles(n))
+
+
+if __name__ == "__main__":
+    main()
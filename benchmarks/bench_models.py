@@ -0,0 +1,80 @@
+"""Memory benchmark for the article models at ingest scale.
+
+Compares the previous ``__dict__`` dataclasses (FilteredArticle copying
+every Article field) with the slotted models (FilteredArticle wrapping
+the Article).
+
+Usage:
+    python -m benchmarks.bench_models [N]
+"""
+
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from benchmarks._synthetic import iter_articles
+from src.models import Article, FilteredArticle
+
+
+@dataclass
+class _DictArticle:
+    title: str
+    link: str
+    source: str
+    summary: str = ""
+    published: datetime | None = None
+
+
+@dataclass
+class _DictFilteredArticle:
+    title: str
+    link: str
+    source: str
+    summary: str = ""
+    published: datetime | None = None
+    score: float = 0.0
+    matched_keywords: list[str] = field(default_factory=list)
+
+
+def _traced(fn) -> tuple[object, int]:
+    tracemalloc.start()
+    result = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source = list(iter_articles(n))  # shared string payloads, not measured
+
+    dict_arts, dict_bytes = _traced(lambda: [
+        _DictArticle(a.title, a.link, a.source, a.summary, a.published) for a in source
+    ])
+    slot_arts, slot_bytes = _traced(lambda: [
+        Article(a.title, a.link, a.source, a.summary, a.published) for a in source
+    ])
+
+    # Promotion: the old path re-allocated every field into a new object
+    _, dict_promo = _traced(lambda: [
+        _DictFilteredArticle(
+            title=a.title, link=a.link, source=a.source, summary=a.summary,
+            published=a.published, score=1.0, matched_keywords=["TSMC"],
+        )
+        for a in dict_arts
+    ])
+    _, slot_promo = _traced(lambda: [
+        FilteredArticle(article=a, score=1.0, matched_keywords=("TSMC",)) for a in slot_arts
+    ])
+
+    print(f"{n} articles (object overhead only, strings shared)")
+    print(f"  Article          dict: {dict_bytes / 2**20:7.1f} MiB   slots: {slot_bytes / 2**20:7.1f} MiB")
+    print(f"  FilteredArticle  copy: {dict_promo / 2**20:7.1f} MiB   wrap:  {slot_promo / 2**20:7.1f} MiB")
+    print(f"  per article      dict: {(dict_bytes + dict_promo) / n:7.0f} B     slots: {(slot_bytes + slot_promo) / n:7.0f} B")
+
+
+if __name__ == "__main__":
+    main()
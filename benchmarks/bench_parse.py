@@ -0,0 +1,86 @@
+"""CPU stage scaling: feed/page parsing and keyword scoring on 1..N worker processes.
+
+Builds a fixture set of RSS payloads and listing pages (same renderers as
+the fake source server), then times parse + normalize of all payloads and
+keyword scoring of the parsed articles, inline and with the ``cpu_pool``
+at 1, 2, 4, ... workers up to the available cores.
+
+Usage:
+    python -m benchmarks.bench_parse [FEEDS] [MAX_WORKERS]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from benchmarks._synthetic import _WORDS
+from benchmarks.fake_sources import SourceProfile, _items, _render
+from src import config, cpu_pool
+from src.fetchers.rss_fetcher import parse_feed
+from src.fetchers.web_scraper import parse_listing
+from src.filter import KeywordScorer
+from src.models import Article
+
+_BASE = "http://fixtures.local"
+
+
+def _fixtures(n_feeds: int) -> tuple[list[bytes], list[bytes]]:
+    profile = SourceProfile(items=100, summary_chars=600)
+    feeds = [_render("rss", str(i), _items("rss", str(i), profile, 0), _BASE, profile)[1] for i in range(n_feeds)]
+    pages = [
+        _render("html", str(i), _items("html", str(i), profile, 0), _BASE, profile)[1]
+        for i in range(n_feeds // 10)
+    ]
+    return feeds, pages
+
+
+def _profiles() -> list[dict]:
+    # A realistic keyword list plus every fixture word, so matching does real work
+    keywords = {**config.KEYWORDS, **{w: 1 for w in _WORDS}}
+    keywords.update({f"{a}{b}": 2 for a in _WORDS[:12] for b in _WORDS[12:]})
+    return [{"name": "bench", "keywords": keywords, "min_score": 5, "max_articles": 50}]
+
+
+def _run(label: str, feeds: list[bytes], pages: list[bytes], scorer: KeywordScorer) -> float:
+    t0 = time.perf_counter()
+    feed_futures = [cpu_pool.submit(parse_feed, f, f"{_BASE}/rss.xml", "application/rss+xml") for f in feeds]
+    page_futures = [cpu_pool.submit(parse_listing, p, f"{_BASE}/list", ".title a", ".title a") for p in pages]
+    articles = [
+        Article(title, link, "bench", summary, published)
+        for fut in feed_futures for title, link, summary, published in fut.result()
+    ]
+    articles += [Article(title, link, "bench") for fut in page_futures for title, link in fut.result()]
+    parsed = time.perf_counter() - t0
+
+    for i in range(0, len(articles), 2048):
+        scorer.score(articles[i:i + 2048])
+    total = time.perf_counter() - t0
+    print(f"  {label:<10} parse {parsed:6.2f}s  score {total - parsed:6.2f}s  total {total:6.2f}s  ({len(articles)} articles)")
+    return total
+
+
+def main() -> None:
+    n_feeds = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else cpu_pool.available_cores()
+    feeds, pages = _fixtures(n_feeds)
+    scorer = KeywordScorer(_profiles())
+    size = sum(map(len, feeds)) + sum(map(len, pages))
+    print(f"{len(feeds)} feeds + {len(pages)} pages ({size / 2**20:.1f} MiB), "
+          f"{len(scorer._lowered)} keywords, {cpu_pool.available_cores()} cores available")
+
+    baseline = _run("inline", feeds, pages, scorer)
+    workers = 1
+    while workers <= max_workers:
+        cpu_pool.enable(workers)
+        # Warm up: start the processes and import the parsers outside the timing
+        for fut in [cpu_pool.submit(parse_feed, feeds[0], _BASE, "") for _ in range(workers)]:
+            fut.result()
+        elapsed = _run(f"{workers} proc", feeds, pages, scorer)
+        cpu_pool.shutdown()
+        print(f"             speedup vs inline: {baseline / elapsed:.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Cost of scoring additional digest profiles over one article stream.
+
+Usage:
+    python -m benchmarks.bench_profiles [N]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from benchmarks._synthetic import iter_articles
+from src import config
+from src.filter import rank_profiles
+
+
+def _profiles(count: int) -> list[dict]:
+    rng = random.Random(7)
+    keywords = list(config.KEYWORDS)
+    return [
+        {
+            "name": f"p{i}",
+            "keywords": {kw: rng.randint(1, 10) for kw in rng.sample(keywords, k=len(keywords) // 2)},
+            "min_score": config.MIN_SCORE,
+            "max_articles": config.MAX_ARTICLES,
+        }
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    articles = list(iter_articles(n))
+    print(f"rank_profiles over {n} articles")
+    for count in (1, 3, 10, 30):
+        t0 = time.perf_counter()
+        rank_profiles(articles, _profiles(count))
+        print(f"  {count:>3} profiles: {time.perf_counter() - t0:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
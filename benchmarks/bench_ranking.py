@@ -0,0 +1,47 @@
+"""BM25 engine at archive scale: incremental fit and batch scoring.
+
+Usage:
+    python -m benchmarks.bench_ranking [N]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from itertools import islice
+
+from benchmarks._synthetic import iter_articles
+from src import config
+from src.filter import KeywordScorer
+from src.ranking import Bm25Index, Bm25Scorer, _doc_tokens
+
+
+def _batches(articles, size=2048):
+    it = iter(articles)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    articles = list(iter_articles(n, seed=3))
+    print(f"{n} documents")
+
+    index = Bm25Index()
+    t0 = time.perf_counter()
+    for batch in _batches(articles, 5000):
+        index.partial_fit(_doc_tokens(a) for a in batch)
+    print(f"  fit:              {time.perf_counter() - t0:6.2f}s  ({len(index.vocab)} terms)")
+
+    for label, scorer in (
+        ("score bm25", Bm25Scorer(index, config.PROFILES, default_min_score=5.0)),
+        ("score keyword", KeywordScorer(config.PROFILES)),
+    ):
+        t0 = time.perf_counter()
+        for batch in _batches(articles):
+            scorer.score(batch)
+        print(f"  {label + ':':<17} {time.perf_counter() - t0:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Model router against the fake Gemini server: plain vs fallback vs hedged.
+
+Usage:
+    python -m benchmarks.bench_router [N]
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_gemini import serve
+from src.llm import ModelRouter
+
+_PRIMARY = "gemini-2.5-flash"
+_FALLBACK = "gemini-2.5-flash-lite"
+
+
+def _run(label: str, router: ModelRouter, n: int) -> None:
+    def one(i: int) -> float:
+        t0 = time.perf_counter()
+        try:
+            router.generate("bench", _PRIMARY, f"prompt {i}", temperature=0.3, max_output_tokens=256)
+        except Exception:
+            return float("nan")
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(8) as pool:
+        latencies = list(pool.map(one, range(n)))
+    ok = sorted(x for x in latencies if x == x)
+    q = statistics.quantiles(ok, n=100)
+    models = Counter(r.model for r in router.records if r.ok)
+    hedged = sum(r.hedged for r in router.records)
+    print(
+        f"  {label:<18} ok={len(ok)}/{n}  p50={q[49]:.2f}s  p95={q[94]:.2f}s  p99={q[98]:.2f}s"
+        f"  max={ok[-1]:.2f}s  hedged={hedged}  {dict(models)}"
+    )
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    logging.basicConfig(level=logging.ERROR)
+    os.environ.setdefault("GEMINI_API_KEY", "fake")
+    os.environ.pop("GOOGLE_API_KEY", None)
+    _, url = serve(seed=1)
+    print(f"{n} calls, 8 concurrent, primary={_PRIMARY}")
+
+    _run("single model", ModelRouter(deadline=30, base_url=url), n)
+    _run("fallback", ModelRouter([_FALLBACK], deadline=1.5, base_url=url), n)
+    _run("fallback + hedge", ModelRouter(
+        [_FALLBACK], deadline=1.5, hedge=True, hedge_after=0.6, hedge_min_samples=20, base_url=url,
+    ), n)
+
+
+if __name__ == "__main__":
+    main()
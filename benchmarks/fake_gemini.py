@@ -0,0 +1,167 @@
+"""Local stand-in for the Gemini REST API, for exercising src.llm offline.
+
+Each model gets a log-normal latency (median, sigma), a per-prompt-token
+cost and a failure rate, so slow tails, errors and fallbacks can be
+reproduced without the real API. Explicit context caches are supported:
+cached tokens are reported in usage metadata and cost a quarter as much time.
+
+Usage:
+    python -m benchmarks.fake_gemini [--port 8765]
+
+Then point the pipeline at it with ``llm.base_url: http://127.0.0.1:8765``
+in config.yaml and any non-empty ``GEMINI_API_KEY``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass(slots=True)
+class ModelProfile:
+    median: float = 0.2
+    sigma: float = 0.5
+    fail_rate: float = 0.0
+    per_token: float = 20e-6
+
+
+DEFAULT_PROFILES = {
+    "gemini-2.5-pro": ModelProfile(median=0.8, sigma=0.9, fail_rate=0.05),
+    "gemini-2.5-flash": ModelProfile(median=0.3, sigma=0.8, fail_rate=0.02),
+    "gemini-2.5-flash-lite": ModelProfile(median=0.1, sigma=0.3, fail_rate=0.0),
+}
+
+_PATH_RE = re.compile(r"/models/([^/:]+):(generateContent|countTokens)$")
+_CACHE_RE = re.compile(r"/(cachedContents/[^/?]+)$")
+
+
+def _text(contents: list[dict]) -> str:
+    return "".join(p.get("text", "") for c in contents for p in c.get("parts", []))
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 3
+
+
+def _handler(profiles: dict[str, ModelProfile], seed: int):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    caches: dict[str, int] = {}  # name -> cached token count
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client gave up (deadline or losing hedge)
+
+        def _not_found(self) -> None:
+            self._reply(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+
+        def do_DELETE(self):
+            m = _CACHE_RE.search(self.path.split("?")[0])
+            with lock:
+                found = m is not None and caches.pop(m.group(1), None) is not None
+            self._reply(200, {}) if found else self._not_found()
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            path = self.path.split("?")[0]
+            if path.endswith("/cachedContents"):
+                tokens = _tokens(_text([request.get("systemInstruction", {})] + request.get("contents", [])))
+                with lock:
+                    name = f"cachedContents/fake-{len(caches) + 1}"
+                    caches[name] = tokens
+                self._reply(200, {"name": name, "model": request.get("model", ""),
+                                  "usageMetadata": {"totalTokenCount": tokens}})
+                return
+
+            m = _PATH_RE.search(path)
+            if not m:
+                self._not_found()
+                return
+            model, method = m.groups()
+            text = _text(request.get("contents", []))
+            if method == "countTokens":
+                self._reply(200, {"totalTokens": max(1, _tokens(text))})
+                return
+
+            cached = 0
+            if request.get("cachedContent"):
+                with lock:
+                    cached = caches.get(request["cachedContent"], -1)
+                if cached < 0:
+                    self._reply(403, {"error": {"code": 403, "message": "cache not found", "status": "PERMISSION_DENIED"}})
+                    return
+            prompt_tokens = _tokens(text + _text([request.get("systemInstruction", {})])) + cached
+
+            profile = profiles.get(model, ModelProfile())
+            with lock:
+                delay = profile.median * math.exp(rng.gauss(0, profile.sigma))
+                fail = rng.random() < profile.fail_rate
+            time.sleep(delay + profile.per_token * (prompt_tokens - cached * 0.75))
+            if fail:
+                self._reply(503, {"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}})
+                return
+            self._reply(200, {
+                "candidates": [{
+                    "content": {"role": "model", "parts": [{"text": f"## {model}\n- {prompt_tokens} tokens in"}]},
+                    "finishReason": "STOP",
+                }],
+                "usageMetadata": {
+                    "promptTokenCount": prompt_tokens,
+                    "cachedContentTokenCount": cached,
+                    "candidatesTokenCount": 12,
+                    "totalTokenCount": prompt_tokens + 12,
+                },
+                "modelVersion": model,
+            })
+
+    return Handler
+
+
+def serve(
+    port: int = 0,
+    profiles: dict[str, ModelProfile] | None = None,
+    seed: int = 0,
+) -> tuple[ThreadingHTTPServer, str]:
+    """Start the fake server in a daemon thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(profiles or DEFAULT_PROFILES, seed))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server, url = serve(args.port, seed=args.seed)
+    print(f"Fake Gemini listening on {url}")
+    for name, p in DEFAULT_PROFILES.items():
+        print(f"  {name:<24} median={p.median}s sigma={p.sigma} fail={p.fail_rate:.0%}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Local stand-in for the news sources, for load and scale testing the fetchers.
+
+Serves any number of synthetic sources of each kind the fetchers support:
+
+    /rss/<id>.xml              RSS 2.0 feed (rss_feeds)
+    /html/<id>                 CTEE-style listing page (scrape_targets, ".title a")
+    /anue/<id>                 Anue JSON news list (scrape_targets, use_api)
+    /newsapi/v2/everything     NewsAPI "everything" endpoint (newsapi.base_url)
+
+Each kind has a profile with item count, payload size, log-normal latency,
+error and stall rates, and how often its content changes. Responses carry
+ETag / Last-Modified and answer conditional requests with 304 until the
+content changes.
+
+Usage:
+    python -m benchmarks.fake_sources [--port 8766] [--sources 200]
+
+prints a config.yaml snippet pointing ``rss_feeds``, ``scrape_targets`` and
+``newsapi`` at the server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks._synthetic import _WORDS
+
+
+@dataclass(slots=True)
+class SourceProfile:
+    items: int = 30
+    new_items: int = 10            # items added each time the content changes
+    change_seconds: float = 600.0  # 0: content changes on every request
+    summary_chars: int = 200
+    padding_kb: int = 0            # extra bytes per response (HTML boilerplate, ads)
+    latency: float = 0.05          # median seconds
+    sigma: float = 0.5
+    error_rate: float = 0.0        # fraction answered with 503
+    stall_rate: float = 0.0        # fraction that hang for stall_seconds first
+    stall_seconds: float = 30.0
+
+
+@dataclass
+class ServerConfig:
+    profiles: dict[str, SourceProfile] = field(default_factory=lambda: {
+        kind: SourceProfile() for kind in ("rss", "html", "anue", "newsapi")
+    })
+    seed: int = 0
+
+
+_ROUTE_RE = re.compile(r"^/(rss|html|anue)/([\w-]+?)(?:\.xml)?$")
+
+
+def _epoch(profile: SourceProfile, counter: int) -> int:
+    if profile.change_seconds <= 0:
+        return counter
+    return int(time.time() // profile.change_seconds)
+
+
+def _items(kind: str, sid: str, profile: SourceProfile, epoch: int) -> list[dict]:
+    """Newest-first items for one source at one content version."""
+    rng = random.Random(f"{kind}/{sid}/{epoch}")
+    top = epoch * profile.new_items + profile.items
+    now = time.time()
+    out = []
+    for k in range(top, top - profile.items, -1):
+        words = random.Random(f"{kind}/{sid}/{k}")
+        title = " ".join(words.choices(_WORDS, k=8))
+        summary = " ".join(words.choices(_WORDS, k=max(1, profile.summary_chars // 4)))[: profile.summary_chars]
+        out.append({
+            "id": f"{sid}-{k}",
+            "title": f"{title} ({sid}#{k})",
+            "summary": summary,
+            "published": now - (top - k) * 300 - rng.random() * 60,
+        })
+    return out
+
+
+def _render(kind: str, sid: str, items: list[dict], base: str, profile: SourceProfile) -> tuple[str, bytes]:
+    pad = "x" * (profile.padding_kb * 1024)
+    if kind == "rss":
+        body = "".join(
+            f"<item><title>{escape(it['title'])}</title>"
+            f"<link>{base}/article/{it['id']}</link><guid>{it['id']}</guid>"
+            f"<description>{escape('<p>' + it['summary'] + '</p>')}</description>"
+            f"<pubDate>{format_datetime(datetime.fromtimestamp(it['published'], timezone.utc))}</pubDate></item>"
+            for it in items
+        )
+        doc = (
+            f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Fake feed {sid}</title><link>{base}/</link><description>{pad}</description>"
+            f"{body}</channel></rss>"
+        )
+        return "application/rss+xml; charset=utf-8", doc.encode()
+    if kind == "html":
+        rows = "".join(
+            f'<li><div class="title"><a href="/article/{it["id"]}">{escape(it["title"])}</a></div>'
+            f'<p class="desc">{escape(it["summary"])}</p></li>'
+            for it in items
+        )
+        doc = (
+            f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>即時新聞 {sid}</title></head>'
+            f'<body><nav>menu</nav><ul class="list">{rows}</ul><div class="ad">{pad}</div></body></html>'
+        )
+        return "text/html; charset=utf-8", doc.encode()
+    if kind == "anue":
+        data = [
+            {"newsId": it["id"], "title": it["title"], "summary": it["summary"], "publishAt": int(it["published"])}
+            for it in items
+        ]
+        return "application/json", json.dumps({"items": {"data": data}, "padding": pad}, ensure_ascii=False).encode()
+    articles = [
+        {
+            "source": {"id": None, "name": f"Fake Wire {it['id'].split('-')[0]}"},
+            "title": it["title"],
+            "description": it["summary"],
+            "url": f"{base}/article/{it['id']}",
+            "publishedAt": datetime.fromtimestamp(it["published"], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        for it in items
+    ]
+    payload = {"status": "ok", "totalResults": len(articles), "articles": articles, "padding": pad}
+    return "application/json", json.dumps(payload, ensure_ascii=False).encode()
+
+
+def _handler(cfg: ServerConfig, stats: dict):
+    rng = random.Random(cfg.seed)
+    lock = threading.Lock()
+    counters: dict[str, int] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes = b"", headers: dict | None = None) -> None:
+            self.send_response(status)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            m = _ROUTE_RE.match(parts.path)
+            if m:
+                kind, sid = m.groups()
+            elif parts.path == "/newsapi/v2/everything":
+                kind, sid = "newsapi", "all"
+            else:
+                self._send(404, b"not found")
+                return
+            profile = cfg.profiles[kind]
+            with lock:
+                stats[kind] = stats.get(kind, 0) + 1
+                counters[f"{kind}/{sid}"] = n = counters.get(f"{kind}/{sid}", 0) + 1
+                delay = profile.latency * math.exp(rng.gauss(0, profile.sigma))
+                stall = rng.random() < profile.stall_rate
+                fail = rng.random() < profile.error_rate
+            time.sleep(delay + (profile.stall_seconds if stall else 0))
+            if fail:
+                with lock:
+                    stats["errors"] = stats.get("errors", 0) + 1
+                self._send(503, b"overloaded")
+                return
+
+            epoch = _epoch(profile, n)
+            etag = f'"{kind}-{sid}-{epoch}"'
+            modified = (
+                epoch * profile.change_seconds if profile.change_seconds > 0 else time.time()
+            )
+            headers = {
+                "ETag": etag,
+                "Last-Modified": format_datetime(datetime.fromtimestamp(modified, timezone.utc), usegmt=True),
+            }
+            since = self.headers.get("If-Modified-Since")
+            if self.headers.get("If-None-Match") == etag or (
+                since and profile.change_seconds > 0 and parsedate_to_datetime(since).timestamp() >= int(modified)
+            ):
+                with lock:
+                    stats["not_modified"] = stats.get("not_modified", 0) + 1
+                self._send(304, headers=headers)
+                return
+
+            count = profile.items
+            query = parse_qs(parts.query)
+            for key in ("limit", "pageSize"):
+                if key in query:
+                    count = min(count, int(query[key][0]))
+            base = f"http://{self.headers.get('Host', 'localhost')}"
+            ctype, body = _render(kind, sid, _items(kind, sid, profile, epoch)[:count], base, profile)
+            with lock:
+                stats["bytes"] = stats.get("bytes", 0) + len(body)
+            self._send(200, body, {**headers, "Content-Type": ctype})
+
+    return Handler
+
+
+def serve(port: int = 0, cfg: ServerConfig | None = None) -> tuple[ThreadingHTTPServer, str, dict]:
+    """Start the server in a daemon thread. Returns (server, base_url, request stats)."""
+    stats: dict = {}
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(cfg or ServerConfig(), stats))
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", stats
+
+
+def source_config(base_url: str, rss: int = 100, html: int = 10, anue: int = 10) -> dict:
+    """Config sections (``rss_feeds``, ``scrape_targets``, ``newsapi``) for the fake sources."""
+    return {
+        "rss_feeds": {f"fake-rss-{i}": f"{base_url}/rss/{i}.xml" for i in range(rss)},
+        "scrape_targets": [
+            {"name": f"fake-html-{i}", "url": f"{base_url}/html/{i}", "title_selector": ".title a",
+             "link_selector": ".title a"}
+            for i in range(html)
+        ] + [
+            {"name": f"fake-anue-{i}", "url": f"{base_url}/anue/{i}", "api_url": f"{base_url}/anue/{i}",
+             "use_api": True}
+            for i in range(anue)
+        ],
+        "newsapi": {"enabled": True, "query": "TSMC", "base_url": f"{base_url}/newsapi/v2/everything"},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--sources", type=int, default=200, help="RSS feeds in the printed config")
+    args = parser.parse_args()
+
+    import yaml
+
+    server, url, _ = serve(args.port)
+    print(f"# Fake sources listening on {url}; set NEWSAPI_KEY to any value")
+    print(yaml.safe_dump(
+        source_config(url, rss=args.sources, html=args.sources // 20, anue=args.sources // 20),
+        allow_unicode=True, sort_keys=False,
+    ))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
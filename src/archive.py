@@ -0,0 +1,273 @@
+"""Append-only local article archive with an SQLite FTS5 full-text index.
+
+Every fetched article is stored once (keyed by link); each digest an article
+went into is recorded with its score and matched keywords. Titles and
+summaries are indexed through :mod:`src.cjk` so Chinese phrases match without
+word segmentation.
+
+CLI:
+    python -m src.archive search "CoWoS" --since 2026-10-01
+    python -m src.archive stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sqlite3
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.cjk import token_text, tokenize
+from src.models import Article, FilteredArticle
+
+logger = logging.getLogger(__name__)
+
+_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    source TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    published TEXT,
+    first_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_published ON articles(published);
+
+CREATE TABLE IF NOT EXISTS digest_entries (
+    article_id INTEGER NOT NULL REFERENCES articles(id),
+    run_at TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    score REAL NOT NULL,
+    matched_keywords TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (article_id, run_at, digest)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, content='', tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, summary)
+    VALUES (new.id, cjk_tokens(new.title), cjk_tokens(new.summary));
+END;
+"""
+
+
+def _iso(dt: datetime | None) -> str | None:
+    if dt is None:
+        return None
+    if dt.tzinfo:
+        dt = dt.astimezone(timezone.utc)
+    return dt.isoformat()
+
+
+def _match_query(query: str) -> tuple[str, list[str]]:
+    """Turn user input into an FTS5 query: each term becomes a token phrase, ANDed.
+
+    The index holds CJK bigrams, so a term that is a single CJK character
+    cannot be matched through it; those are returned separately for a
+    substring match instead. Terms with no tokens (punctuation) are dropped.
+
+    Returns:
+        The MATCH expression (``""`` if no term is indexable) and the
+        single-character terms.
+    """
+    phrases, chars = [], []
+    for term in query.split():
+        tokens = tokenize(term)
+        if len(tokens) == 1 and len(tokens[0]) == 1 and not tokens[0].isascii():
+            chars.append(tokens[0])
+        elif tokens:
+            phrases.append('"' + " ".join(tokens) + '"')
+    return " AND ".join(phrases), chars
+
+
+class ArticleArchive:
+    """SQLite archive file; one instance per process/thread."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function("cjk_tokens", 1, token_text, deterministic=True)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def run(self, run_at: str) -> ArchiveRun:
+        """Start a run; use as a context manager (one transaction per run)."""
+        return ArchiveRun(self._conn, run_at)
+
+    def search(
+        self,
+        query: str,
+        since: str | None = None,
+        until: str | None = None,
+        digest: str | None = None,
+        limit: int = 50,
+    ) -> list[sqlite3.Row]:
+        """Full-text search over titles and summaries, newest first.
+
+        Args:
+            query: Space-separated terms; all must match. CJK terms match
+                as phrases. Returns nothing if no term has a word or CJK
+                character in it.
+            since: Inclusive lower bound on publish/first-seen date (ISO).
+            until: Exclusive upper bound on publish/first-seen date (ISO).
+            digest: Only articles that went into this digest.
+            limit: Maximum rows returned.
+        """
+        sql = [
+            "SELECT a.id, a.title, a.link, a.source, a.published, a.first_seen,",
+            "  (SELECT MAX(score) FROM digest_entries d WHERE d.article_id = a.id) AS score,",
+            "  (SELECT GROUP_CONCAT(DISTINCT digest) FROM digest_entries d",
+            "     WHERE d.article_id = a.id) AS digests",
+        ]
+        match, chars = _match_query(query)
+        if not match and not chars:
+            return []
+        params: list = []
+        if match:
+            sql.append("FROM articles_fts f JOIN articles a ON a.id = f.rowid WHERE articles_fts MATCH ?")
+            params.append(match)
+        else:
+            sql.append("FROM articles a WHERE 1")
+        for char in chars:
+            sql.append("AND (a.title LIKE ? OR a.summary LIKE ?)")
+            params += [f"%{char}%"] * 2
+        if since:
+            sql.append("AND COALESCE(a.published, a.first_seen) >= ?")
+            params.append(since)
+        if until:
+            sql.append("AND COALESCE(a.published, a.first_seen) < ?")
+            params.append(until)
+        if digest:
+            sql.append("AND EXISTS (SELECT 1 FROM digest_entries d WHERE d.article_id = a.id AND d.digest = ?)")
+            params.append(digest)
+        sql.append("ORDER BY COALESCE(a.published, a.first_seen) DESC LIMIT ?")
+        params.append(limit)
+        return self._conn.execute("\n".join(sql), params).fetchall()
+
+    def articles_after(self, last_id: int, limit: int) -> list[sqlite3.Row]:
+        """Articles with id > ``last_id`` in id order (for incremental consumers)."""
+        return self._conn.execute(
+            "SELECT id, title, summary FROM articles WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, limit),
+        ).fetchall()
+
+    def stats(self) -> dict[str, int | str | None]:
+        row = self._conn.execute(
+            "SELECT COUNT(*) AS articles, MIN(first_seen) AS oldest, MAX(first_seen) AS newest FROM articles"
+        ).fetchone()
+        digests = self._conn.execute("SELECT COUNT(*) FROM digest_entries").fetchone()[0]
+        return {**dict(row), "digest_entries": digests}
+
+
+class ArchiveRun:
+    """Writes one pipeline run into the archive inside a single transaction."""
+
+    def __init__(self, conn: sqlite3.Connection, run_at: str) -> None:
+        self._conn = conn
+        self.run_at = run_at
+        self.seen = 0
+        self._first_seen = _iso(datetime.now(timezone.utc))
+
+    def __enter__(self) -> ArchiveRun:
+        self._conn.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self._conn.execute("COMMIT")
+            logger.info("Archive: committed run %s (%d articles seen)", self.run_at, self.seen)
+        else:
+            self._conn.execute("ROLLBACK")
+
+    def tap(self, articles: Iterable[Article]) -> Iterator[Article]:
+        """Pass a stream through unchanged while inserting it in batches."""
+        batch: list[Article] = []
+        for art in articles:
+            self.seen += 1
+            batch.append(art)
+            if len(batch) >= _BATCH_SIZE:
+                self._insert(batch)
+                batch = []
+            yield art
+        if batch:
+            self._insert(batch)
+
+    def _insert(self, batch: list[Article]) -> None:
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO articles(link, title, source, summary, published, first_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (a.link, a.title, a.source, a.summary, _iso(a.published), self._first_seen)
+                for a in batch
+            ],
+        )
+
+    def record_digest(self, digest: str, articles: list[FilteredArticle]) -> None:
+        """Record which articles went into ``digest`` with their scores."""
+        self._insert([fa.article for fa in articles])
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO digest_entries(article_id, run_at, digest, score, matched_keywords) "
+            "SELECT id, ?, ?, ?, ? FROM articles WHERE link = ?",
+            [
+                (self.run_at, digest, fa.score, ",".join(fa.matched_keywords), fa.link)
+                for fa in articles
+            ],
+        )
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _cli(argv: list[str] | None = None) -> None:
+    from src import config
+
+    parser = argparse.ArgumentParser(prog="python -m src.archive", description=__doc__.split("\n")[0])
+    parser.add_argument("--db", default=str(config.ARCHIVE_PATH), help="archive file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_search = sub.add_parser("search", help="full-text search")
+    p_search.add_argument("query")
+    p_search.add_argument("--since", help="e.g. 2026-10-01")
+    p_search.add_argument("--until")
+    p_search.add_argument("--digest", help="only articles sent in this digest profile")
+    p_search.add_argument("--limit", type=int, default=50)
+
+    sub.add_parser("stats", help="archive size")
+
+    args = parser.parse_args(argv)
+    archive = ArticleArchive(args.db)
+    try:
+        if args.command == "stats":
+            for key, value in archive.stats().items():
+                print(f"{key}: {value}")
+            return
+
+        t0 = time.perf_counter()
+        rows = archive.search(args.query, args.since, args.until, args.digest, args.limit)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        for row in rows:
+            date = (row["published"] or row["first_seen"])[:10]
+            score = f" [{row['score']:g} {row['digests']}]" if row["score"] is not None else ""
+            print(f"{date}  {row['source']}  {row['title']}{score}\n            {row['link']}")
+        print(f"-- {len(rows)} results in {elapsed_ms:.1f} ms", file=sys.stderr)
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,238 @@
+"""Canonical article URLs for deduplication.
+
+``canonicalize`` maps the many spellings of one article URL — tracking
+parameters, AMP/mobile hosts, http vs https, trailing slashes — to a single
+key while keeping query parameters that identify content (``?id=``, MoneyDJ's
+``?a=``). Links behind redirectors (Google News, feedproxy, short links) are
+resolved with bounded concurrent HEAD requests and remembered on disk.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src import config
+from src.models import Article
+
+logger = logging.getLogger(__name__)
+
+_TRACKING_PREFIXES = ("utm_", "at_", "mc_", "pk_", "hmb_", "__")
+# Stripped on every domain: names only ever used for tracking
+_TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "ocid", "cmpid",
+    "ref_src", "spm", "outputtype", "amp", "_ga", "_gl", "s_cid",
+})
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+
+# Domains whose URLs identify the article by query parameters; only these
+# parameters are kept. Other domains keep every non-tracking parameter.
+_DOMAIN_PARAMS: dict[str, frozenset[str]] = {
+    "moneydj.com": frozenset({"a"}),
+    "youtube.com": frozenset({"v"}),
+    "news.cnyes.com": frozenset(),
+    "technews.tw": frozenset(),
+    "bbc.co.uk": frozenset(),
+    "bbc.com": frozenset(),
+}
+
+# Generic names ("from", "source", ...) identify content on some sites, so
+# they are only stripped on domains known to use them for tracking
+_DOMAIN_TRACKING: dict[str, frozenset[str]] = {
+    "udn.com": frozenset({"from"}),
+    "ltn.com.tw": frozenset({"from"}),
+    "ettoday.net": frozenset({"from", "from_source"}),
+    "medium.com": frozenset({"source"}),
+    "twitter.com": frozenset({"s", "ref", "t"}),
+    "x.com": frozenset({"s", "ref", "t"}),
+    "reuters.com": frozenset({"rss", "feedtype", "feedname"}),
+    "cnbc.com": frozenset({"__source", "source"}),
+    "bloomberg.com": frozenset({"srnd", "leadsource", "sref"}),
+}
+
+_DEFAULT_REDIRECT_HOSTS = (
+    "news.google.com", "feedproxy.google.com", "feeds.feedburner.com",
+    "t.co", "bit.ly", "lnkd.in", "ow.ly", "reut.rs", "apple.news",
+)
+
+_CANONICAL_CONFIG: dict = config.CANONICAL_CONFIG
+for _domain, _params in _CANONICAL_CONFIG.get("domain_params", {}).items():
+    _DOMAIN_PARAMS[_domain.lower()] = frozenset(p.lower() for p in _params or ())
+for _domain, _params in _CANONICAL_CONFIG.get("domain_tracking", {}).items():
+    _DOMAIN_TRACKING[_domain.lower()] = frozenset(p.lower() for p in _params or ())
+REDIRECT_HOSTS: frozenset[str] = frozenset(
+    _CANONICAL_CONFIG.get("redirect_hosts", _DEFAULT_REDIRECT_HOSTS)
+)
+
+
+def _strip_host(host: str) -> str:
+    host = host.lower().rstrip(".")
+    if ":" in host:
+        name, _, port = host.rpartition(":")
+        if port in ("80", "443"):
+            host = name
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    return host
+
+
+def _domain_rule(host: str, rules: dict[str, frozenset[str]]) -> frozenset[str] | None:
+    """Rule for ``host`` or its closest registered parent domain."""
+    while True:
+        if host in rules:
+            return rules[host]
+        _, dot, host = host.partition(".")
+        if not dot:
+            return None
+
+
+def _is_tracking(name: str, extra: frozenset[str]) -> bool:
+    name = name.lower()
+    return name in _TRACKING_PARAMS or name in extra or name.startswith(_TRACKING_PREFIXES)
+
+
+@functools.lru_cache(maxsize=65536)
+def canonicalize(url: str) -> str:
+    """Return the canonical dedup key for ``url``."""
+    parts = urlsplit(url.strip())
+    host = _strip_host(parts.netloc)
+
+    path = parts.path or "/"
+    for suffix in ("/amp", ".amp"):
+        if path.endswith(suffix) or path.endswith(suffix + "/"):
+            path = path[: path.rfind(suffix)]
+    path = path.rstrip("/") or "/"
+
+    allowed = _domain_rule(host, _DOMAIN_PARAMS)
+    tracking = _domain_rule(host, _DOMAIN_TRACKING) or frozenset()
+    params = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if (k.lower() in allowed if allowed is not None else not _is_tracking(k, tracking))
+    ]
+    query = urlencode(sorted(params))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def needs_resolution(url: str) -> bool:
+    return urlsplit(url).hostname in REDIRECT_HOSTS
+
+
+class UrlIndex:
+    """Canonical URL → every alias seen for it."""
+
+    def __init__(self) -> None:
+        self._aliases: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def __contains__(self, url: str) -> bool:
+        return canonicalize(url) in self._aliases
+
+    def add(self, url: str) -> bool:
+        """Register ``url``; returns True if its canonical form is new."""
+        key = canonicalize(url)
+        aliases = self._aliases.get(key)
+        if aliases is None:
+            self._aliases[key] = [url]
+            return True
+        if url not in aliases:
+            aliases.append(url)
+        return False
+
+    def aliases(self, url: str) -> list[str]:
+        return list(self._aliases.get(canonicalize(url), ()))
+
+
+class RedirectResolver:
+    """Resolve redirector links to their final URL, cached in a JSON file."""
+
+    def __init__(self, cache_path: str | Path, max_workers: int = 8, timeout: float = 5.0) -> None:
+        from src.fetchers import create_session
+
+        self.cache_path = Path(cache_path)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._session = create_session()
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            self._cache: dict[str, str] = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._cache = {}
+
+    def _resolve_one(self, url: str) -> str:
+        try:
+            resp = self._session.head(url, allow_redirects=True, timeout=self.timeout)
+            if resp.status_code in (403, 405, 501):
+                resp = self._session.get(url, allow_redirects=True, timeout=self.timeout, stream=True)
+                resp.close()
+            final = resp.url
+        except Exception:
+            logger.debug("Redirect resolution failed for %s", url)
+            return url
+        with self._lock:
+            self._cache[url] = final
+            self._dirty = True
+        return final
+
+    def resolve_many(self, urls: list[str]) -> dict[str, str]:
+        """Map each URL to its final target, resolving cache misses concurrently."""
+        result = {u: self._cache[u] for u in urls if u in self._cache}
+        misses = [u for u in dict.fromkeys(urls) if u not in result]
+        if misses:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(misses))) as pool:
+                result.update(zip(misses, pool.map(self._resolve_one, misses)))
+        return result
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._cache, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.cache_path)
+        self._dirty = False
+
+    def resolve_stream(self, articles: Iterable[Article], batch_size: int = 32) -> Iterator[Article]:
+        """Pass articles through, rewriting redirector links to their targets.
+
+        Articles on redirect hosts are held back in small batches so their
+        lookups run concurrently; all others pass straight through.
+        """
+        pending: list[Article] = []
+        resolved = 0
+
+        def _flush() -> Iterator[Article]:
+            nonlocal resolved
+            targets = self.resolve_many([a.link for a in pending])
+            for art in pending:
+                final = targets.get(art.link, art.link)
+                if final != art.link:
+                    art.link = final
+                    resolved += 1
+                yield art
+            pending.clear()
+
+        try:
+            for art in articles:
+                if needs_resolution(art.link):
+                    pending.append(art)
+                    if len(pending) >= batch_size:
+                        yield from _flush()
+                else:
+                    yield art
+            if pending:
+                yield from _flush()
+        finally:
+            if resolved:
+                logger.info("Resolved %d redirect links", resolved)
+            self.save()
@@ -0,0 +1,127 @@
+"""Per-run stage checkpoints so a crashed run can resume where it failed.
+
+Each run gets a directory under ``data/runs/<date>/<slot>/``. Stage outputs
+are pickled there as they complete; a ``--resume`` run loads them instead of
+redoing the work, so only the failed tail (typically SMTP) is retried.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import re
+import shutil
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_RE = re.compile(r"[^\w.-]+")
+
+# Items per pickle frame in a tee'd stream checkpoint
+_BATCH_SIZE = 500
+
+
+def stage_key(*parts: str) -> str:
+    """Join name parts into a filesystem-safe stage key (show names may be CJK)."""
+    return "/".join(_UNSAFE_RE.sub("_", p).strip("_") or "_" for p in parts)
+
+
+class RunCheckpoint:
+    """Stage store for one run.
+
+    Without ``resume``, any checkpoints left by an earlier run of the same
+    slot are discarded first, so ``load`` only sees this run's own stages.
+    """
+
+    def __init__(self, root: Path, resume: bool = False, run_id: str = ""):
+        self.root = Path(root)
+        self.resume = resume
+        self.run_id = run_id or self.root.name
+        if not resume and self.root.exists():
+            shutil.rmtree(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        if resume:
+            done = sum(1 for _ in self.root.rglob("*.pkl"))
+            logger.info("Resuming run from %s (%d completed stages)", self.root, done)
+
+    @classmethod
+    def for_slot(cls, data_dir: Path, date: str, slot: str, resume: bool = False) -> RunCheckpoint:
+        return cls(Path(data_dir) / "runs" / date / slot, resume, f"{date}/{slot}")
+
+    @staticmethod
+    def prune(data_dir: Path, keep: int = 7) -> None:
+        """Delete run directories beyond the ``keep`` most recent dates."""
+        runs = Path(data_dir) / "runs"
+        if not runs.is_dir():
+            return
+        for old in sorted(p for p in runs.iterdir() if p.is_dir())[:-keep or None]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pkl"
+
+    def done(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def load(self, key: str, default: Any = None) -> Any:
+        """Return a checkpointed stage output, or ``default`` if absent."""
+        if not self.done(key):
+            return default
+        try:
+            with open(self._path(key), "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            logger.warning("Checkpoint %s unreadable, redoing stage", key)
+            return default
+        logger.info("Checkpoint: reusing %s", key)
+        return value
+
+    def save(self, key: str, value: Any) -> None:
+        """Persist a stage output atomically (a crash mid-write leaves no checkpoint)."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    def tee(self, key: str, stream: Iterable) -> Iterator:
+        """Pass a stream through, checkpointing its items in batches as they go.
+
+        Only one batch is held in memory; the checkpoint appears once the
+        stream is exhausted. Read it back with :meth:`replay`.
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            batch = []
+            for item in stream:
+                batch.append(item)
+                if len(batch) >= _BATCH_SIZE:
+                    pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    batch = []
+                yield item
+            if batch:
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    def replay(self, key: str) -> Iterator | None:
+        """Stream the items of a :meth:`tee` checkpoint, or None if absent."""
+        if not self.done(key):
+            return None
+        logger.info("Checkpoint: reusing %s", key)
+        return self._replay(self._path(key))
+
+    @staticmethod
+    def _replay(path: Path) -> Iterator:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
@@ -0,0 +1,32 @@
+"""CJK-aware tokenization shared by the archive index and local ranking."""
+
+from __future__ import annotations
+
+import re
+
+# Runs of CJK characters, or runs of latin letters/digits
+_TOKEN_RE = re.compile(
+    r"([\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]+)|([0-9a-z]+(?:[.\-][0-9a-z]+)*)"
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into latin words and overlapping CJK character bigrams.
+
+    ``"台積電 CoWoS 產能"`` → ``["台積", "積電", "cowos", "產能"]``. A lone CJK
+    character becomes a single-character token.
+    """
+    tokens: list[str] = []
+    for cjk, word in _TOKEN_RE.findall(text.lower()):
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+def token_text(text: str) -> str:
+    """Space-joined tokens, ready for a whitespace tokenizer such as FTS5 unicode61."""
+    return " ".join(tokenize(text))
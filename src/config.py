@@ -7,7 +7,8 @@ from pathlib import Path
 
 import yaml
 
-_CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.yaml"
+_ROOT = Path(__file__).resolve().parent.parent
+_CONFIG_PATH = _ROOT / "config.yaml"
 
 
 def _load_yaml() -> dict:
@@ -27,13 +28,21 @@ MAX_ARTICLES: int = _cfg.get("max_articles", 50)
 
 # --- Gemini ---
 GEMINI_MODEL: str = _cfg.get("gemini_model", "gemini-2.5-flash")
+# Input-token budget for the news prompt (0 disables packing)
+PROMPT_TOKEN_BUDGET: int = _cfg.get("prompt_token_budget", 24000)
 # GEMINI_API_KEY is read from env by google-genai SDK automatically
+# Model routing: deadlines, fallback tiers, hedging, base URL override
+LLM_CONFIG: dict = _cfg.get("llm", {})
+# Token/cost accounting and per-run / per-day budgets
+USAGE_CONFIG: dict = _cfg.get("usage", {})
 
 # --- Data sources ---
 RSS_FEEDS: dict[str, str] = _cfg.get("rss_feeds", {})
 SCRAPE_TARGETS: list[dict] = _cfg.get("scrape_targets", [])
 NEWSAPI_CONFIG: dict = _cfg.get("newsapi", {})
 NEWSAPI_KEY: str = os.environ.get("NEWSAPI_KEY", "")
+POLLING_CONFIG: dict = _cfg.get("polling", {})
+SOURCE_HEALTH_CONFIG: dict = _cfg.get("source_health", {})
 
 # --- Email ---
 SMTP_HOST: str = os.environ.get("SMTP_HOST", "smtp.gmail.com")
@@ -43,11 +52,39 @@ SMTP_PASSWORD: str = os.environ.get("SMTP_PASSWORD", "")
 EMAIL_FROM: str = os.environ.get("EMAIL_FROM", SMTP_USER)
 EMAIL_RECIPIENTS: list[str] = _cfg.get("email", {}).get("recipients", [])
 EMAIL_SUBJECT_PREFIX: str = _cfg.get("email", {}).get("subject_prefix", "[金融情報]")
+# Gmail clips HTML bodies over ~102KB; digests above this list only the top articles
+EMAIL_MAX_BYTES: int = _cfg.get("email", {}).get("max_bytes", 100_000)
+EMAIL_ARCHIVE_URL: str = _cfg.get("email", {}).get("archive_url", "")
 
 # --- YouTube ---
 YOUTUBE_CONFIG: dict = _cfg.get("youtube", {})
 YOUTUBE_API_KEY: str = os.environ.get("YOUTUBE_API_KEY", "")
 
+# --- Local state (archive, caches) ---
+DATA_DIR: Path = _ROOT / _cfg.get("data_dir", "data")
+ARCHIVE_CONFIG: dict = _cfg.get("archive", {})
+ARCHIVE_ENABLED: bool = ARCHIVE_CONFIG.get("enabled", True)
+ARCHIVE_PATH: Path = DATA_DIR / ARCHIVE_CONFIG.get("path", "archive.db")
+# Stage checkpoints under data/runs/<date>/<slot>/ for --resume
+CHECKPOINT_CONFIG: dict = _cfg.get("checkpoints", {})
+# Job queue for sharding a run across worker processes/machines (--enqueue / --worker)
+QUEUE_CONFIG: dict = _cfg.get("queue", {})
+QUEUE_PATH: Path = DATA_DIR / QUEUE_CONFIG.get("path", "queue.db")
+
+# --- URL canonicalization / redirect resolution ---
+CANONICAL_CONFIG: dict = _cfg.get("canonical_urls", {})
+
+# --- Ranking engine: "keyword" (substring weights) or "bm25" (local index) ---
+RANKING_CONFIG: dict = _cfg.get("ranking", {})
+RANKING_ENGINE: str = RANKING_CONFIG.get("engine", "keyword")
+
+# --- Full-text enrichment of top articles ---
+ENRICH_CONFIG: dict = _cfg.get("enrich", {})
+CPU_POOL_CONFIG: dict = _cfg.get("cpu_pool", {})
+
+# --- Intraday delta digests (later runs send only what changed) ---
+DELTA_CONFIG: dict = _cfg.get("delta", {})
+
 # --- Schedule ---
 SCHEDULE_TIMES: list[str] = _cfg.get("schedule_times", [])
 
@@ -57,3 +94,26 @@ CATEGORIES: list[str] = _cfg.get("categories", [
     "台股大盤與上市櫃公司動態",
     "國際宏觀經濟（FED、通膨、關稅政策）",
 ])
+
+
+def _load_profiles() -> list[dict]:
+    """Digest profiles; each inherits unset fields from the top-level settings."""
+    defaults = {
+        "keywords": KEYWORDS,
+        "min_score": MIN_SCORE,
+        "max_articles": MAX_ARTICLES,
+        "categories": CATEGORIES,
+    }
+    default_email = {"recipients": EMAIL_RECIPIENTS, "subject_prefix": EMAIL_SUBJECT_PREFIX}
+    raw = _cfg.get("profiles") or [{"name": "default"}]
+    profiles = []
+    for i, entry in enumerate(raw):
+        profile = {**defaults, **entry}
+        profile.setdefault("name", f"profile{i + 1}")
+        profile["email"] = {**default_email, **entry.get("email", {})}
+        profiles.append(profile)
+    return profiles
+
+
+# --- Digest profiles (share one fetch; each has its own keywords/recipients) ---
+PROFILES: list[dict] = _load_profiles()
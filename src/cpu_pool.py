@@ -0,0 +1,74 @@
+"""Optional process pool for CPU-bound parsing and scoring.
+
+Fetcher threads only download; with the pool enabled they ship the raw
+payload bytes to worker processes, which parse and normalize them
+(feedparser, BeautifulSoup/lxml, HTML stripping, dates) and send back
+compact ``(title, link, summary, published)`` rows. Keyword matching for
+ranking batches is split across the same workers. Without the pool, the
+same functions run inline in the calling thread.
+
+Workers are started with ``forkserver`` so they never inherit the
+fetcher threads' locks.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_pool: ProcessPoolExecutor | None = None
+_workers = 0
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        return os.cpu_count() or 1
+
+
+def enable(workers: int = 0) -> ProcessPoolExecutor:
+    """Start the pool; ``workers`` <= 0 sizes it to the available cores."""
+    global _pool, _workers
+    if _pool is not None:
+        return _pool
+    _workers = workers if workers > 0 else available_cores()
+    _pool = ProcessPoolExecutor(_workers, mp_context=multiprocessing.get_context("forkserver"))
+    logger.info("CPU pool: %d worker processes", _workers)
+    return _pool
+
+
+def shutdown() -> None:
+    global _pool, _workers
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+        _workers = 0
+
+
+def workers() -> int:
+    """Number of worker processes, 0 when the pool is off."""
+    return _workers
+
+
+def submit(fn: Callable[..., Any], *args: Any) -> Future:
+    """Run ``fn(*args)`` in the pool, or inline (as an already finished future) without one."""
+    if _pool is not None:
+        return _pool.submit(fn, *args)
+    fut: Future = Future()
+    try:
+        fut.set_result(fn(*args))
+    except Exception as exc:
+        fut.set_exception(exc)
+    return fut
+
+
+def run(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run ``fn(*args)`` in the pool and wait for it, or inline without one."""
+    return submit(fn, *args).result()
@@ -0,0 +1,52 @@
+"""Fast date parsing for feed and API timestamps.
+
+Known formats are dispatched to the stdlib parsers (``fromisoformat`` for
+ISO-8601/RFC-3339, ``email.utils`` for RFC-822) and results are memoized,
+since feeds repeat the same timestamps run after run. ``dateutil`` is only
+used as the last fallback.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from dateutil import parser as dateparser
+
+
+@functools.lru_cache(maxsize=8192)
+def parse_datetime(raw: str) -> datetime | None:
+    """Parse a timestamp string, returning None if it cannot be parsed."""
+    s = raw.strip()
+    if not s:
+        return None
+
+    # ISO-8601 / RFC-3339: "2026-10-19T08:30:00Z", "2026-10-19 08:30:00+08:00"
+    if len(s) >= 10 and s[4] == "-" and s[:4].isdigit():
+        try:
+            return datetime.fromisoformat(s)
+        except ValueError:
+            pass
+    # RFC-822 (RSS pubDate): "Mon, 19 Oct 2026 08:30:00 GMT"
+    elif s[0].isalpha() or s[0].isdigit():
+        try:
+            return parsedate_to_datetime(s)
+        except (TypeError, ValueError, IndexError):
+            pass
+
+    try:
+        return dateparser.parse(s)
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+
+def from_struct_time(st: time.struct_time | tuple | None) -> datetime | None:
+    """Convert a UTC ``struct_time`` (e.g. feedparser's ``*_parsed``) to a datetime."""
+    if not st:
+        return None
+    try:
+        return datetime(*st[:6], tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,62 @@
+"""What each profile's digests have already covered today.
+
+Used by intraday delta mode: later runs only summarize articles that no
+earlier digest of the day contained, with the earlier summary as context.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.canonical import canonicalize
+from src.models import FilteredArticle
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DigestState:
+    """Summaries sent and canonical links covered for one profile on one day."""
+
+    path: Path
+    summary: str = ""
+    updates: list[str] = field(default_factory=list)
+    links: set[str] = field(default_factory=set)
+
+    @classmethod
+    def load(cls, data_dir: Path, date: str, profile: str) -> DigestState:
+        path = Path(data_dir) / "digests" / date / f"{profile}.json"
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path)
+        return cls(path, raw.get("summary", ""), raw.get("updates", []), set(raw.get("links", [])))
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.summary)
+
+    def context(self) -> list[str]:
+        """Summaries already sent today, oldest first."""
+        return [self.summary, *self.updates]
+
+    def new_articles(self, articles: list[FilteredArticle]) -> list[FilteredArticle]:
+        return [a for a in articles if canonicalize(a.link) not in self.links]
+
+    def record(self, summary: str, articles: list[FilteredArticle]) -> None:
+        if self.summary:
+            self.updates.append(summary)
+        else:
+            self.summary = summary
+        self.links.update(canonicalize(a.link) for a in articles)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "summary": self.summary,
+            "updates": self.updates,
+            "links": sorted(self.links),
+        }, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
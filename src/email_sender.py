@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 import re
 import smtplib
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
@@ -19,6 +20,15 @@ logger = logging.getLogger(__name__)
 _TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
 
 
+# Inline styles for summary markdown, built once (already compact) rather than per line
+_H2_STYLE = "margin:20px 0 8px;font-size:17px;color:{0};border-left:4px solid {0};padding-left:12px"
+_H3_STYLE = "margin:16px 0 6px;font-size:15px;color:#555"
+_BULLET_STYLE = "margin:4px 0;padding-left:16px"
+_P_STYLE = "margin:4px 0"
+_IMPORTANCE_COLORS = (("🔴", "#e53935"), ("🟡", "#f9a825"), ("🟢", "#43a047"))
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+
 def _markdown_to_html(md_text: str) -> str:
     """Convert simple markdown from Gemini output to inline HTML for email."""
     lines = md_text.split("\n")
@@ -31,69 +41,163 @@ def _markdown_to_html(md_text: str) -> str:
             continue
 
         # Apply **bold** -> <strong> to all lines
-        stripped = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", stripped)
+        stripped = _BOLD_RE.sub(r"<strong>\1</strong>", stripped)
 
         # ## Heading -> <h2>
         if stripped.startswith("## "):
             content = stripped[3:]
             # Detect importance emoji and color the heading
-            color = "#333333"
-            if "🔴" in content:
-                color = "#e53935"
-            elif "🟡" in content:
-                color = "#f9a825"
-            elif "🟢" in content:
-                color = "#43a047"
-            html_parts.append(
-                f'<h2 style="margin:20px 0 8px; font-size:17px; color:{color}; '
-                f'border-left:4px solid {color}; padding-left:12px;">{content}</h2>'
-            )
+            color = next((c for mark, c in _IMPORTANCE_COLORS if mark in content), "#333333")
+            html_parts.append(f'<h2 style="{_H2_STYLE.format(color)}">{content}</h2>')
         # ### Sub-heading -> <h3>
         elif stripped.startswith("### "):
-            html_parts.append(
-                f'<h3 style="margin:16px 0 6px; font-size:15px; color:#555;">'
-                f'{stripped[4:]}</h3>'
-            )
+            html_parts.append(f'<h3 style="{_H3_STYLE}">{stripped[4:]}</h3>')
         # - bullet -> <li>
         elif stripped.startswith("- "):
-            html_parts.append(
-                f'<div style="margin:4px 0; padding-left:16px;">'
-                f'• {stripped[2:]}</div>'
-            )
+            html_parts.append(f'<div style="{_BULLET_STYLE}">• {stripped[2:]}</div>')
         else:
-            html_parts.append(f'<p style="margin:4px 0;">{stripped}</p>')
+            html_parts.append(f'<p style="{_P_STYLE}">{stripped}</p>')
 
     return "\n".join(html_parts)
 
 
+def _markdown_to_text(md_text: str) -> str:
+    """Flatten Gemini markdown for the text/plain part."""
+    lines: list[str] = []
+    for line in md_text.split("\n"):
+        stripped = _BOLD_RE.sub(r"\1", line.strip())
+        if stripped.startswith("## "):
+            lines += ["", f"■ {stripped[3:]}"]
+        elif stripped.startswith("### "):
+            lines.append(f"▸ {stripped[4:]}")
+        elif stripped.startswith("- "):
+            lines.append(f"  • {stripped[2:]}")
+        else:
+            lines.append(stripped)
+    return "\n".join(lines).strip()
+
+
+# --- Post-render size optimization ---
+
+_STYLE_ATTR_RE = re.compile(r' style="([^"]*)"')
+_STYLE_SEP_RE = re.compile(r"\s*([;:,])\s*")
+_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.S)
+_TAG_GAP_RE = re.compile(r">\s*\n\s*<")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _compact_style(m: re.Match) -> str:
+    style = _STYLE_SEP_RE.sub(r"\1", m.group(1)).strip().rstrip(";")
+    return f' style="{style}"'
+
+
+def _optimize_html(html: str) -> str:
+    """Shrink rendered email HTML without changing how it displays.
+
+    Style declarations are compacted but stay inline (many webmail and
+    mobile clients drop ``<head>`` styles), comments are dropped and
+    whitespace is collapsed.
+    Whitespace between tags is only removed across line breaks, so inline
+    elements on one line keep their separating spaces.
+    """
+    html = _STYLE_ATTR_RE.sub(_compact_style, html)
+    html = _COMMENT_RE.sub("", html)
+    html = _TAG_GAP_RE.sub("><", html)
+    return _SPACE_RE.sub(" ", html).strip()
+
+
+_TIMESTAMP_RE = re.compile(r"\[(?:(\d{1,2}):)?(\d{1,2}):(\d{2})\]")
+
+
+def _linkify_timestamps(html: str, video_url: str) -> str:
+    """Turn [m:ss] / [h:mm:ss] markers in a video summary into deep links."""
+    def _link(m: re.Match) -> str:
+        h, mnt, sec = (int(g or 0) for g in m.groups())
+        t = (h * 60 + mnt) * 60 + sec
+        return (
+            f'<a href="{video_url}&t={t}s" style="color:#1565c0; text-decoration:none;">'
+            f'{m.group(0)}</a>'
+        )
+
+    return _TIMESTAMP_RE.sub(_link, html)
+
+
 def render_email(
     summary: str,
     articles: list[FilteredArticle],
     date: str,
+    max_bytes: int | None = None,
+    archive_url: str | None = None,
 ) -> str:
     """Render the digest HTML email.
 
+    The output is size-optimized. If it still exceeds ``max_bytes``, the
+    links section keeps only as many top-scored articles as fit and ends
+    with a count of the rest (and a link to ``archive_url``, if set).
+
     Args:
         summary: Markdown summary text from Gemini.
-        articles: Filtered articles for the links section.
+        articles: Filtered articles for the links section, best first.
         date: Formatted date string.
+        max_bytes: HTML size budget (default ``config.EMAIL_MAX_BYTES``; 0 disables).
+        archive_url: Full-list URL; ``{date}`` is filled in (default from config).
 
     Returns:
         Complete HTML email body.
     """
+    t0 = time.perf_counter()
+    max_bytes = config.EMAIL_MAX_BYTES if max_bytes is None else max_bytes
+    archive_url = (config.EMAIL_ARCHIVE_URL if archive_url is None else archive_url).format(date=date[:10])
+
     env = Environment(loader=FileSystemLoader(str(_TEMPLATES_DIR)), autoescape=False)
     template = env.get_template("digest.html")
+    context = {
+        "date": date,
+        "summary_html": _markdown_to_html(summary),
+        "total": len(articles),
+        "model": config.GEMINI_MODEL,
+        "sources": sorted({a.source for a in articles}),
+        "archive_url": archive_url,
+    }
+
+    def render(n: int) -> str:
+        return _optimize_html(template.render(articles=articles[:n], omitted=len(articles) - n, **context))
+
+    html = render(len(articles))
+    full_size = len(html.encode())
+    listed = len(articles)
+    if max_bytes and full_size > max_bytes:
+        # Largest article count that fits; size grows monotonically with n
+        lo, hi = 0, len(articles) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if len(render(mid).encode()) <= max_bytes:
+                lo = mid
+            else:
+                hi = mid - 1
+        listed = lo
+        html = render(listed)
+        if len(html.encode()) > max_bytes:
+            logger.warning("Digest exceeds %d bytes even without article links", max_bytes)
+
+    logger.info(
+        "Rendered digest: %d bytes (%d with all links), %d/%d articles listed, %.1f ms",
+        len(html.encode()), full_size, listed, len(articles), (time.perf_counter() - t0) * 1000,
+    )
+    return html
 
-    sources = sorted({a.source for a in articles})
-    summary_html = _markdown_to_html(summary)
 
-    return template.render(
-        date=date,
-        summary_html=summary_html,
-        articles=articles,
-        model=config.GEMINI_MODEL,
-        sources=sources,
-    )
+def render_text(
+    summary: str,
+    articles: list[FilteredArticle],
+    date: str,
+) -> str:
+    """Render the text/plain alternative of the digest email."""
+    lines = [f"每日金融與科技決策簡報 {date}", "", _markdown_to_text(summary), "", "原始新聞連結", "─" * 12]
+    for art in articles:
+        lines += [f"• {art.title}（{art.source}）", f"  {art.link}"]
+    lines += ["", "內容僅供參考，不構成投資建議。"]
+    return "\n".join(lines)
 
 
 def send_email(html_body: str, subject: str) -> None:
@@ -150,25 +254,53 @@ def render_video_email(
     template = env.get_template("video_digest.html")
 
     rendered_summaries = [
-        (video, _markdown_to_html(summary))
+        (video, _linkify_timestamps(_markdown_to_html(summary), video.url))
         for video, summary in video_summaries
     ]
 
-    return template.render(
+    t0 = time.perf_counter()
+    html = _optimize_html(template.render(
         show_name=show_name,
         date=date,
         video_summaries=rendered_summaries,
         model=summary_model,
+    ))
+    logger.info(
+        "Rendered video digest: %d bytes, %.1f ms",
+        len(html.encode()), (time.perf_counter() - t0) * 1000,
     )
+    return html
 
 
-def send_email_to(html_body: str, subject: str, recipients: list[str]) -> None:
+def render_video_text(
+    video_summaries: list[tuple[Video, str]],
+    show_name: str,
+    date: str,
+) -> str:
+    """Render the text/plain alternative of the video digest email."""
+    lines = [f"{show_name} — 影片摘要 {date}"]
+    for video, summary in video_summaries:
+        lines += ["", "═" * 12, video.title, video.url, "", _markdown_to_text(summary)]
+    lines += ["", "內容僅供參考，不構成投資建議。"]
+    return "\n".join(lines)
+
+
+def send_email_to(
+    html_body: str,
+    subject: str,
+    recipients: list[str],
+    text_body: str | None = None,
+    message_id: str | None = None,
+) -> None:
     """Send HTML email to specific recipients via SMTP/TLS.
 
     Args:
         html_body: Rendered HTML content.
         subject: Email subject line.
         recipients: List of recipient email addresses.
+        text_body: Optional text/plain alternative, sent before the HTML part.
+        message_id: Stable Message-ID (e.g. from an idempotency key), so a
+            resend of the same digest is recognized as a duplicate.
     """
     if not recipients:
         logger.warning("No recipients specified, skipping send")
@@ -182,11 +314,17 @@ def send_email_to(html_body: str, subject: str, recipients: list[str]) -> None:
     msg["Subject"] = subject
     msg["From"] = config.EMAIL_FROM
     msg["To"] = ", ".join(recipients)
+    if message_id:
+        msg["Message-ID"] = message_id
+    # Clients show the last alternative they support, so HTML goes last
+    if text_body:
+        msg.attach(MIMEText(text_body, "plain", "utf-8"))
     msg.attach(MIMEText(html_body, "html", "utf-8"))
+    payload = msg.as_string()
 
     with smtplib.SMTP(config.SMTP_HOST, config.SMTP_PORT) as server:
         server.starttls()
         server.login(config.SMTP_USER, config.SMTP_PASSWORD)
-        server.sendmail(config.EMAIL_FROM, recipients, msg.as_string())
+        server.sendmail(config.EMAIL_FROM, recipients, payload)
 
-    logger.info("Email sent to %s", ", ".join(recipients))
+    logger.info("Email sent to %s (%d bytes)", ", ".join(recipients), len(payload))
@@ -0,0 +1,191 @@
+"""Fetch full article bodies for the top-ranked articles.
+
+Runs after ``rank_profiles``: downloads each article page with bounded
+per-host concurrency, extracts the main text with a small lxml readability
+pass and caches the result on disk by canonical URL, so an article is
+downloaded and parsed at most once across runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import lxml.html
+
+from src.canonical import canonicalize
+from src.fetchers import create_session
+from src.models import FilteredArticle
+
+logger = logging.getLogger(__name__)
+
+_session = create_session()
+_TIMEOUT = 15
+
+# Bodies longer than this are cut; the prompt packer trims further
+BODY_MAX_CHARS = 6000
+
+_DROP_TAGS = (
+    "script", "style", "noscript", "nav", "header", "footer", "aside", "form",
+    "iframe", "svg", "button", "figure",
+)
+_NEGATIVE_RE = re.compile(
+    r"comment|share|social|related|recommend|sidebar|footer|header|nav|menu|"
+    r"advert|ad-|promo|subscribe|breadcrumb|tag|copyright",
+    re.I,
+)
+_POSITIVE_RE = re.compile(r"article|content|post|story|entry|main|body|text|news", re.I)
+
+
+def _class_weight(el: lxml.html.HtmlElement) -> int:
+    attrs = f"{el.get('class', '')} {el.get('id', '')}"
+    weight = 0
+    if _POSITIVE_RE.search(attrs):
+        weight += 25
+    if _NEGATIVE_RE.search(attrs):
+        weight -= 25
+    return weight
+
+
+def extract_main_text(html: str | bytes) -> str:
+    """Readability-style extraction of the main article text.
+
+    Paragraph text is credited to its parent and (half) grandparent; the
+    best-scoring container wins and its paragraphs are returned.
+    """
+    try:
+        doc = lxml.html.fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return ""
+    for el in doc.iter(*_DROP_TAGS):
+        el.drop_tree()
+
+    scores: dict[lxml.html.HtmlElement, float] = defaultdict(float)
+    for p in doc.iter("p", "pre", "td"):
+        text = p.text_content().strip()
+        if len(text) < 20:
+            continue
+        # Commas (latin and CJK) signal prose rather than link lists
+        score = 1 + text.count(",") + text.count("，") + text.count("。") + min(len(text) // 100, 3)
+        parent = p.getparent()
+        if parent is None:
+            continue
+        scores[parent] += score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] += score / 2
+
+    if not scores:
+        return ""
+    for el in scores:
+        scores[el] += _class_weight(el)
+        links = sum(len(a.text_content()) for a in el.iter("a"))
+        total = len(el.text_content()) or 1
+        scores[el] *= 1 - links / total
+
+    best = max(scores, key=scores.get)
+    paragraphs = [
+        " ".join(p.text_content().split())
+        for p in best.iter("p", "pre")
+    ]
+    text = "\n".join(p for p in paragraphs if p)
+    return text or " ".join(best.text_content().split())
+
+
+class BodyCache:
+    """One file per canonical URL under ``cache_dir``."""
+
+    def __init__(self, cache_dir: str | Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha1(canonicalize(url).encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.txt"
+
+    def get(self, url: str) -> str | None:
+        try:
+            return self._path(url).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, url: str, body: str) -> None:
+        path = self._path(url)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(body, encoding="utf-8")
+        tmp.replace(path)
+
+
+def _fetch_body(url: str) -> str:
+    resp = _session.get(url, timeout=_TIMEOUT)
+    resp.raise_for_status()
+    if "html" not in resp.headers.get("Content-Type", "html"):
+        return ""
+    if not resp.encoding or resp.encoding.lower() == "iso-8859-1":
+        resp.encoding = resp.apparent_encoding  # handle Big5/UTF-8 correctly
+    return extract_main_text(resp.text)[:BODY_MAX_CHARS]
+
+
+def enrich_articles(
+    articles: list[FilteredArticle],
+    cache_dir: str | Path,
+    max_workers: int = 8,
+    per_host: int = 2,
+) -> int:
+    """Fill ``article.body`` for each article, from cache or by downloading.
+
+    Args:
+        articles: Articles to enrich (typically the top-K after filtering).
+        cache_dir: Directory of the on-disk body cache.
+        max_workers: Total concurrent downloads.
+        per_host: Concurrent downloads allowed per host.
+
+    Returns:
+        Number of articles that now have a body.
+    """
+    cache = BodyCache(cache_dir)
+    host_slots: dict[str, threading.Semaphore] = defaultdict(lambda: threading.Semaphore(per_host))
+    slots_lock = threading.Lock()
+    hits = 0
+
+    todo = []
+    for fa in articles:
+        if fa.article.body:
+            continue
+        cached = cache.get(fa.link)
+        if cached is not None:
+            fa.article.body = cached
+            hits += 1
+        else:
+            todo.append(fa)
+
+    def _work(fa: FilteredArticle) -> None:
+        host = urlsplit(fa.link).hostname or ""
+        with slots_lock:
+            slot = host_slots[host]
+        with slot:
+            try:
+                body = _fetch_body(fa.link)
+            except Exception as exc:
+                logger.info("Body fetch failed for %s: %s", fa.link, exc)
+                return
+        fa.article.body = body
+        cache.put(fa.link, body)  # empty bodies are cached too: don't retry
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(_work, todo))
+
+    enriched = sum(1 for fa in articles if fa.article.body)
+    logger.info(
+        "Enrich: %d/%d articles have bodies (%d cache hits, %d downloaded)",
+        enriched, len(articles), hits, len(todo),
+    )
+    return enriched
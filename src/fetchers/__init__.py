@@ -2,26 +2,116 @@
 
 from __future__ import annotations
 
+import logging
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from src import config
+from src.models import Article
+
+logger = logging.getLogger(__name__)
+
 _USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
     "Chrome/120.0.0.0 Safari/537.36"
 )
 
+# Upper bound on stored summary length; the prompt packer trims further
+# to fit the token budget.
+SUMMARY_MAX_CHARS = 2000
+
 _RETRY = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
 
+# News sources get a tighter budget so a dead source costs at most about
+# (retries + 1) * timeout seconds; the circuit breaker (health.py) then
+# stops polling it altogether.
+_HEALTH_CONFIG: dict = config.SOURCE_HEALTH_CONFIG
+SOURCE_TIMEOUT: float = _HEALTH_CONFIG.get("timeout_seconds", 10)
+SOURCE_RETRY = Retry(
+    total=_HEALTH_CONFIG.get("retries", 1),
+    backoff_factor=0.5,
+    backoff_max=4,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=False,
+)
+
+_DONE = object()
 
-def create_session() -> requests.Session:
+
+def create_session(retry: Retry = _RETRY) -> requests.Session:
     """Create a requests session with retry and default headers."""
     s = requests.Session()
     s.headers.update({
         "User-Agent": _USER_AGENT,
         "Accept-Language": "zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7",
     })
-    s.mount("https://", HTTPAdapter(max_retries=_RETRY))
-    s.mount("http://", HTTPAdapter(max_retries=_RETRY))
+    s.mount("https://", HTTPAdapter(max_retries=retry))
+    s.mount("http://", HTTPAdapter(max_retries=retry))
     return s
+
+
+def merge_streams(
+    streams: dict[str, Callable[[], Iterable[Article]]],
+    maxsize: int = 256,
+) -> Iterator[Article]:
+    """Run several article generators in parallel and yield from one stream.
+
+    Each producer runs in its own thread and hands articles over through a
+    bounded queue, so at most ``maxsize`` articles are buffered no matter
+    how much the sources return. A failing producer is logged and skipped.
+
+    Args:
+        streams: Mapping of fetcher name to a zero-arg callable returning
+            an iterable of articles.
+        maxsize: Maximum number of articles buffered between threads.
+
+    Yields:
+        Articles in arrival order.
+    """
+    q: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def _produce(name: str, fn: Callable[[], Iterable[Article]]) -> None:
+        count = 0
+        try:
+            for art in fn():
+                if stop.is_set():
+                    return
+                q.put(art)
+                count += 1
+        except Exception:
+            logger.exception("Fetcher %s failed", name)
+        finally:
+            logger.info("Fetcher %s: streamed %d articles", name, count)
+            q.put(_DONE)
+
+    threads = [
+        threading.Thread(target=_produce, args=(name, fn), name=f"fetch-{name}", daemon=True)
+        for name, fn in streams.items()
+    ]
+    for t in threads:
+        t.start()
+
+    remaining = len(threads)
+    try:
+        while remaining:
+            item = q.get()
+            if item is _DONE:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        # Consumer stopped early: unblock producers so their threads can exit
+        stop.set()
+        while remaining:
+            try:
+                if q.get_nowait() is _DONE:
+                    remaining -= 1
+            except queue.Empty:
+                break
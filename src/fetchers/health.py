@@ -0,0 +1,150 @@
+"""Per-source circuit breakers and health, persisted across runs.
+
+A source that fails ``failure_threshold`` polls in a row is opened: later
+runs skip it without spending any timeout or retry budget on it. After a
+cooldown it goes half-open and gets a single trial poll; success closes it,
+failure reopens it with the cooldown doubled (up to ``max_cooldown_hours``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class BreakerState:
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    trips: int = 0                 # consecutive times opened; scales the cooldown
+    opened_at: float = 0.0
+    successes: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_error: str = ""
+    last_latency: float = 0.0
+
+
+class SourceHealth:
+    """Circuit breaker registry for all news sources; thread-safe."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        enabled: bool = True,
+        failure_threshold: int = 3,
+        cooldown_minutes: float = 60.0,
+        max_cooldown_hours: float = 24.0,
+    ) -> None:
+        self.path = Path(path)
+        self.enabled = enabled
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown_minutes * 60
+        self.max_cooldown = max_cooldown_hours * 3600
+        self._lock = threading.Lock()
+        self._run: dict[str, str] = {}  # outcome of each source this run
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            self._states = {name: BreakerState(**s) for name, s in raw.items()}
+        except (OSError, ValueError, TypeError):
+            self._states: dict[str, BreakerState] = {}
+
+    def _cooldown(self, state: BreakerState) -> float:
+        return min(self.cooldown * 2 ** max(state.trips - 1, 0), self.max_cooldown)
+
+    def allow(self, name: str, now: float | None = None) -> bool:
+        """Whether ``name`` may be polled; moves an open breaker to half-open after its cooldown."""
+        if not self.enabled:
+            return True
+        now = now or time.time()
+        with self._lock:
+            state = self._states.setdefault(name, BreakerState())
+            if state.state == OPEN and now - state.opened_at >= self._cooldown(state):
+                state.state = HALF_OPEN
+                logger.info("Source %s: half-open, trying one poll", name)
+            if state.state == OPEN:
+                state.skipped += 1
+                self._run[name] = "skipped (open)"
+                return False
+            return True
+
+    def success(self, name: str, latency: float = 0.0) -> None:
+        with self._lock:
+            state = self._states.setdefault(name, BreakerState())
+            if state.state != CLOSED:
+                logger.info("Source %s: recovered, closing breaker", name)
+            state.state = CLOSED
+            state.consecutive_failures = 0
+            state.trips = 0
+            state.successes += 1
+            state.last_latency = latency
+            self._run[name] = f"ok {latency:.1f}s"
+
+    def failure(self, name: str, error: BaseException | str, latency: float = 0.0) -> None:
+        message = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+        with self._lock:
+            state = self._states.setdefault(name, BreakerState())
+            state.consecutive_failures += 1
+            state.failures += 1
+            state.last_error = message[:300]
+            state.last_latency = latency
+            self._run[name] = f"failed {latency:.1f}s"
+            if self.enabled and (
+                state.state == HALF_OPEN or state.consecutive_failures >= self.failure_threshold
+            ):
+                state.state = OPEN
+                state.trips += 1
+                state.opened_at = time.time()
+                logger.warning(
+                    "Source %s: breaker open after %d failures, next try in %.0f min (%s)",
+                    name, state.consecutive_failures, self._cooldown(state) / 60, state.last_error,
+                )
+
+    def report(self) -> list[str]:
+        """One line per source that is not healthy or was not polled normally this run."""
+        with self._lock:
+            states = dict(self._states)
+            run = dict(self._run)
+        lines = []
+        for name, state in sorted(states.items()):
+            if state.state == CLOSED and not state.consecutive_failures:
+                continue
+            lines.append(
+                f"{name}: {state.state}, {state.consecutive_failures} consecutive failures, "
+                f"this run: {run.get(name, 'not polled')}, last error: {state.last_error}"
+            )
+        return lines
+
+    def save(self) -> None:
+        with self._lock:
+            data = {name: asdict(s) for name, s in self._states.items()}
+            run = dict(self._run)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+        ok = sum(v.startswith("ok") for v in run.values())
+        failed = sum(v.startswith("failed") for v in run.values())
+        skipped = sum(v.startswith("skipped") for v in run.values())
+        logger.info("Source health: %d ok, %d failed, %d skipped by open breakers", ok, failed, skipped)
+        for line in self.report():
+            logger.warning("Source health: %s", line)
+
+    def track(self, stream: Iterable) -> Iterator:
+        """Pass the fetch stream through, saving and reporting health once it ends."""
+        try:
+            yield from stream
+        finally:
+            self.save()
@@ -3,37 +3,49 @@
 from __future__ import annotations
 
 import logging
+import sys
+import time
+from collections.abc import Iterator
 from datetime import datetime, timedelta, timezone
 
-from dateutil import parser as dateparser
-
-from src.fetchers import create_session
+from src.dates import parse_datetime
+from src.fetchers import SOURCE_RETRY, SOURCE_TIMEOUT, SUMMARY_MAX_CHARS, create_session
+from src.fetchers.health import SourceHealth
 from src.models import Article
 
 logger = logging.getLogger(__name__)
 
 _BASE_URL = "https://newsapi.org/v2/everything"
-_session = create_session()
-_TIMEOUT = 15
+_session = create_session(SOURCE_RETRY)
 
 
-def fetch_newsapi_articles(config: dict, api_key: str) -> list[Article]:
-    """Fetch articles from NewsAPI.org.
+def iter_newsapi_articles(
+    config: dict,
+    api_key: str,
+    health: SourceHealth | None = None,
+) -> Iterator[Article]:
+    """Yield articles from NewsAPI.org.
 
     Args:
-        config: NewsAPI section from config.yaml (query, language, sort_by).
+        config: NewsAPI section from config.yaml (query, language, sort_by,
+            optional base_url).
         api_key: NewsAPI API key from environment.
+        health: Optional circuit breakers; NewsAPI is skipped while its
+            breaker is open and every poll's outcome is recorded.
 
-    Returns:
-        List of Article objects.
+    Yields:
+        Article objects.
     """
     if not config.get("enabled", False):
         logger.info("NewsAPI is disabled in config")
-        return []
+        return
 
     if not api_key:
         logger.warning("NEWSAPI_KEY not set, skipping NewsAPI")
-        return []
+        return
+
+    if health is not None and not health.allow("NewsAPI"):
+        return
 
     yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).strftime("%Y-%m-%d")
 
@@ -46,42 +58,56 @@ def fetch_newsapi_articles(config: dict, api_key: str) -> list[Article]:
         "apiKey": api_key,
     }
 
+    t0 = time.monotonic()
     try:
-        resp = _session.get(_BASE_URL, params=params, timeout=_TIMEOUT)
+        resp = _session.get(config.get("base_url", _BASE_URL), params=params, timeout=SOURCE_TIMEOUT)
         resp.raise_for_status()
         data = resp.json()
 
         if data.get("status") != "ok":
             logger.error("NewsAPI error: %s", data.get("message", "unknown"))
-            return []
+            if health is not None:
+                health.failure("NewsAPI", data.get("message", "unknown"), time.monotonic() - t0)
+            return
 
-        articles: list[Article] = []
+        count = 0
         for item in data.get("articles", []):
             title = (item.get("title") or "").strip()
             link = (item.get("url") or "").strip()
             if not title or not link or title == "[Removed]":
                 continue
 
-            summary = (item.get("description") or "")[:500]
-            source_name = item.get("source", {}).get("name", "NewsAPI")
-            published = None
-            if item.get("publishedAt"):
-                try:
-                    published = dateparser.parse(item["publishedAt"])
-                except (ValueError, TypeError):
-                    pass
+            summary = (item.get("description") or "")[:SUMMARY_MAX_CHARS]
+            source_name = sys.intern(item.get("source", {}).get("name") or "NewsAPI")
+            published = parse_datetime(item.get("publishedAt") or "")
 
-            articles.append(Article(
+            count += 1
+            yield Article(
                 title=title,
                 link=link,
                 source=source_name,
                 summary=summary,
                 published=published,
-            ))
+            )
 
-        logger.info("NewsAPI: fetched %d articles", len(articles))
-        return articles
+        logger.info("NewsAPI: fetched %d articles", count)
+        if health is not None:
+            health.success("NewsAPI", time.monotonic() - t0)
 
-    except Exception:
+    except Exception as exc:
         logger.exception("Failed to fetch from NewsAPI")
-        return []
+        if health is not None:
+            health.failure("NewsAPI", exc, time.monotonic() - t0)
+
+
+def fetch_newsapi_articles(config: dict, api_key: str) -> list[Article]:
+    """Fetch articles from NewsAPI.org.
+
+    Args:
+        config: NewsAPI section from config.yaml (query, language, sort_by).
+        api_key: NewsAPI API key from environment.
+
+    Returns:
+        List of Article objects.
+    """
+    return list(iter_newsapi_articles(config, api_key))
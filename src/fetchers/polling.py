@@ -0,0 +1,205 @@
+"""Adaptive per-source polling based on how often each source publishes.
+
+Each RSS feed and scrape target keeps statistics across runs: an
+exponentially weighted estimate of new items per hour, when it last
+changed, its error rate and its HTTP validators (ETag / Last-Modified).
+A source is polled when it is likely to have something new, i.e. the
+chance of at least one new item since the last poll (Poisson with the
+estimated rate) reaches ``min_probability``, or when it has not been
+polled for ``max_staleness_hours``. New or failing sources are always
+polled.
+
+A source that is skipped or answers 304 replays the articles of its last
+successful poll, so its still-fresh articles stay in the digest whether or
+not it happened to update.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from src.models import Article
+
+logger = logging.getLogger(__name__)
+
+_SEEN_LIMIT = 300
+
+
+def _link_hash(link: str) -> str:
+    return hashlib.sha1(link.encode()).hexdigest()[:12]
+
+
+@dataclass
+class SourceStats:
+    polls: int = 0
+    rate: float | None = None      # new items per hour (EWMA); None until the second poll
+    error_rate: float = 0.0        # EWMA of failed polls
+    failed: bool = False           # last poll failed
+    last_poll: float = 0.0
+    last_change: float = 0.0
+    etag: str | None = None
+    modified: str | None = None
+    seen: list[str] = field(default_factory=list)  # hashes of recent links, newest last
+    # (title, link, source, summary, ISO published) of the last successful poll, for replay
+    articles: list[list] = field(default_factory=list)
+
+
+class PollScheduler:
+    """Decides which sources to poll this run and learns from the results.
+
+    Thread-safe: RSS and scraper fetchers observe from different threads.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        enabled: bool = True,
+        max_staleness_hours: float = 6.0,
+        min_probability: float = 0.5,
+        alpha: float = 0.3,
+    ) -> None:
+        self.path = Path(path)
+        self.enabled = enabled
+        self.max_staleness = max_staleness_hours * 3600
+        self.min_probability = min_probability
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._polled = 0
+        self._skipped = 0
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            self._stats = {name: SourceStats(**s) for name, s in raw.items()}
+        except (OSError, ValueError, TypeError):
+            self._stats: dict[str, SourceStats] = {}
+
+    def _get(self, name: str) -> SourceStats:
+        return self._stats.setdefault(name, SourceStats())
+
+    def due(self, name: str, now: float | None = None) -> bool:
+        """Whether ``name`` should be polled this run."""
+        if not self.enabled:
+            return True
+        now = now or time.time()
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None or stats.rate is None or stats.failed:
+                due = True
+            else:
+                elapsed = now - stats.last_poll
+                chance = 1 - math.exp(-stats.rate * elapsed / 3600)
+                due = elapsed >= self.max_staleness or chance >= self.min_probability
+            if due:
+                self._polled += 1
+            else:
+                self._skipped += 1
+        if not due:
+            logger.debug("Polling: skipping %s (%.2f new/h)", name, stats.rate)
+        return due
+
+    def validators(self, name: str) -> tuple[str | None, str | None]:
+        """(ETag, Last-Modified) from the source's last successful poll.
+
+        Only used when adaptive polling is enabled: a 304 means the run gets
+        no articles from that source, which is the point of skipping it.
+        """
+        if not self.enabled:
+            return None, None
+        with self._lock:
+            stats = self._stats.get(name)
+            return (stats.etag, stats.modified) if stats else (None, None)
+
+    def observe(
+        self,
+        name: str,
+        links: Iterable[str] = (),
+        *,
+        error: bool = False,
+        not_modified: bool = False,
+        etag: str | None = None,
+        modified: str | None = None,
+        now: float | None = None,
+    ) -> int:
+        """Record one poll of ``name``.
+
+        Args:
+            name: Source name.
+            links: Article links the source returned.
+            error: The poll failed.
+            not_modified: The source answered 304; counts as zero new items.
+            etag: ETag to send next time.
+            modified: Last-Modified to send next time.
+            now: Poll time (defaults to now).
+
+        Returns:
+            Number of links not seen in earlier polls.
+        """
+        now = now or time.time()
+        with self._lock:
+            stats = self._get(name)
+            stats.polls += 1
+            stats.failed = error
+            stats.error_rate += self.alpha * (float(error) - stats.error_rate)
+            if error:
+                return 0
+
+            seen = set(stats.seen)
+            fresh = [] if not_modified else [h for h in dict.fromkeys(map(_link_hash, links)) if h not in seen]
+            if stats.last_poll:
+                hours = max((now - stats.last_poll) / 3600, 1 / 60)
+                observed = len(fresh) / hours
+                stats.rate = observed if stats.rate is None else stats.rate + self.alpha * (observed - stats.rate)
+            if fresh:
+                stats.last_change = now
+                stats.seen = (stats.seen + fresh)[-_SEEN_LIMIT:]
+            stats.last_poll = now
+            if etag or modified or not not_modified:
+                stats.etag, stats.modified = etag, modified
+            return len(fresh)
+
+    def remember(self, name: str, articles: list[Article]) -> None:
+        """Keep the articles of a successful poll to replay while the source is skipped."""
+        if not self.enabled:
+            return
+        rows = [
+            [a.title, a.link, a.source, a.summary, a.published.isoformat() if a.published else None]
+            for a in articles
+        ]
+        with self._lock:
+            self._get(name).articles = rows
+
+    def replay(self, name: str) -> list[Article]:
+        """Articles from ``name``'s last successful poll (empty if none kept)."""
+        with self._lock:
+            stats = self._stats.get(name)
+            rows = list(stats.articles) if stats else []
+        return [
+            Article(title, link, source, summary, datetime.fromisoformat(published) if published else None)
+            for title, link, source, summary, published in rows
+        ]
+
+    def save(self) -> None:
+        with self._lock:
+            data = {name: asdict(s) for name, s in self._stats.items()}
+            polled, skipped = self._polled, self._skipped
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+        if self.enabled:
+            logger.info("Polling: %d sources polled, %d skipped as unlikely to have news", polled, skipped)
+
+    def track(self, stream: Iterable) -> Iterator:
+        """Pass the fetch stream through, saving the statistics once it ends."""
+        try:
+            yield from stream
+        finally:
+            self.save()
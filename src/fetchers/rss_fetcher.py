@@ -3,38 +3,39 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future
+from datetime import datetime
 
 import feedparser
-from dateutil import parser as dateparser
+import requests
 
+from src import cpu_pool
+from src.dates import from_struct_time, parse_datetime
+from src.fetchers import SOURCE_RETRY, SOURCE_TIMEOUT, SUMMARY_MAX_CHARS, create_session
+from src.fetchers.health import SourceHealth
+from src.fetchers.polling import PollScheduler
 from src.models import Article
 
 logger = logging.getLogger(__name__)
 
-_USER_AGENT = (
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) "
-    "Chrome/120.0.0.0 Safari/537.36"
-)
+_session = create_session(SOURCE_RETRY)
 
 
 def _parse_date(entry: dict) -> datetime | None:
+    # feedparser has already parsed the date into a UTC struct_time
+    for key in ("published_parsed", "updated_parsed"):
+        parsed = from_struct_time(entry.get(key))
+        if parsed:
+            return parsed
     for key in ("published", "updated"):
         raw = entry.get(key)
         if raw:
-            try:
-                return dateparser.parse(raw)
-            except (ValueError, TypeError):
-                pass
-    # feedparser's parsed struct_time
-    for key in ("published_parsed", "updated_parsed"):
-        st = entry.get(key)
-        if st:
-            try:
-                return datetime(*st[:6], tzinfo=timezone.utc)
-            except (TypeError, ValueError):
-                pass
+            parsed = parse_datetime(raw)
+            if parsed:
+                return parsed
     return None
 
 
@@ -45,6 +46,136 @@ def _strip_html(text: str) -> str:
     return BeautifulSoup(text, "lxml").get_text(separator=" ", strip=True)
 
 
+def _download(url: str, etag: str | None, modified: str | None) -> requests.Response:
+    """GET a feed with the source timeout (feedparser's own fetcher has none)."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    resp = _session.get(url, headers=headers, timeout=SOURCE_TIMEOUT)
+    if resp.status_code != 304:
+        resp.raise_for_status()
+    return resp
+
+
+def parse_feed(content: bytes, url: str, content_type: str = "") -> list[tuple[str, str, str, datetime | None]]:
+    """Parse feed bytes into compact ``(title, link, summary, published)`` rows.
+
+    Depends only on its arguments, so it can run in a ``cpu_pool`` worker.
+
+    Raises:
+        ValueError: If the payload is not a usable feed.
+    """
+    feed = feedparser.parse(content, response_headers={
+        "content-location": url,
+        "content-type": content_type,
+    })
+    if feed.bozo and not feed.entries:
+        raise ValueError(f"unparsable feed: {feed.bozo_exception}")
+
+    rows = []
+    for entry in feed.entries:
+        title = entry.get("title", "").strip()
+        link = entry.get("link", "").strip()
+        if not title or not link:
+            continue
+        summary_raw = entry.get("summary", "") or entry.get("description", "")
+        rows.append((title, link, _strip_html(summary_raw)[:SUMMARY_MAX_CHARS], _parse_date(entry)))
+    return rows
+
+
+def iter_rss_feeds(
+    feed_urls: dict[str, str],
+    poller: PollScheduler | None = None,
+    health: SourceHealth | None = None,
+) -> Iterator[Article]:
+    """Yield articles from multiple RSS feeds.
+
+    Feeds are downloaded one at a time. Parsing runs inline, or in the
+    ``cpu_pool`` when it is enabled, in which case the next downloads
+    proceed while earlier feeds are parsed and articles are yielded as
+    each feed finishes.
+
+    Args:
+        feed_urls: Mapping of source name to RSS URL.
+        poller: Optional scheduler; feeds it does not consider due are
+            skipped, and the rest are fetched conditionally (ETag /
+            Last-Modified) and reported back to it. Skipped and unchanged
+            feeds replay their last polled articles.
+        health: Optional circuit breakers; feeds with an open breaker are
+            skipped and every poll's outcome is recorded.
+
+    Yields:
+        Article objects.
+    """
+    pending: deque[tuple[str, float, requests.Response, Future]] = deque()
+    max_pending = 2 * max(cpu_pool.workers(), 1)
+
+    def _failed(name: str, t0: float, exc: Exception) -> None:
+        if isinstance(exc, (requests.RequestException, ValueError)):
+            logger.warning("Failed to fetch RSS feed %s (%s): %s", name, feed_urls[name], exc)
+        else:
+            logger.error("Failed to fetch RSS feed %s (%s)", name, feed_urls[name], exc_info=exc)
+        if poller is not None:
+            poller.observe(name, error=True)
+        if health is not None:
+            health.failure(name, exc, time.monotonic() - t0)
+
+    def _finish(name: str, t0: float, resp: requests.Response, parsed: Future) -> Iterator[Article]:
+        try:
+            rows = parsed.result()
+        except Exception as exc:
+            _failed(name, t0, exc)
+            return
+        articles = [
+            Article(title=title, link=link, source=name, summary=summary, published=published)
+            for title, link, summary, published in rows
+        ]
+        yield from articles
+        logger.info("RSS %s: fetched %d entries", name, len(rows))
+        if poller is not None:
+            poller.remember(name, articles)
+            poller.observe(
+                name, [row[1] for row in rows],
+                etag=resp.headers.get("ETag"), modified=resp.headers.get("Last-Modified"),
+            )
+        if health is not None:
+            health.success(name, time.monotonic() - t0)
+
+    for name, url in feed_urls.items():
+        if health is not None and not health.allow(name):
+            continue
+        if poller is not None and not poller.due(name):
+            yield from poller.replay(name)
+            continue
+        t0 = time.monotonic()
+        try:
+            etag, modified = poller.validators(name) if poller is not None else (None, None)
+            resp = _download(url, etag, modified)
+        except Exception as exc:
+            _failed(name, t0, exc)
+            continue
+        if resp.status_code == 304:
+            logger.info("RSS %s: not modified", name)
+            if poller is not None:
+                poller.observe(name, not_modified=True, etag=etag, modified=modified)
+                yield from poller.replay(name)
+            if health is not None:
+                health.success(name, time.monotonic() - t0)
+            continue
+
+        pending.append((
+            name, t0, resp,
+            cpu_pool.submit(parse_feed, resp.content, resp.url, resp.headers.get("Content-Type", "")),
+        ))
+        while pending and (pending[0][3].done() or len(pending) > max_pending):
+            yield from _finish(*pending.popleft())
+
+    while pending:
+        yield from _finish(*pending.popleft())
+
+
 def fetch_rss_feeds(feed_urls: dict[str, str]) -> list[Article]:
     """Fetch articles from multiple RSS feeds.
 
@@ -54,35 +185,4 @@ def fetch_rss_feeds(feed_urls: dict[str, str]) -> list[Article]:
     Returns:
         List of Article objects.
     """
-    articles: list[Article] = []
-
-    for name, url in feed_urls.items():
-        try:
-            feed = feedparser.parse(url, agent=_USER_AGENT)
-            if feed.bozo and not feed.entries:
-                logger.warning("RSS feed %s (%s) failed: %s", name, url, feed.bozo_exception)
-                continue
-
-            for entry in feed.entries:
-                title = entry.get("title", "").strip()
-                link = entry.get("link", "").strip()
-                if not title or not link:
-                    continue
-
-                summary_raw = entry.get("summary", "") or entry.get("description", "")
-                summary = _strip_html(summary_raw)[:500]
-
-                articles.append(Article(
-                    title=title,
-                    link=link,
-                    source=name,
-                    summary=summary,
-                    published=_parse_date(entry),
-                ))
-
-            logger.info("RSS %s: fetched %d entries", name, len(feed.entries))
-
-        except Exception:
-            logger.exception("Failed to fetch RSS feed %s (%s)", name, url)
-
-    return articles
+    return list(iter_rss_feeds(feed_urls))
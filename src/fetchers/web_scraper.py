@@ -4,18 +4,23 @@ from __future__ import annotations
 
 import logging
 import time
+from collections.abc import Iterator
 from datetime import datetime, timezone
 from urllib.parse import urljoin
 
+import requests
 from bs4 import BeautifulSoup
+from requests.compat import chardet
 
-from src.fetchers import create_session
+from src import cpu_pool
+from src.fetchers import SOURCE_RETRY, SOURCE_TIMEOUT, SUMMARY_MAX_CHARS, create_session
+from src.fetchers.health import SourceHealth
+from src.fetchers.polling import PollScheduler
 from src.models import Article
 
 logger = logging.getLogger(__name__)
 
-_session = create_session()
-_TIMEOUT = 15
+_session = create_session(SOURCE_RETRY)
 
 
 # ---------------------------------------------------------------------------
@@ -29,7 +34,7 @@ def _fetch_anue(target: dict) -> list[Article]:
         return []
 
     params = {"limit": 30}
-    resp = _session.get(api_url, params=params, timeout=_TIMEOUT)
+    resp = _session.get(api_url, params=params, timeout=SOURCE_TIMEOUT)
     resp.raise_for_status()
     data = resp.json()
 
@@ -39,7 +44,7 @@ def _fetch_anue(target: dict) -> list[Article]:
         title = item.get("title", "").strip()
         news_id = item.get("newsId", "")
         link = f"https://news.cnyes.com/news/id/{news_id}" if news_id else ""
-        summary = item.get("summary", "")[:500]
+        summary = (item.get("summary") or "")[:SUMMARY_MAX_CHARS]
         pub_ts = item.get("publishAt")
         published = datetime.fromtimestamp(pub_ts, tz=timezone.utc) if pub_ts else None
 
@@ -60,6 +65,29 @@ def _fetch_anue(target: dict) -> list[Article]:
 # Generic HTML scraper (CTEE, etc.)
 # ---------------------------------------------------------------------------
 
+def parse_listing(content: bytes, url: str, title_sel: str, link_sel: str) -> list[tuple[str, str]]:
+    """Extract ``(title, absolute link)`` rows from a listing page.
+
+    Depends only on its arguments, so it can run in a ``cpu_pool`` worker.
+    """
+    # Same detection as requests' apparent_encoding; handles Big5/UTF-8 correctly
+    encoding = chardet.detect(content)["encoding"] or "utf-8"
+    soup = BeautifulSoup(content.decode(encoding, errors="replace"), "lxml")
+
+    rows = []
+    for elem in soup.select(title_sel)[:30]:
+        title = elem.get_text(strip=True)
+        # If link_selector is same as title_selector, get href from same element
+        href = elem.get("href", "")
+        if not href and link_sel and link_sel != title_sel:
+            link_elem = elem.find_parent().select_one(link_sel)
+            href = link_elem.get("href", "") if link_elem else ""
+
+        if title and href:
+            rows.append((title, urljoin(url, href)))
+    return rows
+
+
 def _scrape_html(target: dict) -> list[Article]:
     name = target.get("name", "unknown")
     url = target.get("url", "")
@@ -70,36 +98,15 @@ def _scrape_html(target: dict) -> list[Article]:
         logger.warning("Scrape target %s missing url or title_selector", name)
         return []
 
-    resp = _session.get(url, timeout=_TIMEOUT)
+    resp = _session.get(url, timeout=SOURCE_TIMEOUT)
     if resp.status_code != 200:
-        logger.warning("Scrape %s returned HTTP %d, skipping", name, resp.status_code)
-        return []
-    resp.encoding = resp.apparent_encoding  # handle Big5/UTF-8 correctly
-
-    soup = BeautifulSoup(resp.text, "lxml")
-    title_elems = soup.select(title_sel)
-
-    articles: list[Article] = []
-    for elem in title_elems[:30]:
-        title = elem.get_text(strip=True)
-        # If link_selector is same as title_selector, get href from same element
-        href = elem.get("href", "")
-        if not href and link_sel and link_sel != title_sel:
-            link_elem = elem.find_parent().select_one(link_sel)
-            href = link_elem.get("href", "") if link_elem else ""
-
-        if not title or not href:
-            continue
-
-        link = urljoin(url, href)
-        articles.append(Article(
-            title=title,
-            link=link,
-            source=name,
-            summary="",
-            published=None,
-        ))
+        raise requests.HTTPError(f"HTTP {resp.status_code}", response=resp)
 
+    rows = cpu_pool.run(parse_listing, resp.content, url, title_sel, link_sel)
+    articles = [
+        Article(title=title, link=link, source=name, summary="", published=None)
+        for title, link in rows
+    ]
     logger.info("Scrape %s: fetched %d articles", name, len(articles))
     return articles
 
@@ -108,26 +115,63 @@ def _scrape_html(target: dict) -> list[Article]:
 # Public entry point
 # ---------------------------------------------------------------------------
 
-def scrape_news_sites(targets: list[dict]) -> list[Article]:
-    """Scrape articles from all configured web targets.
+def iter_news_sites(
+    targets: list[dict],
+    poller: PollScheduler | None = None,
+    health: SourceHealth | None = None,
+) -> Iterator[Article]:
+    """Yield scraped articles target by target.
 
     Args:
         targets: List of target config dicts from config.yaml.
-
-    Returns:
-        List of Article objects.
+        poller: Optional scheduler; targets it does not consider due are
+            skipped (replaying their last polled articles), and the rest
+            are reported back to it.
+        health: Optional circuit breakers; targets with an open breaker
+            are skipped and every poll's outcome is recorded.
+
+    Yields:
+        Article objects.
     """
-    all_articles: list[Article] = []
-
+    fetched = 0
     for target in targets:
+        name = target.get("name", "unknown")
+        if health is not None and not health.allow(name):
+            continue
+        if poller is not None and not poller.due(name):
+            yield from poller.replay(name)
+            continue
+        if fetched:
+            time.sleep(1)  # polite delay between targets
+        fetched += 1
+        t0 = time.monotonic()
         try:
-            if target.get("use_api"):
-                all_articles.extend(_fetch_anue(target))
+            articles = _fetch_anue(target) if target.get("use_api") else _scrape_html(target)
+        except Exception as exc:
+            if isinstance(exc, requests.RequestException):
+                logger.warning("Failed to scrape %s: %s", name, exc)
             else:
-                all_articles.extend(_scrape_html(target))
-        except Exception:
-            logger.exception("Failed to scrape %s", target.get("name", "unknown"))
+                logger.exception("Failed to scrape %s", name)
+            if poller is not None:
+                poller.observe(name, error=True)
+            if health is not None:
+                health.failure(name, exc, time.monotonic() - t0)
+            continue
+        if poller is not None:
+            poller.remember(name, articles)
+            poller.observe(name, [a.link for a in articles])
+        if health is not None:
+            health.success(name, time.monotonic() - t0)
+        yield from articles
+
+
+def scrape_news_sites(targets: list[dict]) -> list[Article]:
+    """Scrape articles from all configured web targets.
 
-        time.sleep(1)  # polite delay between targets
+    Args:
+        targets: List of target config dicts from config.yaml.
 
-    return all_articles
+    Returns:
+        List of Article objects.
+    """
+    return list(iter_news_sites(targets))
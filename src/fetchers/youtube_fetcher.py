@@ -3,15 +3,27 @@
 from __future__ import annotations
 
 import logging
+import re
 from datetime import datetime, timedelta, timezone
 
-from dateutil import parser as dateparser
 from googleapiclient.discovery import build
 
+from src.dates import parse_datetime
 from src.models import Video
 
 logger = logging.getLogger(__name__)
 
+_ISO_DURATION_RE = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+
+
+def _parse_duration(value: str) -> float | None:
+    """Parse an ISO-8601 duration such as ``PT1H02M03S`` into seconds."""
+    m = _ISO_DURATION_RE.fullmatch(value or "")
+    if not m or not any(m.groups()):
+        return None
+    days, hours, minutes, seconds = (int(g or 0) for g in m.groups())
+    return float(((days * 24 + hours) * 60 + minutes) * 60 + seconds)
+
 
 def fetch_channel_videos(
     channel_id: str,
@@ -60,12 +72,7 @@ def fetch_channel_videos(
         snippet = item["snippet"]
         title = snippet.get("title", "").strip()
 
-        published = None
-        if snippet.get("publishedAt"):
-            try:
-                published = dateparser.parse(snippet["publishedAt"])
-            except (ValueError, TypeError):
-                pass
+        published = parse_datetime(snippet.get("publishedAt") or "")
 
         videos.append(Video(
             title=title,
@@ -76,5 +83,23 @@ def fetch_channel_videos(
         ))
 
     videos = videos[:max_videos]
+
+    # Durations let the transcriber split long videos into parallel slices
+    if videos:
+        try:
+            details = (
+                youtube.videos()
+                .list(part="contentDetails", id=",".join(v.video_id for v in videos))
+                .execute()
+            )
+            durations = {
+                item["id"]: _parse_duration(item.get("contentDetails", {}).get("duration", ""))
+                for item in details.get("items", [])
+            }
+            for v in videos:
+                v.duration = durations.get(v.video_id)
+        except Exception:
+            logger.warning("YouTube %s: could not fetch video durations", channel_name)
+
     logger.info("YouTube %s: fetched %d videos (today only, after %s)", channel_name, len(videos), published_after)
     return videos
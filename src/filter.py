@@ -2,87 +2,203 @@
 
 from __future__ import annotations
 
+import heapq
 import logging
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timedelta, timezone
-from urllib.parse import urlparse, urlunparse
+from itertools import islice
 
+import numpy as np
+
+from src import cpu_pool
+from src.canonical import UrlIndex
 from src.models import Article, FilteredArticle
 
 logger = logging.getLogger(__name__)
 
+# Articles scored per matrix product
+_BATCH_SIZE = 2048
+# Smallest slice of a batch worth sending to a worker process
+_MIN_POOL_CHUNK = 256
+
+
+def _fresh_unique(articles: Iterable[Article], stats: dict[str, int]) -> Iterator[Article]:
+    """Drop stale and duplicate articles from a stream.
+
+    Only the canonical URL index is retained; articles themselves pass
+    straight through. Counters are accumulated into ``stats``.
+    """
+    # Discard articles older than 2 days (keep those without a publish date)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=2)
+    index = UrlIndex()
+    for art in articles:
+        stats["total"] += 1
+        if art.published and art.published.tzinfo and art.published < cutoff:
+            stats["stale"] += 1
+            continue
+
+        # Deduplicate by canonical URL
+        if not index.add(art.link):
+            continue
+        stats["unique"] += 1
+        yield art
+
+
+def _article_text(art: Article) -> str:
+    return f"{art.title} {art.summary}".lower()
+
+
+class KeywordScorer:
+    """Substring keyword weights, all profiles scored by one matrix product.
+
+    Each batch is matched once against the union of all profiles' keywords
+    (an articles × keywords 0/1 matrix) and multiplied by the keywords ×
+    profiles weight matrix.
+    """
+
+    def __init__(self, profiles: list[dict]) -> None:
+        vocab: dict[str, int] = {}
+        for profile in profiles:
+            for kw in profile["keywords"]:
+                vocab.setdefault(kw, len(vocab))
+        self._lowered = [kw.lower() for kw in vocab]
+
+        self._weights = np.zeros((len(vocab), len(profiles)), dtype=np.float64)
+        for p, profile in enumerate(profiles):
+            for kw, weight in profile["keywords"].items():
+                self._weights[vocab[kw], p] = weight
+        self.thresholds = np.array([profile["min_score"] for profile in profiles], dtype=np.float64)
+
+    def score(self, batch: list[Article]) -> np.ndarray:
+        """Return the articles × profiles score matrix for ``batch``.
+
+        With the ``cpu_pool`` enabled, keyword matching is split across its
+        worker processes.
+        """
+        texts = [_article_text(art) for art in batch]
+        workers = cpu_pool.workers()
+        if workers > 1 and len(texts) >= 2 * _MIN_POOL_CHUNK:
+            size = max(_MIN_POOL_CHUNK, -(-len(texts) // workers))
+            futures = [
+                cpu_pool.submit(_match_matrix, texts[i:i + size], self._lowered)
+                for i in range(0, len(texts), size)
+            ]
+            matches = np.vstack([f.result() for f in futures])
+        else:
+            matches = _match_matrix(texts, self._lowered)
+        return matches @ self._weights
 
-def _normalize_url(url: str) -> str:
-    """Strip query params and trailing slash for deduplication."""
-    parsed = urlparse(url)
-    return urlunparse((parsed.scheme, parsed.netloc, parsed.path.rstrip("/"), "", "", ""))
+
+def _match_matrix(texts: list[str], keywords: list[str]) -> np.ndarray:
+    """texts × keywords 0/1 substring matrix (compact uint8, cheap to send back)."""
+    matches = np.zeros((len(texts), len(keywords)), dtype=np.uint8)
+    for row, text in enumerate(texts):
+        for col, kw in enumerate(keywords):
+            if kw in text:
+                matches[row, col] = 1
+    return matches
+
+
+def rank_profiles(
+    articles: Iterable[Article],
+    profiles: list[dict],
+    scorer=None,
+) -> dict[str, list[FilteredArticle]]:
+    """Filter and rank one article stream for several digest profiles at once.
+
+    Articles are scored in batches by ``scorer`` (keyword weights by
+    default, see :class:`KeywordScorer`), which returns one column per
+    profile. Every profile keeps only its best ``max_articles`` in a
+    bounded heap, so memory stays independent of the stream length.
+
+    Args:
+        articles: Raw articles from all fetchers (any iterable).
+        profiles: Profile dicts with ``name``, ``keywords`` (keyword-to-weight
+            mapping), ``min_score`` and ``max_articles``.
+        scorer: Object with ``score(batch) -> ndarray`` (articles × profiles)
+            and a per-profile ``thresholds`` array, e.g.
+            :class:`src.ranking.Bm25Scorer`.
+
+    Returns:
+        Profile name to ranked articles, highest score first. Ties keep
+        arrival order.
+    """
+    if scorer is None:
+        scorer = KeywordScorer(profiles)
+    thresholds = scorer.thresholds
+
+    stats = {"total": 0, "stale": 0, "unique": 0}
+    passed = [0] * len(profiles)
+    # Per-profile min-heap of (score, -seq, article); the root is the weakest
+    # entry, and among equal scores the latest arrival is evicted first.
+    heaps: list[list[tuple[float, int, Article]]] = [[] for _ in profiles]
+
+    stream = _fresh_unique(articles, stats)
+    seq = 0
+    while batch := list(islice(stream, _BATCH_SIZE)):
+        scores = scorer.score(batch)
+
+        for p, profile in enumerate(profiles):
+            heap = heaps[p]
+            cap = profile["max_articles"]
+            for row in np.flatnonzero(scores[:, p] >= thresholds[p]):
+                passed[p] += 1
+                entry = (float(scores[row, p]), -(seq + int(row)), batch[row])
+                if len(heap) < cap:
+                    heapq.heappush(heap, entry)
+                elif cap > 0 and entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+        seq += len(batch)
+
+    logger.info("Total fetched: %d articles", stats["total"])
+    if stats["stale"]:
+        logger.info("Dropped %d stale articles (older than 2 days)", stats["stale"])
+    logger.info("Dedup: %d -> %d unique articles", stats["total"] - stats["stale"], stats["unique"])
+
+    results: dict[str, list[FilteredArticle]] = {}
+    for p, profile in enumerate(profiles):
+        # Sort by score descending (arrival order for ties)
+        heap = sorted(heaps[p], key=lambda e: e[:2], reverse=True)
+        keywords = [(kw, kw.lower()) for kw, w in profile["keywords"].items() if w]
+        ranked: list[FilteredArticle] = []
+        for score, _, art in heap:
+            text = _article_text(art)
+            matched = tuple(kw for kw, kw_lower in keywords if kw_lower in text)
+            ranked.append(FilteredArticle(article=art, score=score, matched_keywords=matched))
+        results[profile["name"]] = ranked
+        logger.info(
+            "Filter [%s]: %d articles passed (threshold=%g), kept top %d",
+            profile["name"], passed[p], thresholds[p], len(ranked),
+        )
+    return results
 
 
 def filter_and_rank(
-    articles: list[Article],
+    articles: Iterable[Article],
     keywords: dict[str, int],
     threshold: int,
     max_articles: int,
 ) -> list[FilteredArticle]:
     """Filter articles by keyword score and return ranked results.
 
+    Single-profile form of :func:`rank_profiles`: articles are consumed as
+    a stream and only the best ``max_articles`` are kept.
+
     Args:
-        articles: Raw articles from all fetchers.
+        articles: Raw articles from all fetchers (any iterable, e.g. a
+            generator from ``merge_streams``).
         keywords: Keyword-to-weight mapping from config.
         threshold: Minimum score to pass filter.
         max_articles: Maximum number of articles to return.
 
     Returns:
-        Filtered and ranked articles, highest score first.
+        Filtered and ranked articles, highest score first. Ties keep
+        arrival order.
     """
-    # Discard articles older than 2 days (keep those without a publish date)
-    cutoff = datetime.now(timezone.utc) - timedelta(days=2)
-    fresh: list[Article] = []
-    stale_count = 0
-    for art in articles:
-        if art.published and art.published.tzinfo and art.published < cutoff:
-            stale_count += 1
-        else:
-            fresh.append(art)
-    if stale_count:
-        logger.info("Dropped %d stale articles (older than 2 days)", stale_count)
-
-    # Deduplicate by normalized URL
-    seen_urls: set[str] = set()
-    unique: list[Article] = []
-    for art in fresh:
-        norm = _normalize_url(art.link)
-        if norm not in seen_urls:
-            seen_urls.add(norm)
-            unique.append(art)
-
-    logger.info("Dedup: %d -> %d unique articles", len(fresh), len(unique))
-
-    # Score each article
-    results: list[FilteredArticle] = []
-    for art in unique:
-        text = f"{art.title} {art.summary}".lower()
-        matched: list[str] = []
-        score = 0.0
-
-        for kw, weight in keywords.items():
-            if kw.lower() in text:
-                matched.append(kw)
-                score += weight
-
-        if score >= threshold:
-            results.append(FilteredArticle(
-                title=art.title,
-                link=art.link,
-                source=art.source,
-                summary=art.summary,
-                published=art.published,
-                score=score,
-                matched_keywords=matched,
-            ))
-
-    # Sort by score descending, then truncate
-    results.sort(key=lambda a: a.score, reverse=True)
-    results = results[:max_articles]
-
-    logger.info("Filter: %d articles passed (threshold=%d)", len(results), threshold)
-    return results
+    profile = {
+        "name": "default",
+        "keywords": keywords,
+        "min_score": threshold,
+        "max_articles": max_articles,
+    }
+    return rank_profiles(articles, [profile])["default"]
@@ -0,0 +1,422 @@
+"""SQLite job queue with leases and heartbeats, for sharding a run across workers.
+
+``main --enqueue`` adds one job per news ranking, per profile digest and per
+YouTube show; any number of ``main --worker`` processes (on one machine, or
+several sharing ``data_dir``) claim and run them. A claimed job holds a
+lease that its worker's heartbeat keeps extending; if the worker dies, the
+lease expires and another worker picks the job up.
+
+Emails go through :meth:`JobQueue.deliver`, keyed by an idempotency key, so
+a job retried after a crash does not resend what was already delivered.
+
+Work shared by several jobs (a video two shows both need) is claimed with
+:meth:`JobQueue.lease_work`, so only one worker computes it while the
+others wait for its result.
+
+CLI:
+    python -m src.jobqueue status
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    depends_on TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    owner TEXT,
+    lease_expires REAL,
+    error TEXT,
+    created REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status);
+
+CREATE TABLE IF NOT EXISTS deliveries (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    lease_expires REAL NOT NULL,
+    sent_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS shared_work (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    lease_expires REAL NOT NULL
+);
+"""
+
+
+# JobQueue.deliver outcomes
+SENT = "sent"            # this call sent the email
+DELIVERED = "delivered"  # an earlier call already sent it
+BUSY = "busy"            # another worker holds a live lease on it
+
+
+class LeaseLost(RuntimeError):
+    """This worker's job lease was taken over by another worker."""
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass(slots=True)
+class Job:
+    id: int
+    key: str
+    kind: str
+    payload: dict
+    attempts: int
+
+
+class JobQueue:
+    """Queue file shared by the enqueuer and all workers; one instance per process."""
+
+    def __init__(self, path: str | Path, lease_seconds: float = 300.0) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self._conn = self._connect()
+        self._conn.executescript(_SCHEMA)
+        self._lost: threading.Event | None = None  # set when the running job's lease is lost
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def _tx(self, conn: sqlite3.Connection | None = None) -> Iterator[sqlite3.Connection]:
+        """Write transaction that takes the lock up front, so claims never race."""
+        conn = conn or self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # --- Producer side ---
+
+    def enqueue(
+        self,
+        key: str,
+        kind: str,
+        payload: dict,
+        depends_on: str | None = None,
+        max_attempts: int = 3,
+    ) -> bool:
+        """Add a job unless ``key`` already exists; a failed job is requeued.
+
+        Returns:
+            True if the job was added or requeued.
+        """
+        with self._tx() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO jobs(key, kind, payload, depends_on, max_attempts, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(payload, ensure_ascii=False), depends_on, max_attempts, time.time()),
+            )
+            if cur.rowcount:
+                return True
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, error = NULL "
+                "WHERE key = ? AND status = 'failed'",
+                (key,),
+            )
+            return bool(cur.rowcount)
+
+    # --- Worker side ---
+
+    def claim(self, owner: str) -> Job | None:
+        """Lease the oldest runnable job: queued, or running with an expired lease."""
+        now = time.time()
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'dependency failed', finished = ? "
+                "WHERE status = 'queued' AND depends_on IN (SELECT key FROM jobs WHERE status = 'failed')",
+                (now,),
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired'), finished = ? "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = conn.execute(
+                "SELECT id, key, kind, payload, attempts FROM jobs "
+                "WHERE (status = 'queued' OR (status = 'running' AND lease_expires < ?)) "
+                "AND (depends_on IS NULL OR depends_on IN (SELECT key FROM jobs WHERE status = 'done')) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (owner, now + self.lease_seconds, row["id"]),
+            )
+        return Job(row["id"], row["key"], row["kind"], json.loads(row["payload"]), row["attempts"] + 1)
+
+    def complete(self, job: Job, owner: str) -> None:
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', finished = ?, error = NULL WHERE id = ? AND owner = ?",
+                (time.time(), job.id, owner),
+            )
+
+    def fail(self, job: Job, owner: str, error: str) -> None:
+        """Record a failure; the job is requeued until it runs out of attempts."""
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END, "
+                "error = ?, finished = ?, owner = NULL WHERE id = ? AND owner = ?",
+                (error, time.time(), job.id, owner),
+            )
+
+    def unfinished(self) -> int:
+        """Jobs still queued or running."""
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+        ).fetchone()[0]
+
+    @contextmanager
+    def heartbeat(self, job: Job, owner: str) -> Iterator[threading.Event]:
+        """Keep extending ``job``'s lease while the block runs.
+
+        Yields an event that is set if the lease was lost (another worker
+        took the job over after a stall).
+        """
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def beat() -> None:
+            conn = self._connect()
+            try:
+                while not stop.wait(self.lease_seconds / 3):
+                    with self._tx(conn):
+                        cur = conn.execute(
+                            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'running'",
+                            (time.time() + self.lease_seconds, job.id, owner),
+                        )
+                    if not cur.rowcount:
+                        logger.warning("Queue: lost lease on %s", job.key)
+                        lost.set()
+                        return
+            except Exception:
+                # Without heartbeats the lease will lapse; treat it as lost now
+                logger.exception("Queue: heartbeat for %s failed", job.key)
+                lost.set()
+            finally:
+                conn.close()
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{job.id}", daemon=True)
+        thread.start()
+        try:
+            yield lost
+        finally:
+            stop.set()
+            thread.join()
+
+    def deliver(self, key: str, owner: str, send: Callable[[], None]) -> str:
+        """Run ``send`` at most once per idempotency ``key`` across all workers.
+
+        A delivery is claimed with a lease before sending and marked sent
+        after. If the sender dies between the two, the lease expires and a
+        retry sends again; callers also pass ``key`` as the Message-ID so
+        the mail provider can drop that rare duplicate.
+
+        Returns:
+            :data:`SENT` if this call sent, :data:`DELIVERED` if the key was
+            already delivered, or :data:`BUSY` if another worker holds a live
+            lease on it (it may still be sending, or have died; retry later).
+
+        Raises:
+            LeaseLost: If the running job's lease was lost; the new owner sends.
+        """
+        if self._lost is not None and self._lost.is_set():
+            raise LeaseLost(f"lease lost before delivering {key}")
+        now = time.time()
+        with self._tx() as conn:
+            row = conn.execute(
+                "SELECT status, owner, lease_expires FROM deliveries WHERE key = ?", (key,),
+            ).fetchone()
+            if row is not None and row["status"] == "sent":
+                logger.info("Queue: %s already delivered, skipping", key)
+                return DELIVERED
+            if row is not None and row["owner"] != owner and row["lease_expires"] > now:
+                logger.warning("Queue: %s is being delivered by %s", key, row["owner"])
+                return BUSY
+            conn.execute(
+                "INSERT OR REPLACE INTO deliveries(key, status, owner, lease_expires) VALUES (?, 'sending', ?, ?)",
+                (key, owner, now + self.lease_seconds),
+            )
+        try:
+            send()
+        except BaseException:
+            with self._tx() as conn:
+                conn.execute("DELETE FROM deliveries WHERE key = ? AND owner = ?", (key, owner))
+            raise
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE deliveries SET status = 'sent', sent_at = ? WHERE key = ?", (time.time(), key),
+            )
+        return SENT
+
+    def lease_work(self, key: str, owner: str) -> str:
+        """Try to claim shared work ``key`` for ``owner``.
+
+        Returns:
+            "claimed" if this owner must do the work now (run it inside
+            :meth:`holding`), "done" if some worker already finished it, or
+            "busy" if another worker holds a live lease on it.
+        """
+        now = time.time()
+        with self._tx() as conn:
+            row = conn.execute(
+                "SELECT status, owner, lease_expires FROM shared_work WHERE key = ?", (key,),
+            ).fetchone()
+            if row is not None and row["status"] == "done":
+                return "done"
+            if row is not None and row["owner"] != owner and row["lease_expires"] > now:
+                return "busy"
+            conn.execute(
+                "INSERT OR REPLACE INTO shared_work(key, status, owner, lease_expires) VALUES (?, 'running', ?, ?)",
+                (key, owner, now + self.lease_seconds),
+            )
+        return "claimed"
+
+    @contextmanager
+    def holding(self, key: str, owner: str) -> Iterator[None]:
+        """Keep a :meth:`lease_work` lease alive while the block runs.
+
+        The work is marked done when the block finishes; if it raises, the
+        lease is dropped so another worker (or a retry) can claim it.
+        """
+        stop = threading.Event()
+
+        def beat() -> None:
+            conn = self._connect()
+            try:
+                while not stop.wait(self.lease_seconds / 3):
+                    with self._tx(conn):
+                        conn.execute(
+                            "UPDATE shared_work SET lease_expires = ? WHERE key = ? AND owner = ?",
+                            (time.time() + self.lease_seconds, key, owner),
+                        )
+            finally:
+                conn.close()
+
+        thread = threading.Thread(target=beat, name=f"lease-{key}", daemon=True)
+        thread.start()
+        try:
+            yield
+        except BaseException:
+            with self._tx() as conn:
+                conn.execute("DELETE FROM shared_work WHERE key = ? AND owner = ?", (key, owner))
+            raise
+        finally:
+            stop.set()
+            thread.join()
+        with self._tx() as conn:
+            conn.execute("UPDATE shared_work SET status = 'done' WHERE key = ? AND owner = ?", (key, owner))
+
+    def work(
+        self,
+        handler: Callable[[Job], None],
+        owner: str | None = None,
+        poll_seconds: float = 2.0,
+    ) -> int:
+        """Claim and run jobs until none are queued or running.
+
+        Returns:
+            Number of jobs this worker completed.
+        """
+        owner = owner or worker_id()
+        completed = 0
+        while True:
+            job = self.claim(owner)
+            if job is None:
+                if not self.unfinished():
+                    break
+                time.sleep(poll_seconds)  # waiting on dependencies or other workers' leases
+                continue
+
+            logger.info("Queue: %s running %s (attempt %d)", owner, job.key, job.attempts)
+            t0 = time.monotonic()
+            with self.heartbeat(job, owner) as lost:
+                self._lost = lost
+                try:
+                    handler(job)
+                except Exception as exc:
+                    if lost.is_set():
+                        logger.warning("Queue: %s taken over by another worker, abandoning", job.key)
+                    else:
+                        logger.exception("Queue: %s failed", job.key)
+                        self.fail(job, owner, repr(exc))
+                    continue
+                finally:
+                    self._lost = None
+            if lost.is_set():
+                logger.warning("Queue: %s finished after its lease was lost, not completing it", job.key)
+                continue
+            self.complete(job, owner)
+            completed += 1
+            logger.info("Queue: %s done in %.1fs", job.key, time.monotonic() - t0)
+        logger.info("Queue: worker %s finished, %d jobs completed", owner, completed)
+        return completed
+
+    def status(self) -> list[sqlite3.Row]:
+        return self._conn.execute(
+            "SELECT key, kind, status, attempts, owner, error FROM jobs ORDER BY id"
+        ).fetchall()
+
+
+def _cli(argv: list[str] | None = None) -> None:
+    from src import config
+
+    parser = argparse.ArgumentParser(prog="python -m src.jobqueue", description=__doc__.split("\n")[0])
+    parser.add_argument("--db", default=str(config.QUEUE_PATH), help="queue file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="list jobs")
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(args.db)
+    try:
+        for row in queue.status():
+            error = f"  {row['error']}" if row["error"] else ""
+            print(f"{row['status']:<8} {row['attempts']}  {row['key']}  {row['owner'] or ''}{error}")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    _cli()
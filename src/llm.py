@@ -0,0 +1,485 @@
+"""Gemini call layer: per-call deadlines, fallback tiers, hedged requests and context caching."""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from google import genai
+from google.genai import errors, types
+
+from src import config, usage
+
+logger = logging.getLogger(__name__)
+
+# Successful latencies kept per model for the hedging percentile
+_LATENCY_WINDOW = 200
+
+# Per-purpose deadlines used unless config.yaml overrides them; Gemini STT of
+# a long slice can take many minutes
+_DEFAULT_DEADLINES = {"transcription": 1800.0, "video_summary": 600.0}
+
+# CJK ideographs, kana, hangul and full-width forms: roughly one token each
+_CJK_RE = re.compile(r"[\u3000-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+
+# Reference text used to calibrate the local estimate against the model
+_CALIBRATION_SAMPLE = (
+    "台積電（2330.TW）公布上月營收，受惠 AI 伺服器與 CoWoS 先進封裝需求，"
+    "年增 35%。Fed officials signaled that rate cuts remain on the table "
+    "as inflation cools, while new tariff proposals weigh on semiconductor stocks."
+)
+
+# Gemini bills video input per second: ~263 tokens of frames (default media
+# resolution, 1 fps) plus 32 of audio
+MEDIA_TOKENS_PER_SECOND = 295
+
+# Statuses meaning a cached context expired or was evicted (anything else,
+# e.g. 429 or 400, goes to the tier / fallback logic)
+_CACHE_GONE = frozenset({403, 404})
+
+
+class DeadlineExceeded(TimeoutError):
+    """A tier did not answer within its deadline."""
+
+
+@dataclass(slots=True)
+class CallRecord:
+    """Outcome of one routed call."""
+
+    purpose: str
+    model: str
+    latency: float
+    ok: bool
+    hedged: bool = False
+    attempts: int = 1
+    error: str = ""
+    cache: str = ""  # "hit", "miss" (registered by this call), "inline" or "" (no shared prefix)
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0  # including thinking tokens
+
+
+@dataclass(slots=True)
+class _Reply:
+    text: str
+    model: str
+    cache: str
+    prompt_tokens: int
+    cached_tokens: int
+    output_tokens: int
+
+
+class ModelRouter:
+    """Route Gemini calls through a primary model and cheaper fallback tiers.
+
+    Each tier gets ``deadline`` seconds, or the purpose's entry in
+    ``deadlines`` (transcription and video summaries have longer defaults).
+    If it fails, times out or returns no text, the next tier is tried. With
+    hedging enabled, a tier that runs past the ``hedge_percentile`` of its
+    recent latencies gets a second, concurrent request to ``hedge_model``
+    (default: the next tier), and the first good answer wins.
+
+    A ``system_instruction`` shared across calls (format rules, category
+    lists, the show's summary prompt) is registered once per model as an
+    explicit cached context when caching is enabled and it is long enough;
+    calls then send only their variable part. Shorter prefixes are sent
+    inline as the system instruction, where implicit caching may still
+    apply. Cached prompt tokens are recorded per call either way.
+    """
+
+    def __init__(
+        self,
+        fallback_models: list[str] | tuple[str, ...] = (),
+        deadline: float = 120.0,
+        deadlines: dict[str, float] | None = None,
+        hedge: bool = False,
+        hedge_model: str | None = None,
+        hedge_percentile: float = 0.9,
+        hedge_min_samples: int = 10,
+        hedge_after: float = 30.0,
+        base_url: str = "",
+        max_workers: int = 16,
+        cache: bool = False,
+        cache_ttl: int = 900,
+        cache_min_tokens: int = 1024,
+    ):
+        self.fallback_models = list(fallback_models)
+        self.deadline = deadline
+        self.deadlines = {**_DEFAULT_DEADLINES, **(deadlines or {})}
+        self.hedge = hedge
+        self.hedge_model = hedge_model
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_after = hedge_after
+        self.base_url = base_url
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.cache_min_tokens = cache_min_tokens
+        self.records: list[CallRecord] = []
+        self._latencies: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+        self._client: genai.Client | None = None
+        # (model, prefix hash) -> cache name, or "" when the prefix can't be cached
+        self._caches: dict[tuple[str, str], str] = {}
+        self._cache_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="llm")
+
+    @property
+    def client(self) -> genai.Client:
+        with self._lock:
+            if self._client is None:
+                http_options = types.HttpOptions(base_url=self.base_url) if self.base_url else None
+                self._client = genai.Client(http_options=http_options)
+            return self._client
+
+    def tiers(self, model: str) -> list[str]:
+        return [model] + [m for m in self.fallback_models if m != model]
+
+    def generate(
+        self,
+        purpose: str,
+        model: str,
+        contents,
+        *,
+        temperature: float,
+        max_output_tokens: int,
+        system_instruction: str | None = None,
+        media_seconds: float = 0.0,
+    ) -> str:
+        """Generate text, falling back through the tiers until one succeeds.
+
+        Args:
+            purpose: Call site label for deadlines and logging (e.g. "news").
+            model: Primary model; fallback tiers follow it.
+            contents: Prompt text or ``types.Content`` list.
+            temperature: Sampling temperature.
+            max_output_tokens: Output token cap.
+            system_instruction: Stable prefix shared with other calls.
+            media_seconds: Length of video in ``contents``, for the budget
+                estimate (media tokens are not visible in the text).
+
+        Returns:
+            The response text.
+
+        Raises:
+            usage.BudgetExceeded: If a usage budget would be crossed.
+            The last tier's error if every tier fails.
+        """
+        ledger = usage.active()
+        admit = None
+        if ledger is not None and ledger.budgeted:
+            text = [contents] if isinstance(contents, str) else [
+                part.text for content in contents for part in content.parts or () if part.text
+            ]
+            input_tokens = count_tokens("\n".join([*text, system_instruction or ""]), model)
+            input_tokens += int(media_seconds * MEDIA_TOKENS_PER_SECOND)
+            admit = functools.partial(
+                ledger.admit, purpose, input_tokens=input_tokens, max_output_tokens=max_output_tokens,
+            )
+        deadline = self.deadlines.get(purpose, self.deadline)
+        gen_config = types.GenerateContentConfig(
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            http_options=types.HttpOptions(timeout=int(deadline * 1000)),
+        )
+        tiers = self.tiers(model)
+        last_exc: Exception | None = None
+
+        for i, tier in enumerate(tiers):
+            hedge_model = self.hedge_model or (tiers[i + 1] if i + 1 < len(tiers) else None)
+            t0 = time.monotonic()
+            try:
+                # Every tier (and hedge) is admitted, and its worst case held, on its own
+                tier, reserved = admit(tier) if admit else (tier, 0.0)
+                reply, hedged = self._attempt(
+                    purpose, tier, hedge_model if self.hedge else None,
+                    contents, gen_config, system_instruction, deadline, reserved, admit,
+                )
+            except Exception as exc:
+                latency = time.monotonic() - t0
+                self._record(CallRecord(purpose, tier, latency, False, attempts=i + 1, error=repr(exc)))
+                logger.warning(
+                    "LLM %s: %s failed after %.1fs (%s); %s",
+                    purpose, tier, latency, exc,
+                    f"falling back to {tiers[i + 1]}" if i + 1 < len(tiers) else "no tiers left",
+                )
+                last_exc = exc
+                continue
+
+            latency = time.monotonic() - t0
+            self._record(CallRecord(
+                purpose, reply.model, latency, True, hedged=hedged, attempts=i + 1,
+                cache=reply.cache, prompt_tokens=reply.prompt_tokens, cached_tokens=reply.cached_tokens,
+                output_tokens=reply.output_tokens,
+            ))
+            logger.info(
+                "LLM %s: model=%s tier=%d/%d latency=%.2fs hedged=%s cache=%s cached=%d/%d out=%d chars=%d",
+                purpose, reply.model, i + 1, len(tiers), latency, hedged, reply.cache or "-",
+                reply.cached_tokens, reply.prompt_tokens, reply.output_tokens, len(reply.text),
+            )
+            return reply.text
+
+        raise last_exc or RuntimeError("no model tiers configured")
+
+    def _attempt(
+        self,
+        purpose: str,
+        model: str,
+        hedge_model: str | None,
+        contents,
+        gen_config: types.GenerateContentConfig,
+        system_instruction: str | None,
+        deadline: float,
+        reserved: float = 0.0,
+        admit: Callable[[str], tuple[str, float]] | None = None,
+    ) -> tuple[_Reply, bool]:
+        """Run one tier, optionally hedged. Returns (reply, hedged).
+
+        ``reserved`` is the usage budget held for the tier's call; ``admit``
+        admits and reserves for the hedge model.
+        """
+        end = time.monotonic() + deadline
+        pending: list[Future] = [
+            self._pool.submit(self._call, purpose, model, contents, gen_config, system_instruction, reserved),
+        ]
+
+        hedged = False
+        delay = self._hedge_delay(model) if hedge_model else None
+        if delay is not None and delay < deadline:
+            done, _ = wait(pending, timeout=delay)
+            if not done:
+                try:
+                    hedge_model, hedge_reserved = admit(hedge_model) if admit else (hedge_model, 0.0)
+                except usage.BudgetExceeded as exc:
+                    logger.info("LLM %s: not hedging, %s", purpose, exc)
+                else:
+                    logger.info(
+                        "LLM %s: %s still running after %.1fs (p%d), hedging with %s",
+                        purpose, model, delay, round(self.hedge_percentile * 100), hedge_model,
+                    )
+                    pending.append(self._pool.submit(
+                        self._call, purpose, hedge_model, contents, gen_config, system_instruction,
+                        hedge_reserved,
+                    ))
+                    hedged = True
+
+        last_exc: Exception | None = None
+        while pending:
+            remaining = end - time.monotonic()
+            done, _ = wait(pending, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded(f"no answer within {deadline:.0f}s")
+            for fut in done:
+                pending.remove(fut)
+                try:
+                    return fut.result(), hedged
+                except Exception as exc:
+                    last_exc = exc
+        raise last_exc
+
+    def _call(
+        self,
+        purpose: str,
+        model: str,
+        contents,
+        gen_config: types.GenerateContentConfig,
+        system_instruction: str | None,
+        reserved: float = 0.0,
+    ) -> _Reply:
+        """One request. Its usage is recorded (and ``reserved`` released) as
+        soon as it ends, including hedge losers and calls past their deadline."""
+        t0 = time.monotonic()
+        status = ""
+        response = None
+        ok = False
+        try:
+            if system_instruction:
+                name, status = self._cached_prefix(model, system_instruction)
+                update = {"cached_content": name} if name else {"system_instruction": system_instruction}
+                try:
+                    response = self.client.models.generate_content(
+                        model=model, contents=contents, config=gen_config.model_copy(update=update),
+                    )
+                except errors.ClientError as exc:
+                    if not name or exc.code not in _CACHE_GONE:
+                        raise
+                    # Expired or evicted: forget it and send the prefix inline this time
+                    self._drop_cache(model, system_instruction)
+                    status = "inline"
+                    response = self.client.models.generate_content(
+                        model=model, contents=contents,
+                        config=gen_config.model_copy(update={"system_instruction": system_instruction}),
+                    )
+            else:
+                response = self.client.models.generate_content(model=model, contents=contents, config=gen_config)
+
+            text = response.text
+            if not text:
+                raise ValueError(f"{model} returned no text")
+            ok = True
+        finally:
+            latency = time.monotonic() - t0
+            meta = response.usage_metadata if response is not None else None
+            tokens = (
+                (meta and meta.prompt_token_count) or 0,
+                (meta and meta.cached_content_token_count) or 0,
+                (meta and (meta.candidates_token_count or 0) + (meta.thoughts_token_count or 0)) or 0,
+            )
+            ledger = usage.active()
+            if ledger is not None:
+                ledger.record(purpose, model, ok, latency, *tokens, reserved=reserved)
+        with self._lock:
+            self._latencies.setdefault(model, deque(maxlen=_LATENCY_WINDOW)).append(latency)
+        return _Reply(text, model, status, *tokens)
+
+    def _cached_prefix(self, model: str, system_instruction: str) -> tuple[str | None, str]:
+        """Return (cache name or None, cache status) for a shared prefix, registering it once."""
+        # A token is at least one character, so shorter prefixes can never qualify
+        if not self.cache or len(system_instruction) < self.cache_min_tokens:
+            return None, "inline"
+        key = (model, hashlib.sha1(system_instruction.encode()).hexdigest())
+        with self._cache_lock:
+            name = self._caches.get(key)
+            if name is not None:
+                return name or None, "hit" if name else "inline"
+            try:
+                cache = self.client.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=system_instruction,
+                        ttl=f"{self.cache_ttl}s",
+                        display_name=f"digest-{key[1][:12]}",
+                    ),
+                )
+                name = cache.name
+                logger.info(
+                    "LLM cache: registered %s on %s (%d chars, ttl %ds)",
+                    name, model, len(system_instruction), self.cache_ttl,
+                )
+            except Exception as exc:
+                logger.info("LLM cache: prefix not cacheable on %s (%s), sending inline", model, exc)
+                name = ""
+            self._caches[key] = name
+        return name or None, "miss" if name else "inline"
+
+    def _drop_cache(self, model: str, system_instruction: str) -> None:
+        key = (model, hashlib.sha1(system_instruction.encode()).hexdigest())
+        with self._cache_lock:
+            self._caches.pop(key, None)
+
+    def release_caches(self) -> None:
+        """Delete the cached contexts registered during this run."""
+        with self._cache_lock:
+            names = [n for n in self._caches.values() if n]
+            self._caches.clear()
+        for name in names:
+            try:
+                self.client.caches.delete(name=name)
+            except Exception:
+                logger.warning("LLM cache: failed to delete %s", name)
+        if names:
+            logger.info("LLM cache: released %d cached contexts", len(names))
+
+    def _hedge_delay(self, model: str) -> float:
+        """Seconds to wait before hedging: the latency percentile once enough samples exist."""
+        with self._lock:
+            samples = sorted(self._latencies.get(model, ()))
+        if len(samples) < self.hedge_min_samples:
+            return self.hedge_after
+        return samples[min(len(samples) - 1, int(len(samples) * self.hedge_percentile))]
+
+    def _record(self, record: CallRecord) -> None:
+        # Per-request usage goes to the ledger from _call; this is the per-generate view
+        with self._lock:
+            self.records.append(record)
+
+
+@functools.lru_cache(maxsize=1)
+def get_router() -> ModelRouter:
+    """Process-wide router built from the ``llm`` section of config.yaml."""
+    cfg = config.LLM_CONFIG
+    hedge = cfg.get("hedge", {})
+    return ModelRouter(
+        fallback_models=cfg.get("fallback_models", []),
+        deadline=cfg.get("deadline_seconds", 120),
+        deadlines=cfg.get("deadlines", {}),
+        hedge=hedge.get("enabled", False),
+        hedge_model=hedge.get("model") or None,
+        hedge_percentile=hedge.get("percentile", 0.9),
+        hedge_min_samples=hedge.get("min_samples", 10),
+        hedge_after=hedge.get("after_seconds", 30),
+        base_url=cfg.get("base_url", ""),
+        cache=cfg.get("cache", {}).get("enabled", False),
+        cache_ttl=cfg.get("cache", {}).get("ttl_seconds", 900),
+        cache_min_tokens=cfg.get("cache", {}).get("min_tokens", 1024),
+    )
+
+
+def client() -> genai.Client:
+    """Shared client honouring ``llm.base_url``, for non-generation calls."""
+    return get_router().client
+
+
+def generate(
+    purpose: str,
+    model: str,
+    contents,
+    *,
+    temperature: float,
+    max_output_tokens: int,
+    system_instruction: str | None = None,
+    media_seconds: float = 0.0,
+) -> str:
+    """Route one generation call; see ``ModelRouter.generate``."""
+    return get_router().generate(
+        purpose, model, contents,
+        temperature=temperature, max_output_tokens=max_output_tokens,
+        system_instruction=system_instruction, media_seconds=media_seconds,
+    )
+
+
+def _approx_tokens(text: str) -> int:
+    """Cheap local token estimate: 1 per CJK char, ~4 chars per token otherwise."""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+@functools.lru_cache(maxsize=None)
+def _measured_ratio(model: str) -> float:
+    """Ratio of the model's real token count to ``_approx_tokens``, cached per model.
+
+    Costs one ``count_tokens`` call per model per process. Raises if the API
+    is unavailable, so a failure is not cached.
+    """
+    actual = client().models.count_tokens(model=model, contents=_CALIBRATION_SAMPLE).total_tokens
+    ratio = actual / _approx_tokens(_CALIBRATION_SAMPLE)
+    logger.info("Token ratio for %s: %.2f", model, ratio)
+    return ratio
+
+
+def _token_ratio(model: str) -> float:
+    """``_measured_ratio``, or 1.0 while it cannot be measured (retried next call)."""
+    try:
+        return _measured_ratio(model)
+    except Exception:
+        logger.warning("count_tokens failed for %s, using local token estimate", model)
+        return 1.0
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Estimate ``text``'s token count for ``model`` (calibrated local count)."""
+    return int(_approx_tokens(text) * _token_ratio(model)) + 1
+
+
+def release_caches() -> None:
+    """Delete this run's cached contexts, if a router was ever created."""
+    if get_router.cache_info().currsize:
+        get_router().release_caches()
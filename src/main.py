@@ -2,25 +2,56 @@
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import logging
 import os
+import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
 from datetime import datetime, timezone, timedelta
-
-from src import config
-from src.email_sender import render_email, render_video_email, send_email, send_email_to
-from src.fetchers.newsapi_fetcher import fetch_newsapi_articles
-from src.fetchers.rss_fetcher import fetch_rss_feeds
-from src.fetchers.web_scraper import scrape_news_sites
+from functools import partial
+
+from src import config, cpu_pool, llm, profiling, usage
+from src.archive import ArticleArchive
+from src.canonical import RedirectResolver
+from src.checkpoint import RunCheckpoint, stage_key
+from src.digest_state import DigestState
+from src.email_sender import (
+    render_email,
+    render_text,
+    render_video_email,
+    render_video_text,
+    send_email_to,
+)
+from src.enricher import enrich_articles
+from src.fetchers import merge_streams
+from src.fetchers.health import SourceHealth
+from src.fetchers.newsapi_fetcher import iter_newsapi_articles
+from src.fetchers.polling import PollScheduler
+from src.fetchers.rss_fetcher import iter_rss_feeds
+from src.fetchers.web_scraper import iter_news_sites
 from src.fetchers.youtube_fetcher import fetch_channel_videos
-from src.filter import filter_and_rank
-from src.summarizer import summarize_articles
-from src.transcriber import transcribe_video
-from src.video_summarizer import summarize_videos
+from src.filter import rank_profiles
+from src.jobqueue import BUSY, Job, JobQueue, worker_id
+from src.models import FilteredArticle, Video
+from src.ranking import Bm25Index, Bm25Scorer
+from src.summarizer import summarize_articles, summarize_delta
+from src.transcriber import probe_subtitles, transcribe_video_segments
+from src.usage import UsageLedger
+from src.video_registry import VideoRegistry
+from src.video_summarizer import (
+    DEFAULT_CHUNK_CHARS,
+    DEFAULT_CHUNK_OVERLAP_CHARS,
+    DEFAULT_MAX_PARALLEL_CHUNKS,
+    summarize_videos,
+)
 
 _TW_TZ = timezone(timedelta(hours=8))
 
+# How often a worker re-checks a delivery another worker holds
+_DELIVERY_POLL_SECONDS = 5.0
+
 
 def _setup_logging() -> None:
     logging.basicConfig(
@@ -96,7 +127,7 @@ def _should_run_schedule(schedule_times: list) -> bool:
 # News pipeline
 # ---------------------------------------------------------------------------
 
-def _news_pipeline(now: str, logger: logging.Logger) -> None:
+def _news_pipeline(now: str, logger: logging.Logger, ckpt: RunCheckpoint) -> None:
     """Run the news digest pipeline: fetch → filter → summarize → email."""
     if not config.NEWS_ENABLED:
         logger.info("News pipeline disabled, skipping")
@@ -108,46 +139,253 @@ def _news_pipeline(now: str, logger: logging.Logger) -> None:
 
     logger.info("=== News pipeline started ===")
 
-    # Fetch from all sources (in parallel)
-    articles = []
-    fetchers = [
-        ("RSS", lambda: fetch_rss_feeds(config.RSS_FEEDS)),
-        ("Scraper", lambda: scrape_news_sites(config.SCRAPE_TARGETS)),
-        ("NewsAPI", lambda: fetch_newsapi_articles(config.NEWSAPI_CONFIG, config.NEWSAPI_KEY)),
-    ]
-    with ThreadPoolExecutor(max_workers=3) as pool:
-        futures = {pool.submit(fn): name for name, fn in fetchers}
-        for future in as_completed(futures):
-            name = futures[future]
-            try:
-                articles += future.result()
-            except Exception:
-                logger.exception("Fetcher %s failed", name)
-    logger.info("Total fetched: %d articles", len(articles))
+    ranked = ckpt.load("news/ranked")
+    if ranked is None:
+        with profiling.stage("news_fetch_rank"):
+            ranked = _fetch_and_rank(now, logger, ckpt)
+        ckpt.save("news/ranked", ranked)
+
+    for profile in config.PROFILES:
+        try:
+            _send_profile_digest(profile, ranked[profile["name"]], now, logger, ckpt)
+        except Exception:
+            logger.exception("News digest [%s] failed", profile["name"])
+
+    logger.info("=== News pipeline completed ===")
+
+
+def _fetch_and_rank(
+    now: str,
+    logger: logging.Logger,
+    ckpt: RunCheckpoint,
+) -> dict[str, list[FilteredArticle]]:
+    """Fetch all sources and rank them for every profile, enriching the top articles."""
+    pool = config.CPU_POOL_CONFIG
+    if pool.get("enabled", False):
+        cpu_pool.enable(pool.get("workers", 0))
+    try:
+        ranked = _fetch_and_filter(now, logger, ckpt)
+    finally:
+        cpu_pool.shutdown()
+
+    # Optionally fetch full bodies for the top articles of every profile
+    if config.ENRICH_CONFIG.get("enabled", False):
+        top_k = config.ENRICH_CONFIG.get("top_k", 30)
+        unique = {id(fa.article): fa for filtered in ranked.values() for fa in filtered[:top_k]}
+        try:
+            enrich_articles(
+                list(unique.values()),
+                config.DATA_DIR / "bodies",
+                max_workers=config.ENRICH_CONFIG.get("max_workers", 8),
+                per_host=config.ENRICH_CONFIG.get("per_host", 2),
+            )
+        except Exception:
+            logger.exception("Article enrichment failed, using summaries only")
+
+    return ranked
+
+
+def _fetch_and_filter(
+    now: str,
+    logger: logging.Logger,
+    ckpt: RunCheckpoint,
+) -> dict[str, list[FilteredArticle]]:
+    """Stream all sources (or this run's checkpointed fetch) through the ranking."""
+    articles = ckpt.replay("news/fetched")
+    if articles is None:
+        # Fetch from all sources (in parallel), streamed straight into the filter
+        poller = PollScheduler(
+            config.DATA_DIR / "sources.json",
+            enabled=config.POLLING_CONFIG.get("enabled", False),
+            max_staleness_hours=config.POLLING_CONFIG.get("max_staleness_hours", 6),
+            min_probability=config.POLLING_CONFIG.get("min_probability", 0.5),
+        )
+        health = SourceHealth(
+            config.DATA_DIR / "source_health.json",
+            enabled=config.SOURCE_HEALTH_CONFIG.get("enabled", True),
+            failure_threshold=config.SOURCE_HEALTH_CONFIG.get("failure_threshold", 3),
+            cooldown_minutes=config.SOURCE_HEALTH_CONFIG.get("cooldown_minutes", 60),
+            max_cooldown_hours=config.SOURCE_HEALTH_CONFIG.get("max_cooldown_hours", 24),
+        )
+        articles = health.track(poller.track(merge_streams({
+            "RSS": lambda: iter_rss_feeds(config.RSS_FEEDS, poller, health),
+            "Scraper": lambda: iter_news_sites(config.SCRAPE_TARGETS, poller, health),
+            "NewsAPI": lambda: iter_newsapi_articles(config.NEWSAPI_CONFIG, config.NEWSAPI_KEY, health),
+        })))
+        if config.CANONICAL_CONFIG.get("resolve_redirects", True):
+            resolver = RedirectResolver(
+                config.DATA_DIR / "redirects.json",
+                max_workers=config.CANONICAL_CONFIG.get("max_concurrency", 8),
+            )
+            articles = resolver.resolve_stream(articles)
+        articles = ckpt.tee("news/fetched", articles)
+
+    # Filter and rank for every profile in one pass, archiving the stream
+    if config.ARCHIVE_ENABLED:
+        archive = ArticleArchive(config.ARCHIVE_PATH)
+        try:
+            scorer = _make_scorer(archive, logger)
+            with archive.run(now) as run:
+                ranked = rank_profiles(run.tap(articles), config.PROFILES, scorer)
+                for name, filtered in ranked.items():
+                    run.record_digest(name, filtered)
+        finally:
+            archive.close()
+    else:
+        ranked = rank_profiles(articles, config.PROFILES, _make_scorer(None, logger))
+    return ranked
+
 
-    # Filter and rank
-    filtered = filter_and_rank(
-        articles, config.KEYWORDS, config.MIN_SCORE, config.MAX_ARTICLES,
+def _make_scorer(archive: ArticleArchive | None, logger: logging.Logger) -> Bm25Scorer | None:
+    """Build the configured ranking engine; None means keyword weights."""
+    if config.RANKING_ENGINE != "bm25":
+        return None
+
+    index_path = config.DATA_DIR / config.RANKING_CONFIG.get("index_path", "bm25_index.npz")
+    index = Bm25Index.load(
+        index_path,
+        k1=config.RANKING_CONFIG.get("k1", 1.5),
+        b=config.RANKING_CONFIG.get("b", 0.75),
     )
-    logger.info("After filter: %d articles", len(filtered))
+    if archive is not None:
+        index.update_from_archive(archive)
+        index.save(index_path)
+    # Without history (no archive, or first run) fit on this run's articles
+    # in memory; the saved index only ever learns from the archive.
+    fit_batches = archive is None or index.n_docs == 0
+    if fit_batches:
+        logger.info("BM25: no archived statistics, fitting on this run's articles")
+    return Bm25Scorer(
+        index,
+        config.PROFILES,
+        default_min_score=config.RANKING_CONFIG.get("bm25_min_score", 5.0),
+        fit_batches=fit_batches,
+    )
+
+
+def _send_profile_digest(
+    profile: dict,
+    filtered: list[FilteredArticle],
+    now: str,
+    logger: logging.Logger,
+    ckpt: RunCheckpoint,
+    queue: JobQueue | None = None,
+) -> None:
+    """Summarize one profile's ranked articles and email its recipients.
+
+    In delta mode, a run after the day's first digest only sends articles
+    not covered earlier, summarized as a "what changed" update. The summary
+    and rendered email are checkpointed, so a resumed run only retries sending.
+    """
+    name = profile["name"]
+    key = stage_key("news", name)
+    if ckpt.done(f"{key}/sent"):
+        logger.info("News [%s]: already sent in this run, skipping", name)
+        return
+
+    state = None
+    if config.DELTA_CONFIG.get("enabled", False):
+        state = DigestState.load(config.DATA_DIR, now[:10], name)
+
+    draft = ckpt.load(f"{key}/summary")
+    if draft is None:
+        with profiling.stage(f"news_summarize_{name}"), usage.scope("news", name):
+            draft = _summarize_profile(profile, filtered, state, logger)
+        if draft is None:
+            return
+        if draft["summarized"]:
+            ckpt.save(f"{key}/summary", draft)
+    filtered, summary, delta = draft["articles"], draft["summary"], draft["delta"]
+
+    email = ckpt.load(f"{key}/email")
+    if email is None:
+        subject = f"{profile['email']['subject_prefix']} {now[:10]} {'盤中更新' if delta else '每日摘要'}"
+        if name != "default":
+            subject += f"（{name}）"
+        with profiling.stage(f"news_render_{name}"):
+            email = {
+                "subject": subject,
+                "html": render_email(summary, filtered, now),
+                "text": render_text(summary, filtered, now),
+            }
+        # A links-only fallback is not kept, so a resumed run retries Gemini
+        if draft["summarized"]:
+            ckpt.save(f"{key}/email", email)
+
+    _deliver(ckpt, key, email, profile["email"]["recipients"], queue)
+
+    if state is not None and draft["summarized"]:
+        state.record(summary, filtered)
+
+
+def _summarize_profile(
+    profile: dict,
+    filtered: list[FilteredArticle],
+    state: DigestState | None,
+    logger: logging.Logger,
+) -> dict | None:
+    """Run Gemini for one profile. Returns None when delta mode has nothing to send."""
+    name = profile["name"]
+    logger.info("News [%s]: %d articles after filter", name, len(filtered))
+
+    delta = state is not None and state.exists
+    if delta:
+        filtered = state.new_articles(filtered)
+        logger.info("News [%s]: delta mode, %d new since last digest", name, len(filtered))
+        if not filtered and not config.DELTA_CONFIG.get("send_empty", False):
+            logger.info("News [%s]: nothing new, skipping update email", name)
+            return None
 
     # Summarize with Gemini
+    summarized = False
     if filtered:
         try:
-            summary = summarize_articles(filtered)
+            if delta:
+                summary = summarize_delta(
+                    filtered, state.context(), profile["categories"],
+                    context_tokens=config.DELTA_CONFIG.get("context_tokens", 3000),
+                )
+            else:
+                summary = summarize_articles(filtered, profile["categories"])
+            summarized = True
         except Exception:
             logger.exception("Gemini failed, sending digest with links only")
             summary = "⚠️ AI 摘要生成失敗，請查看下方原始新聞連結。"
     else:
         summary = "今日無符合過濾條件的重大新聞。系統持續監控中。"
-        logger.warning("No articles passed filter")
+        logger.warning("News [%s]: no articles passed filter", name)
 
-    # Render and send email
-    html = render_email(summary, filtered, now)
-    subject = f"{config.EMAIL_SUBJECT_PREFIX} {now[:10]} 每日摘要"
-    send_email(html, subject)
+    return {"articles": filtered, "summary": summary, "delta": delta, "summarized": summarized}
 
-    logger.info("=== News pipeline completed ===")
+
+def _deliver(
+    ckpt: RunCheckpoint,
+    key: str,
+    email: dict,
+    recipients: list[str],
+    queue: JobQueue | None,
+) -> None:
+    """Send a rendered email and mark it sent in the run's checkpoints.
+
+    The Message-ID is derived from the run and stage, so a resend of the
+    same digest carries the same ID. In queue mode, delivery is also
+    deduplicated across workers through the queue's idempotency keys.
+    """
+    idempotency_key = f"{ckpt.run_id}/{key}"
+    domain = config.EMAIL_FROM.rpartition("@")[2] or "localhost"
+    message_id = f"<{hashlib.sha1(idempotency_key.encode()).hexdigest()}@{domain}>"
+
+    def send() -> None:
+        send_email_to(email["html"], email["subject"], recipients, email["text"], message_id)
+
+    with profiling.stage(f"send_{key}"):
+        if queue is None:
+            send()
+        else:
+            # Another worker holds the delivery: wait until it is sent or its lease lapses
+            while queue.deliver(idempotency_key, worker_id(), send) == BUSY:
+                time.sleep(_DELIVERY_POLL_SECONDS)
+    ckpt.save(f"{key}/sent", True)
 
 
 # ---------------------------------------------------------------------------
@@ -159,7 +397,7 @@ def _get_show_setting(show: dict, key: str, yt_config: dict, default=None):
     return show.get(key, yt_config.get(key, default))
 
 
-def _youtube_pipeline(now: str, logger: logging.Logger) -> None:
+def _youtube_pipeline(now: str, logger: logging.Logger, ckpt: RunCheckpoint) -> None:
     """Run the YouTube video digest pipeline for each configured show."""
     yt_config = config.YOUTUBE_CONFIG
     if not yt_config.get("enabled", False):
@@ -182,10 +420,25 @@ def _youtube_pipeline(now: str, logger: logging.Logger) -> None:
             continue
 
         try:
-            _process_show(show, show_name, yt_config, global_email, now, logger)
+            _process_show(show, show_name, yt_config, global_email, now, logger, ckpt)
         except Exception:
             logger.exception("YouTube show [%s] failed", show_name)
 
+    shared = _video_registry(ckpt).shared
+    if shared:
+        logger.info("YouTube: %d transcripts/summaries reused from earlier work", shared)
+
+
+_registry: VideoRegistry | None = None
+
+
+def _video_registry(ckpt: RunCheckpoint, queue: JobQueue | None = None) -> VideoRegistry:
+    """Video registry shared by all shows of a run (and, through the queue, all workers)."""
+    global _registry
+    if _registry is None or _registry.run_id != ckpt.run_id:
+        _registry = VideoRegistry(ckpt, queue)
+    return _registry
+
 
 def _process_show(
     show: dict,
@@ -194,6 +447,8 @@ def _process_show(
     global_email: dict,
     now: str,
     logger: logging.Logger,
+    ckpt: RunCheckpoint,
+    queue: JobQueue | None = None,
 ) -> None:
     """Process a single YouTube show: fetch → transcribe → summarize → email."""
     channel_id = show.get("channel_id", "")
@@ -201,10 +456,12 @@ def _process_show(
         logger.warning("YouTube [%s]: no channel_id configured", show_name)
         return
 
-    max_videos = show.get("max_videos", 3)
-    stt_model = _get_show_setting(show, "stt_model", yt_config, "gemini-2.5-flash")
+    key = stage_key("youtube", show_name)
+    if ckpt.done(f"{key}/sent"):
+        logger.info("YouTube [%s]: already sent in this run, skipping", show_name)
+        return
+
     summary_model = _get_show_setting(show, "summary_model", yt_config, "gemini-2.5-flash")
-    summary_prompt = _get_show_setting(show, "summary_prompt", yt_config)
 
     # Resolve email settings (show overrides global)
     show_email = show.get("email", {})
@@ -213,60 +470,275 @@ def _process_show(
 
     logger.info("=== YouTube [%s] started ===", show_name)
 
+    email = ckpt.load(f"{key}/email")
+    if email is None:
+        video_summaries = ckpt.load(f"{key}/summaries")
+        if video_summaries is None:
+            if show.get("low_priority") and not usage.allow_low_priority():
+                logger.warning("YouTube [%s]: low priority and usage budget nearly spent, skipping", show_name)
+                return
+            with usage.scope("youtube", show_name):
+                video_summaries = _summarize_show(
+                    show, show_name, yt_config, channel_id, logger, ckpt, key, queue,
+                )
+            if video_summaries is None:
+                return
+            ckpt.save(f"{key}/summaries", video_summaries)
+
+        # Render email
+        with profiling.stage(f"youtube_render_{show_name}"):
+            email = {
+                "subject": f"{subject_prefix} {now[:10]} {show_name}",
+                "html": render_video_email(video_summaries, show_name, summary_model, now),
+                "text": render_video_text(video_summaries, show_name, now),
+            }
+        ckpt.save(f"{key}/email", email)
+
+    _deliver(ckpt, key, email, recipients, queue)
+
+    logger.info("=== YouTube [%s] completed ===", show_name)
+
+
+def _summarize_show(
+    show: dict,
+    show_name: str,
+    yt_config: dict,
+    channel_id: str,
+    logger: logging.Logger,
+    ckpt: RunCheckpoint,
+    key: str,
+    queue: JobQueue | None = None,
+) -> list[tuple[Video, str]] | None:
+    """Fetch, transcribe and summarize a show's videos; None if there is nothing to send.
+
+    The video list is checkpointed; transcripts and summaries go through the
+    run's :class:`VideoRegistry`, which checkpoints them per video and shares
+    them with other shows (and queue workers) needing the same video.
+    """
+    max_videos = show.get("max_videos", 3)
+    stt_model = _get_show_setting(show, "stt_model", yt_config, "gemini-2.5-flash")
+    summary_model = _get_show_setting(show, "summary_model", yt_config, "gemini-2.5-flash")
+    summary_prompt = _get_show_setting(show, "summary_prompt", yt_config)
+
     # Fetch videos
-    videos = fetch_channel_videos(
-        channel_id, show_name, config.YOUTUBE_API_KEY, max_videos,
-    )
+    videos = ckpt.load(f"{key}/videos")
+    if videos is None:
+        with profiling.stage(f"youtube_fetch_{show_name}"):
+            videos = fetch_channel_videos(
+                channel_id, show_name, config.YOUTUBE_API_KEY, max_videos,
+            )
+        ckpt.save(f"{key}/videos", videos)
     if not videos:
         logger.info("YouTube [%s]: no videos found", show_name)
-        return
+        return None
 
     # Transcribe each video
-    for video in videos:
-        try:
-            video.transcript = transcribe_video(video.video_id, stt_model)
-        except Exception:
-            logger.exception("Failed to transcribe [%s] %s", show_name, video.title)
+    stt_segment_seconds = _get_show_setting(show, "stt_segment_seconds", yt_config, 1200)
+    shared = _video_registry(ckpt, queue)
+    with profiling.stage(f"youtube_transcribe_{show_name}"):
+        # Take the subtitle fast path for every new video before any Gemini transcription
+        subtitles = probe_subtitles(
+            (v.video_id for v in videos if not shared.transcribed(v.video_id)),
+            _get_show_setting(show, "subtitle_probe_workers", yt_config, 8),
+        )
+        for video in videos:
+            # Videos left out of the probe are done or in hand elsewhere; if that failed, look up here
+            probed = {"subtitle": subtitles[video.video_id]} if video.video_id in subtitles else {}
+            try:
+                video.transcript, video.segments = shared.transcript(
+                    video.video_id,
+                    partial(
+                        transcribe_video_segments, video.video_id, stt_model, video.duration,
+                        stt_segment_seconds, **probed,
+                    ),
+                )
+            except Exception:
+                logger.exception("Failed to transcribe [%s] %s", show_name, video.title)
 
     # Filter out videos with no transcript
     videos_with_transcript = [v for v in videos if v.transcript]
     if not videos_with_transcript:
         logger.warning("YouTube [%s]: no videos with transcript", show_name)
-        return
+        return None
 
     # Summarize
-    video_summaries = summarize_videos(
-        videos_with_transcript, summary_model, summary_prompt, show_name,
-    )
+    with profiling.stage(f"youtube_summarize_{show_name}"):
+        return summarize_videos(
+            videos_with_transcript, summary_model, summary_prompt, show_name,
+            chunk_chars=_get_show_setting(show, "chunk_chars", yt_config, DEFAULT_CHUNK_CHARS),
+            chunk_overlap_chars=_get_show_setting(
+                show, "chunk_overlap_chars", yt_config, DEFAULT_CHUNK_OVERLAP_CHARS,
+            ),
+            max_parallel_chunks=_get_show_setting(
+                show, "max_parallel_chunks", yt_config, DEFAULT_MAX_PARALLEL_CHUNKS,
+            ),
+            shared=shared,
+        )
 
-    # Render and send email
-    html = render_video_email(video_summaries, show_name, summary_model, now)
-    subject = f"{subject_prefix} {now[:10]} {show_name}"
-    send_email_to(html, subject, recipients)
 
-    logger.info("=== YouTube [%s] completed ===", show_name)
+# ---------------------------------------------------------------------------
+# Job queue mode
+# ---------------------------------------------------------------------------
+
+def _enqueue_run(now: str, slot: str, logger: logging.Logger, queue: JobQueue) -> int:
+    """Queue this run's work: news ranking, one job per digest and per show."""
+    # Workers share the slot's checkpoints, so never clear them here
+    ckpt = RunCheckpoint.for_slot(config.DATA_DIR, now[:10], slot, resume=True)
+    payload = {"now": now, "slot": slot}
+    max_attempts = config.QUEUE_CONFIG.get("max_attempts", 3)
+    added = 0
+
+    if config.NEWS_ENABLED and _should_run_schedule(config.SCHEDULE_TIMES):
+        rank_key = f"{ckpt.run_id}/news"
+        added += queue.enqueue(rank_key, "news_rank", payload, max_attempts=max_attempts)
+        for profile in config.PROFILES:
+            added += queue.enqueue(
+                f"{ckpt.run_id}/{stage_key('news', profile['name'])}", "news_digest",
+                {**payload, "profile": profile["name"]}, depends_on=rank_key, max_attempts=max_attempts,
+            )
+
+    yt_config = config.YOUTUBE_CONFIG
+    if yt_config.get("enabled", False):
+        for show in yt_config.get("shows", []):
+            show_name = show.get("name", "Unknown")
+            if _should_run_schedule(show.get("schedule_times", [])):
+                added += queue.enqueue(
+                    f"{ckpt.run_id}/{stage_key('youtube', show_name)}", "youtube_show",
+                    {**payload, "show": show_name}, max_attempts=max_attempts,
+                )
+
+    logger.info("Queue: %d jobs added for run %s", added, ckpt.run_id)
+    return added
+
+
+def _run_job(job: Job, logger: logging.Logger, queue: JobQueue) -> None:
+    """Execute one queued job inside a worker."""
+    now = job.payload["now"]
+    ckpt = RunCheckpoint.for_slot(config.DATA_DIR, now[:10], job.payload["slot"], resume=True)
+    _enable_usage(now, ckpt)
+
+    if job.kind == "news_rank":
+        if not ckpt.done("news/ranked"):
+            with profiling.stage("news_fetch_rank"):
+                ranked = _fetch_and_rank(now, logger, ckpt)
+            ckpt.save("news/ranked", ranked)
+    elif job.kind == "news_digest":
+        profile = next(p for p in config.PROFILES if p["name"] == job.payload["profile"])
+        ranked = ckpt.load("news/ranked")
+        _send_profile_digest(profile, ranked[profile["name"]], now, logger, ckpt, queue)
+    elif job.kind == "youtube_show":
+        yt_config = config.YOUTUBE_CONFIG
+        show = next(s for s in yt_config.get("shows", []) if s.get("name", "Unknown") == job.payload["show"])
+        _process_show(
+            show, job.payload["show"], yt_config, yt_config.get("email", {}), now, logger, ckpt, queue,
+        )
+    else:
+        raise ValueError(f"unknown job kind {job.kind!r}")
+
+
+def _enable_usage(now: str, ckpt: RunCheckpoint) -> None:
+    """Account this run's Gemini calls and apply the ``usage`` budgets."""
+    cfg = config.USAGE_CONFIG
+    usage.enable(UsageLedger(
+        config.DATA_DIR, now[:10], ckpt.run_id,
+        run_budget=cfg.get("run_budget_usd", 0.0),
+        day_budget=cfg.get("day_budget_usd", 0.0),
+        prices={m: tuple(p) for m, p in cfg.get("prices", {}).items()},
+        downgrade=cfg.get("downgrade"),
+        downgrade_at=cfg.get("downgrade_at", 0.7),
+        trim_at=cfg.get("trim_at", 0.8),
+        trim_factor=cfg.get("trim_factor", 0.5),
+        skip_low_priority_at=cfg.get("skip_low_priority_at", 0.9),
+    ))
+
+
+def _spawn_workers(n: int, logger: logging.Logger) -> None:
+    """Run ``n`` local worker processes and wait for them."""
+    procs = [
+        subprocess.Popen([sys.executable, "-m", "src.main", "--worker"])
+        for _ in range(n)
+    ]
+    logger.info("Queue: started %d local workers", n)
+    codes = [p.wait() for p in procs]
+    if any(codes):
+        logger.error("Queue: worker exit codes %s", codes)
 
 
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def _run_slot(now: str) -> str:
+    """Checkpoint slot for this run: the scheduled hour, so a resumed run finds it."""
+    hour = _get_scheduled_tw_hour()
+    return f"{hour:02d}00" if hour is not None else f"{now[11:13]}00"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="News and YouTube digest pipeline")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="reuse completed stages of this date and slot's run and retry only what failed",
+    )
+    parser.add_argument("--slot", help="checkpoint slot to use (default: scheduled hour, e.g. 0800)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--enqueue", action="store_true", help="queue this run's jobs and exit")
+    mode.add_argument("--worker", action="store_true", help="run queued jobs until the queue is drained")
+    mode.add_argument("--workers", type=int, metavar="N", help="queue this run's jobs and run N local workers")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="write per-stage cProfile and tracemalloc reports into the run directory",
+    )
+    args = parser.parse_args(argv)
+
     _setup_logging()
     logger = logging.getLogger(__name__)
     now = datetime.now(_TW_TZ).strftime("%Y-%m-%d %H:%M")
+    slot = args.slot or _run_slot(now)
+
+    if args.enqueue or args.worker or args.workers:
+        queue = JobQueue(config.QUEUE_PATH, config.QUEUE_CONFIG.get("lease_seconds", 300))
+        try:
+            if args.worker:
+                if args.profile:
+                    profiling.enable(config.DATA_DIR / "profiles" / stage_key(worker_id()))
+                try:
+                    queue.work(lambda job: _run_job(job, logger, queue))
+                finally:
+                    profiling.disable()
+                llm.release_caches()
+                usage.log_report()
+                return
+            logger.info("=== Enqueueing run %s (slot %s) ===", now, slot)
+            RunCheckpoint.prune(config.DATA_DIR, config.CHECKPOINT_CONFIG.get("keep_days", 7))
+            _enqueue_run(now, slot, logger, queue)
+        finally:
+            queue.close()
+        if args.workers:
+            _spawn_workers(args.workers, logger)
+        return
+
     logger.info("=== Pipeline started at %s ===", now)
 
+    RunCheckpoint.prune(config.DATA_DIR, config.CHECKPOINT_CONFIG.get("keep_days", 7))
+    ckpt = RunCheckpoint.for_slot(config.DATA_DIR, now[:10], slot, resume=args.resume)
+    if args.profile:
+        profiling.enable(ckpt.root / "profile")
+    _enable_usage(now, ckpt)
+
     try:
-        _news_pipeline(now, logger)
+        _news_pipeline(now, logger, ckpt)
     except Exception:
         logger.exception("News pipeline failed")
 
     try:
-        _youtube_pipeline(now, logger)
+        _youtube_pipeline(now, logger, ckpt)
     except Exception:
         logger.exception("YouTube pipeline failed")
 
+    profiling.disable()
+    llm.release_caches()
+    usage.log_report()
     logger.info("=== All pipelines completed ===")
 
 
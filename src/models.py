@@ -1,30 +1,59 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from datetime import datetime
 
+from src.transcript import Transcript
 
-@dataclass
+
+@dataclass(slots=True)
 class Article:
     title: str
     link: str
     source: str
     summary: str = ""
     published: datetime | None = None
+    body: str = ""  # full text, filled by the optional enrichment stage
 
 
-@dataclass
+@dataclass(slots=True)
 class FilteredArticle:
-    title: str
-    link: str
-    source: str
-    summary: str = ""
-    published: datetime | None = None
+    """An Article that passed the filter, plus its score.
+
+    Wraps the original Article instead of copying its fields, so promotion
+    costs one small object per survivor and no string copies.
+    """
+
+    article: Article
     score: float = 0.0
-    matched_keywords: list[str] = field(default_factory=list)
+    matched_keywords: tuple[str, ...] = ()
+
+    @property
+    def title(self) -> str:
+        return self.article.title
+
+    @property
+    def link(self) -> str:
+        return self.article.link
+
+    @property
+    def source(self) -> str:
+        return self.article.source
+
+    @property
+    def summary(self) -> str:
+        return self.article.summary
+
+    @property
+    def published(self) -> datetime | None:
+        return self.article.published
+
+    @property
+    def body(self) -> str:
+        return self.article.body
 
 
-@dataclass
+@dataclass(slots=True)
 class Video:
     title: str
     video_id: str
@@ -32,3 +61,6 @@ class Video:
     url: str
     published: datetime | None = None
     transcript: str = ""
+    duration: float | None = None  # seconds
+    # Timed segments backing ``transcript`` (same text buffer), when known
+    segments: Transcript | None = None
@@ -0,0 +1,189 @@
+"""Opt-in per-stage profiling: cProfile for every thread plus tracemalloc.
+
+Enabled with ``python -m src.main --profile``. Each thread started while
+profiling is active gets its own cProfile profiler (fetchers, LLM and
+enrichment pools all run off the main thread); at stage boundaries every
+profiler is snapshotted and the stage's ``.prof`` holds the difference, so
+work is attributed to the stage during which it returned. tracemalloc
+reports the stage's peak and its top allocation sites.
+
+When profiling is off, :func:`stage` returns a shared no-op context manager.
+
+Inspect results with e.g.:
+    python -m pstats data/runs/<date>/<slot>/profile/01_news_fetch_rank.prof
+"""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import logging
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_NULL = contextlib.nullcontext()
+_UNSAFE_RE = re.compile(r"[^\w.-]+")
+_active: StageProfiler | None = None
+
+
+class _Snapshot:
+    """Adapter so ``pstats.Stats`` accepts a raw stats dict."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def _diff(cur: dict, prev: dict) -> dict:
+    """Subtract one cProfile stats snapshot from a later one of the same profiler."""
+    out = {}
+    for func, (cc, nc, tt, ct, callers) in cur.items():
+        old = prev.get(func)
+        if old is None:
+            out[func] = (cc, nc, tt, ct, dict(callers))
+            continue
+        if nc == old[1]:
+            continue
+        delta_callers = {}
+        for caller, value in callers.items():
+            before = old[4].get(caller)
+            delta = value if before is None else tuple(a - b for a, b in zip(value, before))
+            if delta[0]:
+                delta_callers[caller] = delta
+        out[func] = (cc - old[0], nc - old[1], tt - old[2], ct - old[3], delta_callers)
+    return out
+
+
+class StageProfiler:
+    """Writes ``NN_<stage>.prof`` and ``NN_<stage>.alloc.txt`` per stage into ``out_dir``."""
+
+    def __init__(self, out_dir: Path, top_n: int = 25, frames: int = 1):
+        self.out_dir = Path(out_dir)
+        self.top_n = top_n
+        self.frames = frames
+        self._profilers: list[cProfile.Profile] = []
+        self._previous: dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._count = 0
+        self._summary: list[str] = []
+
+    def start(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tracemalloc.start(self.frames)
+        threading.setprofile(self._thread_bootstrap)
+        main = cProfile.Profile()
+        self._profilers.append(main)
+        main.enable()
+
+    def _thread_bootstrap(self, frame, event, arg) -> None:
+        # First profile event in a new thread: swap in a real profiler for it
+        sys.setprofile(None)
+        prof = cProfile.Profile()
+        with self._lock:
+            self._profilers.append(prof)
+        prof.enable()
+
+    def stop(self) -> None:
+        threading.setprofile(None)
+        with self._lock:
+            profilers, self._profilers = self._profilers, []
+        self._previous.clear()
+        # Worker threads' profilers too: Python 3.12+ can clear every thread's
+        # hook from here; on 3.11 disable() only unhooks the calling thread, so
+        # a pool thread still alive keeps its (now unreferenced) profiler
+        # until it exits.
+        if hasattr(threading, "setprofile_all_threads"):
+            threading.setprofile_all_threads(None)
+        for prof in reversed(profilers):
+            prof.disable()
+        tracemalloc.stop()
+        (self.out_dir / "summary.txt").write_text("\n".join(self._summary) + "\n", encoding="utf-8")
+        logger.info("Profile written to %s", self.out_dir)
+
+    def _snapshot(self) -> dict:
+        """Stats accumulated by all threads since the previous snapshot."""
+        with self._lock:
+            profilers = list(self._profilers)
+        merged: dict = {}
+        for prof in profilers:
+            prof.snapshot_stats()  # reads without disabling the profiler
+            delta = _diff(prof.stats, self._previous.get(id(prof), {}))
+            self._previous[id(prof)] = prof.stats
+            for func, (cc, nc, tt, ct, callers) in delta.items():
+                if func in merged:
+                    mcc, mnc, mtt, mct, mcallers = merged[func]
+                    for caller, value in callers.items():
+                        prior = mcallers.get(caller)
+                        mcallers[caller] = value if prior is None else tuple(a + b for a, b in zip(prior, value))
+                    merged[func] = (mcc + cc, mnc + nc, mtt + tt, mct + ct, mcallers)
+                else:
+                    merged[func] = (cc, nc, tt, ct, dict(callers))
+        return merged
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        self._count += 1
+        base = self.out_dir / f"{self._count:02d}_{_UNSAFE_RE.sub('_', name)}"
+        self._snapshot()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        t0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - t0
+            cpu = time.process_time() - cpu0
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            self._write(base, name, self._snapshot(), before, after, wall, cpu, peak)
+
+    def _write(self, base: Path, name: str, stats: dict, before, after, wall, cpu, peak) -> None:
+        ps = pstats.Stats(_Snapshot(stats))
+        ps.dump_stats(f"{base}.prof")
+
+        diff = after.compare_to(before, "lineno")
+        lines = [f"{name}: peak traced {peak / 2**20:.1f} MiB, net {sum(d.size_diff for d in diff) / 2**20:+.1f} MiB", ""]
+        lines += [str(d) for d in diff[: self.top_n]]
+        Path(f"{base}.alloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        top = sorted(stats.items(), key=lambda kv: kv[1][2], reverse=True)[:10]
+        self._summary.append(
+            f"{base.name}: wall {wall:.2f}s, cpu {cpu:.2f}s, peak {peak / 2**20:.1f} MiB"
+        )
+        self._summary += [
+            f"    {tt:8.3f}s self  {ct:8.3f}s cum  {nc:>8}  {pstats.func_std_string(func)}"
+            for func, (_, nc, tt, ct, _) in top
+        ]
+        logger.info("Profile [%s]: wall %.2fs, cpu %.2fs, peak %.1f MiB", name, wall, cpu, peak / 2**20)
+
+
+def enable(out_dir: Path, top_n: int = 25, frames: int = 1) -> StageProfiler:
+    """Turn on profiling for the rest of the process."""
+    global _active
+    _active = StageProfiler(out_dir, top_n, frames)
+    _active.start()
+    return _active
+
+
+def disable() -> None:
+    global _active
+    if _active is not None:
+        _active.stop()
+        _active = None
+
+
+def stage(name: str):
+    """Context manager profiling one pipeline stage; a no-op unless enabled."""
+    if _active is None:
+        return _NULL
+    return _active.stage(name)
@@ -0,0 +1,217 @@
+"""Local BM25 relevance ranking over article title and summary.
+
+An alternative to substring keyword weights: articles and per-category
+query profiles are tokenized with :mod:`src.cjk` (latin words plus CJK
+bigrams), document frequencies are accumulated incrementally from the
+article archive, and each batch of articles is scored against every query
+with one sparse matrix product.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from src.cjk import tokenize
+from src.models import Article
+
+logger = logging.getLogger(__name__)
+
+_FIT_BATCH = 5000
+
+
+def _doc_tokens(art: Article) -> list[str]:
+    return tokenize(f"{art.title} {art.summary}")
+
+
+class Bm25Index:
+    """Vocabulary and document-frequency statistics, fitted incrementally."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.vocab: dict[str, int] = {}
+        self._df = np.zeros(1024, dtype=np.int64)
+        self.n_docs = 0
+        self.total_len = 0
+        self.last_archive_id = 0
+
+    # -- vocabulary --------------------------------------------------------
+
+    def _ids(self, tokens: Iterable[str], grow: bool) -> list[int]:
+        ids = []
+        vocab = self.vocab
+        for tok in tokens:
+            i = vocab.get(tok)
+            if i is None:
+                if not grow:
+                    continue
+                i = vocab[tok] = len(vocab)
+            ids.append(i)
+        if grow and len(vocab) > len(self._df):
+            self._df = np.concatenate([self._df, np.zeros(len(vocab) * 2 - len(self._df), dtype=np.int64)])
+        return ids
+
+    @property
+    def avgdl(self) -> float:
+        return self.total_len / self.n_docs if self.n_docs else 1.0
+
+    def idf(self) -> np.ndarray:
+        """BM25 idf for every vocabulary id (always positive)."""
+        df = self._df[: len(self.vocab)]
+        return np.log1p((self.n_docs - df + 0.5) / (df + 0.5))
+
+    # -- fitting -----------------------------------------------------------
+
+    def partial_fit(self, docs: Iterable[list[str]]) -> int:
+        """Add tokenized documents to the statistics; returns how many."""
+        count = 0
+        for tokens in docs:
+            ids = np.unique(np.fromiter(self._ids(tokens, grow=True), dtype=np.int64))
+            self._df[ids] += 1
+            self.n_docs += 1
+            self.total_len += len(tokens)
+            count += 1
+        return count
+
+    def update_from_archive(self, archive) -> int:
+        """Fit on archived articles not seen by this index yet."""
+        added = 0
+        while True:
+            rows = archive.articles_after(self.last_archive_id, _FIT_BATCH)
+            if not rows:
+                break
+            added += self.partial_fit(tokenize(f"{r['title']} {r['summary']}") for r in rows)
+            self.last_archive_id = rows[-1]["id"]
+        if added:
+            logger.info("BM25: fitted %d archived articles (%d docs, %d terms)", added, self.n_docs, len(self.vocab))
+        return added
+
+    # -- vectors -----------------------------------------------------------
+
+    def query_vector(self, weighted_terms: dict[str, float]) -> dict[int, float]:
+        """Map query texts (with weights) onto vocabulary ids, adding unseen terms."""
+        vec: dict[int, float] = {}
+        for text, weight in weighted_terms.items():
+            for i in self._ids(tokenize(text), grow=True):
+                vec[i] = max(vec.get(i, 0.0), weight)
+        return vec
+
+    def transform(self, docs: list[list[str]]) -> sparse.csr_matrix:
+        """BM25 term-weight matrix (docs × vocabulary) for tokenized docs."""
+        rows: list[int] = []
+        cols: list[int] = []
+        tfs: list[int] = []
+        lengths = np.empty(len(docs), dtype=np.float64)
+        for r, tokens in enumerate(docs):
+            lengths[r] = len(tokens)
+            for i, tf in Counter(self._ids(tokens, grow=False)).items():
+                rows.append(r)
+                cols.append(i)
+                tfs.append(tf)
+        rows_a = np.asarray(rows, dtype=np.int64)
+        cols_a = np.asarray(cols, dtype=np.int64)
+        tf = np.asarray(tfs, dtype=np.float64)
+        norm = self.k1 * (1 - self.b + self.b * lengths[rows_a] / self.avgdl)
+        data = tf * (self.k1 + 1) / (tf + norm) * self.idf()[cols_a]
+        return sparse.csr_matrix((data, (rows_a, cols_a)), shape=(len(docs), len(self.vocab)))
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "k1": self.k1, "b": self.b, "n_docs": self.n_docs,
+            "total_len": self.total_len, "last_archive_id": self.last_archive_id,
+        }
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez_compressed(
+            tmp,
+            df=self._df[: len(self.vocab)],
+            terms=np.array(json.dumps(list(self.vocab), ensure_ascii=False)),
+            meta=np.array(json.dumps(meta)),
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path, k1: float = 1.5, b: float = 0.75) -> Bm25Index:
+        """Load a saved index, or return an empty one if missing/unreadable."""
+        index = cls(k1, b)
+        try:
+            with np.load(path) as data:
+                terms = json.loads(str(data["terms"]))
+                meta = json.loads(str(data["meta"]))
+                df = data["df"]
+        except (OSError, ValueError, KeyError):
+            return index
+        index.vocab = {t: i for i, t in enumerate(terms)}
+        index._df = np.concatenate([df, np.zeros(max(1024, len(df)), dtype=np.int64)])
+        index.n_docs = meta["n_docs"]
+        index.total_len = meta["total_len"]
+        index.last_archive_id = meta["last_archive_id"]
+        return index
+
+
+def category_queries(categories: list[str], keywords: dict[str, int]) -> list[dict[str, float]]:
+    """One weighted query per category: its own terms plus the profile keywords.
+
+    Category terms weigh 1.0; keywords are scaled by weight relative to the
+    strongest keyword, so heavily weighted keywords still dominate.
+    """
+    top = max((w for w in keywords.values() if w > 0), default=1)
+    shared = {kw: w / top for kw, w in keywords.items() if w > 0}
+    return [{**shared, category: 1.0} for category in categories]
+
+
+class Bm25Scorer:
+    """Scores article batches for several profiles with one sparse product.
+
+    Every profile contributes one query column per category; an article's
+    score for a profile is its best category match.
+    """
+
+    def __init__(
+        self,
+        index: Bm25Index,
+        profiles: list[dict],
+        default_min_score: float,
+        fit_batches: bool = False,
+    ) -> None:
+        self.index = index
+        self.fit_batches = fit_batches
+        self._profiles = profiles
+        self.thresholds = np.array(
+            [profile.get("bm25_min_score", default_min_score) for profile in profiles],
+            dtype=np.float64,
+        )
+        self._queries: list[dict[int, float]] = []
+        self._groups: list[int] = []  # first query column of each profile
+        for profile in profiles:
+            self._groups.append(len(self._queries))
+            categories = profile.get("categories") or [profile["name"]]
+            for query in category_queries(categories, profile["keywords"]):
+                self._queries.append(index.query_vector(query))
+
+    def _query_matrix(self) -> sparse.csc_matrix:
+        rows, cols, data = [], [], []
+        for c, vec in enumerate(self._queries):
+            for i, w in vec.items():
+                rows.append(i)
+                cols.append(c)
+                data.append(w)
+        return sparse.csc_matrix((data, (rows, cols)), shape=(len(self.index.vocab), len(self._queries)))
+
+    def score(self, batch: list[Article]) -> np.ndarray:
+        """Return the articles × profiles score matrix for ``batch``."""
+        docs = [_doc_tokens(art) for art in batch]
+        if self.fit_batches:
+            self.index.partial_fit(docs)
+        per_query = (self.index.transform(docs) @ self._query_matrix()).toarray()
+        return np.maximum.reduceat(per_query, self._groups, axis=1)
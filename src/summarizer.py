@@ -4,38 +4,38 @@ from __future__ import annotations
 
 import logging
 
-from google import genai
-from google.genai import types
-
-from src import config
+from src import config, llm, usage
 from src.models import FilteredArticle
 
 logger = logging.getLogger(__name__)
 
+# Closes the article data; the full instructions travel as the system instruction
+_INSTRUCTION_POINTER = "請依照系統指示的分類與格式要求，根據以上新聞資料產出簡報。"
 
-def _build_prompt(articles: list[FilteredArticle], categories: list[str]) -> str:
-    """Build the full prompt: articles first, instructions at the end."""
+# Every packed article keeps at least this many summary tokens (if it has any)
+_MIN_SUMMARY_TOKENS = 40
 
-    # --- Article data block ---
-    lines = ["--- 新聞資料開始 ---", ""]
-    for i, art in enumerate(articles, 1):
-        lines.append(f"[{i}] 標題: {art.title}")
-        lines.append(f"    來源: {art.source}")
-        if art.summary:
-            lines.append(f"    摘要: {art.summary}")
-        lines.append(f"    連結: {art.link}")
-        lines.append("")
-    lines.append("--- 新聞資料結束 ---")
+
+def _content(art: FilteredArticle) -> str:
+    """Best available text for an article: its full body if fetched."""
+    return art.body if len(art.body) > len(art.summary) else art.summary
+
+
+def _format_article(index: int, art: FilteredArticle, summary: str) -> list[str]:
+    lines = [f"[{index}] 標題: {art.title}", f"    來源: {art.source}"]
+    if summary:
+        lines.append(f"    摘要: {summary}")
+    lines.append(f"    連結: {art.link}")
     lines.append("")
+    return lines
+
 
-    # --- Instructions at the end (where Gemini attention is strongest) ---
+def _instructions(categories: list[str]) -> list[str]:
     cat_list = "\n".join(f"{i}. {c}" for i, c in enumerate(categories, 1))
-    lines.append(
+    return [
         "你是一位資深科技產業分析師。請分析以上新聞資料，"
-        "並產出一份《每日金融與科技決策簡報》。\n"
-    )
-    lines.append(f"請將新聞歸類為以下分類：\n{cat_list}\n")
-    lines.append(
+        "並產出一份《每日金融與科技決策簡報》。\n",
+        f"請將新聞歸類為以下分類：\n{cat_list}\n",
         "針對每個分類：\n"
         "- 提煉 3-5 個核心要點\n"
         "- 指出不同報導之間的矛盾點或潛在趨勢聯動\n"
@@ -46,41 +46,216 @@ def _build_prompt(articles: list[FilteredArticle], categories: list[str]) -> str
         "- 使用繁體中文\n"
         "- 每個分類用 ## 標題開頭\n"
         "- 在分類標題旁標注重要程度 emoji\n"
-        "- 最後附上一段「綜合研判」總結當日整體趨勢\n"
-    )
+        "- 最後附上一段「綜合研判」總結當日整體趨勢\n",
+    ]
 
-    return "\n".join(lines)
 
+def _trim(text: str, tokens: int, full_tokens: int) -> str:
+    """Cut ``text`` to roughly ``tokens`` tokens, proportionally by length."""
+    if tokens >= full_tokens:
+        return text
+    if tokens <= 0:
+        return ""
+    return text[: max(1, len(text) * tokens // full_tokens)].rstrip() + "…"
 
-def summarize_articles(articles: list[FilteredArticle]) -> str:
-    """Send filtered articles to Gemini for summarization.
 
-    Args:
-        articles: Ranked and filtered articles.
+def _pack_articles(
+    articles: list[FilteredArticle],
+    budget: int,
+    model: str,
+) -> list[tuple[FilteredArticle, str]]:
+    """Choose articles and summary lengths that fit ``budget`` tokens.
+
+    Articles are taken in score order. A first pass admits every article
+    whose header plus a minimal summary still fits; a second pass hands the
+    leftover budget back out in score order so the best articles get their
+    full summaries first.
 
     Returns:
-        AI-generated summary text (markdown format).
+        (article, possibly trimmed summary) pairs, in score order.
     """
-    if not articles:
-        return "今日無符合條件的重大新聞。"
+    ranked = sorted(articles, key=lambda a: a.score, reverse=True)
+    chosen: list[tuple[FilteredArticle, int, int]] = []  # (article, allowed, full)
+    used = 0
+    for i, art in enumerate(ranked, 1):
+        head = llm.count_tokens("\n".join(_format_article(i, art, "")), model)
+        content = _content(art)
+        full = llm.count_tokens(content, model) if content else 0
+        minimum = min(full, _MIN_SUMMARY_TOKENS)
+        if used + head + minimum > budget:
+            break
+        used += head + minimum
+        chosen.append((art, minimum, full))
 
-    prompt = _build_prompt(articles, config.CATEGORIES)
-    logger.info("Prompt length: %d chars, %d articles", len(prompt), len(articles))
+    leftover = budget - used
+    packed: list[tuple[FilteredArticle, str]] = []
+    for art, allowed, full in chosen:
+        extra = min(full - allowed, leftover)
+        leftover -= extra
+        packed.append((art, _trim(_content(art), allowed + extra, full)))
+
+    trimmed = sum(1 for art, summary in packed if summary != _content(art))
+    logger.info(
+        "Packed %d/%d articles into %d-token budget (%d summaries trimmed)",
+        len(packed), len(articles), budget, trimmed,
+    )
+    return packed
 
+
+def _delta_instructions(categories: list[str]) -> list[str]:
+    cat_list = "\n".join(f"{i}. {c}" for i, c in enumerate(categories, 1))
+    return [
+        "你是一位資深科技產業分析師。上方「先前簡報」是今天稍早已寄出的摘要，"
+        "新聞資料則是之後才新增的報導。請產出一份《盤中更新》，只說明有什麼改變。\n",
+        f"分類：\n{cat_list}\n",
+        "要求：\n"
+        "- 只寫新資訊：新事件、數據更新、與先前簡報相反或修正的觀點\n"
+        "- 不要重複先前簡報已有的內容；某分類沒有變化就省略該分類\n"
+        "- 在要點中標註相關股票代號（如 2330.TW）\n"
+        "\n"
+        "輸出格式要求：\n"
+        "- 使用繁體中文\n"
+        "- 每個有變化的分類用 ## 標題開頭，並標注重要程度 🔴 / 🟡 / 🟢\n"
+        "- 最後用一段「更新重點」總結相對早上的變化\n",
+    ]
+
+
+def _build_prompt(
+    articles: list[FilteredArticle],
+    categories: list[str],
+    token_budget: int | None = None,
+    model: str | None = None,
+    previous_summary: str | None = None,
+) -> tuple[str, str]:
+    """Build the prompt as (system instruction, article data).
+
+    The instructions only depend on the categories, so they go in the
+    system instruction where the call layer can cache them across profiles
+    and runs; the article data ends with a short pointer back to them.
+
+    With ``token_budget`` set, articles and summaries are packed to keep
+    the whole prompt within that many input tokens of ``model``. With
+    ``previous_summary``, the prompt asks for a delta update against it.
+    """
+    preamble: list[str] = []
+    if previous_summary:
+        preamble = ["--- 先前簡報開始 ---", previous_summary, "--- 先前簡報結束 ---", ""]
+        instructions = _delta_instructions(categories)
+    else:
+        instructions = _instructions(categories)
+
+    if token_budget:
+        model = model or config.GEMINI_MODEL
+        frame = (
+            "\n".join(preamble) + "--- 新聞資料開始 ---\n\n--- 新聞資料結束 ---\n\n"
+            + "\n".join(instructions) + _INSTRUCTION_POINTER
+        )
+        packed = _pack_articles(articles, token_budget - llm.count_tokens(frame, model), model)
+    else:
+        packed = [(art, _content(art)) for art in articles]
+
+    # --- Article data block ---
+    lines = preamble + ["--- 新聞資料開始 ---", ""]
+    for i, (art, summary) in enumerate(packed, 1):
+        lines.extend(_format_article(i, art, summary))
+    lines.append("--- 新聞資料結束 ---")
+    lines.append("")
+
+    # --- Pointer to the instructions at the end (where Gemini attention is strongest) ---
+    lines.append(_INSTRUCTION_POINTER)
+
+    return "\n".join(instructions), "\n".join(lines)
+
+
+def _generate(system_instruction: str, prompt: str) -> str:
     try:
-        client = genai.Client()
-        response = client.models.generate_content(
-            model=config.GEMINI_MODEL,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.3,
-                max_output_tokens=8192,
-            ),
+        summary = llm.generate(
+            "news", config.GEMINI_MODEL, prompt,
+            temperature=0.3, max_output_tokens=8192, system_instruction=system_instruction,
         )
-        summary = response.text
         logger.info("Gemini response: %d chars", len(summary))
         return summary
 
     except Exception:
         logger.exception("Gemini summarization failed")
         raise
+
+
+def summarize_articles(
+    articles: list[FilteredArticle],
+    categories: list[str] | None = None,
+) -> str:
+    """Send filtered articles to Gemini for summarization.
+
+    Args:
+        articles: Ranked and filtered articles.
+        categories: Category list for the briefing (defaults to config).
+
+    Returns:
+        AI-generated summary text (markdown format).
+    """
+    if not articles:
+        return "今日無符合條件的重大新聞。"
+
+    system, prompt = _build_prompt(
+        articles, categories or config.CATEGORIES, usage.prompt_budget(config.PROMPT_TOKEN_BUDGET), config.GEMINI_MODEL,
+    )
+    logger.info(
+        "Prompt length: %d chars, ~%d tokens, %d articles",
+        len(system) + len(prompt), llm.count_tokens(system + prompt, config.GEMINI_MODEL), len(articles),
+    )
+    return _generate(system, prompt)
+
+
+def _fit_context(sent: list[str], tokens: int, model: str) -> str:
+    """Join earlier digests (oldest first) into ``tokens``, newest first.
+
+    The latest updates are what the next one must not repeat, so they are
+    kept whole; the oldest part that does not fit (usually the morning
+    summary) is trimmed and anything older is dropped.
+    """
+    kept: list[str] = []
+    for text in reversed(sent):
+        full = llm.count_tokens(text, model)
+        if full > tokens:
+            text = _trim(text, tokens, full)
+            if text:
+                kept.append(text)
+            break
+        kept.append(text)
+        tokens -= full
+    return "\n\n".join(reversed(kept))
+
+
+def summarize_delta(
+    articles: list[FilteredArticle],
+    sent: list[str],
+    categories: list[str] | None = None,
+    context_tokens: int = 3000,
+) -> str:
+    """Summarize only what changed since an earlier digest.
+
+    Args:
+        articles: Articles that were not in any earlier digest today.
+        sent: Summaries already sent today, oldest first (used as context).
+        categories: Category list for the briefing (defaults to config).
+        context_tokens: Cap on how much of ``sent`` is included; the
+            newest summaries are kept first.
+
+    Returns:
+        AI-generated "what changed" update (markdown format).
+    """
+    if not articles:
+        return "稍早簡報後無新增的重大新聞。"
+
+    model = config.GEMINI_MODEL
+    context = _fit_context(sent, context_tokens, model)
+    system, prompt = _build_prompt(
+        articles, categories or config.CATEGORIES, usage.prompt_budget(config.PROMPT_TOKEN_BUDGET), model,
+        previous_summary=context,
+    )
+    logger.info(
+        "Delta prompt length: %d chars, ~%d tokens, %d new articles",
+        len(system) + len(prompt), llm.count_tokens(system + prompt, model), len(articles),
+    )
+    return _generate(system, prompt)
@@ -2,67 +2,250 @@
 
 from __future__ import annotations
 
+import functools
+import json
 import logging
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from google import genai
 from google.genai import types
+from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled, YouTubeTranscriptApi
+
+from src import config, llm
+from src.transcript import Transcript
 
 logger = logging.getLogger(__name__)
 
+# Long videos are transcribed by Gemini in time slices of this length so a
+# single response never hits max_output_tokens.
+_STT_SEGMENT_SECONDS = 1200
+_STT_MAX_WORKERS = 4
+_PROBE_MAX_WORKERS = 8
+_SUBTITLE_LANGUAGES = ["zh-TW", "zh", "zh-Hant", "en"]
+
+# Video length assumed for the usage budget when the duration is unknown
+_ASSUMED_DURATION_SECONDS = 3600
+
+# Passed as ``subtitle`` when the caller has not probed for subtitles yet
+_UNPROBED = object()
+
+_STT_INSTRUCTION = (
+    "請將這段影片的語音完整轉錄為文字。"
+    "只輸出轉錄文字，不需要加時間戳記或說話者標記。"
+)
+
+
+class _MissingSubtitles:
+    """Videos known to have no captions, persisted across runs.
+
+    Entries expire after ``ttl`` seconds because captions (including
+    YouTube's auto-generated ones) are often added hours after upload.
+    Only definitive answers are recorded; blocked or failed requests are not.
+    """
+
+    def __init__(self, path: Path, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, float] | None = None
+
+    def _read(self) -> dict[str, float]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self) -> dict[str, float]:
+        if self._entries is None:
+            cutoff = time.time() - self.ttl
+            self._entries = {k: t for k, t in self._read().items() if t > cutoff}
+        return self._entries
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            return video_id in self._load()
+
+    def add(self, video_id: str) -> None:
+        with self._lock:
+            self._load()[video_id] = time.time()
+            self._save()
 
-def _get_subtitle(video_id: str) -> str | None:
+    def _save(self) -> None:
+        # Merge with the file so concurrent workers do not drop each other's entries
+        cutoff = time.time() - self.ttl
+        merged = {k: t for k, t in self._read().items() if t > cutoff}
+        merged.update(self._entries)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(merged), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+_missing = _MissingSubtitles(
+    config.DATA_DIR / "subtitles_missing.json",
+    config.YOUTUBE_CONFIG.get("subtitle_miss_ttl_hours", 12) * 3600,
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _api() -> YouTubeTranscriptApi:
+    """Shared transcript API client (keeps its HTTP session between videos)."""
+    return YouTubeTranscriptApi()
+
+
+def _get_subtitle(video_id: str) -> Transcript | None:
     """Try to get subtitles via youtube-transcript-api (free, fast)."""
+    if video_id in _missing:
+        logger.info("No subtitle for %s (cached), will use Gemini URL", video_id)
+        return None
     try:
-        from youtube_transcript_api import YouTubeTranscriptApi
-
-        ytt_api = YouTubeTranscriptApi()
-        transcript = ytt_api.fetch(video_id, languages=["zh-TW", "zh", "zh-Hant", "en"])
-        text = " ".join(snippet.text for snippet in transcript.snippets)
-        logger.info("Subtitle found for %s (%d chars)", video_id, len(text))
-        return text
-    except Exception:
+        fetched = _api().fetch(video_id, languages=_SUBTITLE_LANGUAGES)
+        transcript = Transcript.from_snippets(
+            (snippet.start, snippet.duration, snippet.text) for snippet in fetched.snippets
+        )
+    except (NoTranscriptFound, TranscriptsDisabled):
+        _missing.add(video_id)
         logger.info("No subtitle available for %s, will use Gemini URL", video_id)
         return None
+    except Exception as exc:
+        logger.info("Subtitle lookup failed for %s (%s), will use Gemini URL", video_id, type(exc).__name__)
+        return None
+    if not len(transcript):
+        logger.info("Subtitle for %s is empty, will use Gemini URL", video_id)
+        return None
+    logger.info(
+        "Subtitle found for %s (%d segments, %d chars)",
+        video_id, len(transcript), len(transcript.text),
+    )
+    return transcript
 
 
-def _gemini_youtube_url(video_id: str, stt_model: str) -> str:
+def probe_subtitles(
+    video_ids: Iterable[str],
+    max_workers: int = _PROBE_MAX_WORKERS,
+) -> dict[str, Transcript | None]:
+    """Look up subtitles for several videos concurrently.
+
+    Run this for all of a show's videos before transcribing any of them,
+    so Gemini is only used for the videos that really need it.
+
+    Args:
+        video_ids: YouTube video IDs.
+        max_workers: Concurrent subtitle requests.
+
+    Returns:
+        Mapping of video ID to its subtitles, or None if it has none.
+    """
+    ids = list(dict.fromkeys(video_ids))
+    if not ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ids))) as pool:
+        found = dict(zip(ids, pool.map(_get_subtitle, ids)))
+    logger.info(
+        "Subtitle probe: %d/%d videos have subtitles",
+        sum(t is not None for t in found.values()), len(ids),
+    )
+    return found
+
+
+def _gemini_youtube_url(
+    video_id: str,
+    stt_model: str,
+    start: float | None = None,
+    end: float | None = None,
+    duration: float | None = None,
+) -> str:
     """Transcribe video by passing the YouTube URL directly to Gemini.
 
     Gemini can process YouTube videos natively — no download needed,
     and no bot-detection issues since we never hit YouTube from CI.
+    ``start``/``end`` (seconds) restrict transcription to one time slice;
+    ``duration`` (if known) sizes the usage budget estimate for the whole video.
     """
-    client = genai.Client()
     url = f"https://www.youtube.com/watch?v={video_id}"
 
-    response = client.models.generate_content(
-        model=stt_model,
-        contents=[
-            types.Content(
-                parts=[
-                    types.Part.from_uri(
-                        file_uri=url,
-                        mime_type="video/mp4",
-                    ),
-                    types.Part(
-                        text=(
-                            "請將這段影片的語音完整轉錄為文字。"
-                            "只輸出轉錄文字，不需要加時間戳記或說話者標記。"
-                        ),
-                    ),
-                ]
-            )
-        ],
-        config=types.GenerateContentConfig(
-            temperature=0.0,
-            max_output_tokens=16384,
-        ),
-    )
+    video_part = types.Part.from_uri(file_uri=url, mime_type="video/mp4")
+    if start is not None or end is not None:
+        video_part.video_metadata = types.VideoMetadata(
+            start_offset=f"{int(start or 0)}s",
+            end_offset=f"{int(end)}s" if end is not None else None,
+        )
 
-    text = response.text
-    logger.info("Gemini YouTube URL transcription completed: %d chars", len(text))
+    text = llm.generate(
+        "transcription",
+        stt_model,
+        [types.Content(parts=[video_part])],
+        temperature=0.0,
+        max_output_tokens=16384,
+        system_instruction=_STT_INSTRUCTION,
+        media_seconds=(end if end is not None else duration or _ASSUMED_DURATION_SECONDS) - (start or 0),
+    )
+    logger.info(
+        "Gemini YouTube URL transcription completed for %s [%s-%s]: %d chars",
+        video_id, start, end, len(text),
+    )
     return text
 
 
+def _gemini_segmented(
+    video_id: str,
+    stt_model: str,
+    duration: float,
+    segment_seconds: int,
+) -> Transcript:
+    """Transcribe a long video as concurrent time slices."""
+    starts = list(range(0, int(duration), segment_seconds))
+    logger.info(
+        "Transcribing %s in %d slices of %ds", video_id, len(starts), segment_seconds,
+    )
+    with ThreadPoolExecutor(max_workers=min(_STT_MAX_WORKERS, len(starts))) as pool:
+        texts = list(pool.map(
+            lambda s: _gemini_youtube_url(video_id, stt_model, s, min(s + segment_seconds, duration)),
+            starts,
+        ))
+    return Transcript.from_snippets(
+        (float(s), min(segment_seconds, duration - s), t)
+        for s, t in zip(starts, texts) if t
+    )
+
+
+def transcribe_video_segments(
+    video_id: str,
+    stt_model: str,
+    duration: float | None = None,
+    segment_seconds: int = _STT_SEGMENT_SECONDS,
+    subtitle: Transcript | None | object = _UNPROBED,
+) -> tuple[str, Transcript | None]:
+    """Get a transcript together with its timing.
+
+    Subtitles are tried first. Otherwise Gemini transcribes the URL; videos
+    longer than ``segment_seconds`` (when ``duration`` is known) are split
+    into time slices transcribed in parallel.
+
+    Args:
+        video_id: YouTube video ID.
+        stt_model: Gemini model name for transcription (e.g. "gemini-2.5-flash").
+        duration: Video length in seconds, if known.
+        segment_seconds: Slice length for Gemini transcription.
+        subtitle: Result of :func:`probe_subtitles` for this video, if
+            already probed; otherwise subtitles are looked up here.
+
+    Returns:
+        (transcript text, timed segments or None). The text is the
+        segments' own buffer, not a copy.
+    """
+    segments = _get_subtitle(video_id) if subtitle is _UNPROBED else subtitle
+    if segments is None and duration and duration > segment_seconds * 1.25:
+        segments = _gemini_segmented(video_id, stt_model, duration, segment_seconds)
+    if segments is not None:
+        return segments.text, segments
+
+    return _gemini_youtube_url(video_id, stt_model, duration=duration), None
+
+
 def transcribe_video(video_id: str, stt_model: str) -> str:
     """Get transcript for a video: subtitle first, then Gemini YouTube URL.
 
@@ -73,8 +256,4 @@ def transcribe_video(video_id: str, stt_model: str) -> str:
     Returns:
         Transcript text.
     """
-    subtitle = _get_subtitle(video_id)
-    if subtitle:
-        return subtitle
-
-    return _gemini_youtube_url(video_id, stt_model)
+    return transcribe_video_segments(video_id, stt_model)[0]
@@ -0,0 +1,126 @@
+"""Compact, array-backed transcript with per-segment timing."""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+
+_MAGIC = b"TRS1"
+_HEADER = struct.Struct("<4sI")  # magic, segment count
+
+
+class Transcript:
+    """Caption segments stored as one text buffer plus parallel arrays.
+
+    Segment ``i`` is ``text[offsets[i]:offsets[i + 1] - 1]``; segments are
+    joined by a single space, so ``text`` is exactly the flattened transcript
+    used for prompts. Slicing a time or index range returns one slice of the
+    buffer instead of re-joining snippet strings.
+    """
+
+    __slots__ = ("text", "_offsets", "_starts", "_durations")
+
+    def __init__(self, text: str, offsets: array, starts: array, durations: array) -> None:
+        self.text = text
+        self._offsets = offsets
+        self._starts = starts
+        self._durations = durations
+
+    @classmethod
+    def from_snippets(cls, snippets: Iterable[tuple[float, float, str]]) -> Transcript:
+        """Build from (start_seconds, duration_seconds, text) triples in time order."""
+        parts: list[str] = []
+        offsets = array("I", [0])
+        starts = array("d")
+        durations = array("d")
+        pos = 0
+        for start, duration, text in snippets:
+            text = " ".join(text.split())  # captions may contain line breaks
+            parts.append(text)
+            pos += len(text) + 1
+            offsets.append(pos)
+            starts.append(start)
+            durations.append(duration)
+        return cls(" ".join(parts), offsets, starts, durations)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[tuple[float, float, str]]:
+        for i in range(len(self)):
+            yield self._starts[i], self._durations[i], self.text_range(i, i + 1)
+
+    def __repr__(self) -> str:
+        return f"Transcript({len(self)} segments, {len(self.text)} chars)"
+
+    def start(self, i: int) -> float:
+        return self._starts[i]
+
+    def end(self, i: int) -> float:
+        return self._starts[i] + self._durations[i]
+
+    def char_span(self, i: int, j: int) -> tuple[int, int]:
+        """Character range in ``text`` covering segments ``[i, j)``."""
+        if i >= j:
+            return self._offsets[i], self._offsets[i]
+        return self._offsets[i], self._offsets[j] - 1
+
+    def text_range(self, i: int, j: int) -> str:
+        """Text of segments ``[i, j)``."""
+        a, b = self.char_span(i, j)
+        return self.text[a:b]
+
+    def find(self, t: float) -> int:
+        """Index of the segment playing at ``t`` seconds (clamped to the ends)."""
+        return max(0, bisect_right(self._starts, t) - 1)
+
+    def index_range(self, t0: float, t1: float) -> tuple[int, int]:
+        """Segment index range ``[i, j)`` overlapping the time range ``[t0, t1)``."""
+        i = self.find(t0)
+        if i < len(self) and self.end(i) <= t0:
+            i += 1
+        return i, max(i, bisect_right(self._starts, t1 - 1e-9))
+
+    def between(self, t0: float, t1: float) -> str:
+        """Text spoken between ``t0`` and ``t1`` seconds."""
+        return self.text_range(*self.index_range(t0, t1))
+
+    def to_bytes(self) -> bytes:
+        """Serialize as header + little-endian arrays + UTF-8 text."""
+        offsets = array("I", self._offsets)
+        starts = array("d", self._starts)
+        durations = array("d", self._durations)
+        if sys.byteorder == "big":
+            for a in (offsets, starts, durations):
+                a.byteswap()
+        return b"".join((
+            _HEADER.pack(_MAGIC, len(self)),
+            offsets.tobytes(),
+            starts.tobytes(),
+            durations.tobytes(),
+            self.text.encode("utf-8"),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Transcript:
+        """Inverse of :meth:`to_bytes`."""
+        magic, n = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("not a serialized Transcript")
+        pos = _HEADER.size
+        offsets = array("I")
+        offsets.frombytes(data[pos:pos + 4 * (n + 1)])
+        pos += 4 * (n + 1)
+        starts = array("d")
+        starts.frombytes(data[pos:pos + 8 * n])
+        pos += 8 * n
+        durations = array("d")
+        durations.frombytes(data[pos:pos + 8 * n])
+        pos += 8 * n
+        if sys.byteorder == "big":
+            for a in (offsets, starts, durations):
+                a.byteswap()
+        return cls(data[pos:].decode("utf-8"), offsets, starts, durations)
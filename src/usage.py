@@ -0,0 +1,366 @@
+"""Gemini token and cost accounting with per-run and per-day budgets.
+
+Every routed call (see ``llm.ModelRouter``) is appended to
+``data/usage/<date>.jsonl`` with its input, cached and output tokens,
+latency, model and the stage and show that made it. The file is shared by
+all processes of the day (queue workers included), so spend is always read
+back from it.
+
+With budgets configured, pressure is the larger of run spend / run budget
+and day spend / day budget. As it rises the ledger degrades in steps:
+
+* ``downgrade_at``: calls go to a cheaper model (``downgrade`` map).
+* ``trim_at``: news prompts are packed to ``trim_factor`` of their token budget.
+* ``skip_low_priority_at``: shows marked ``low_priority`` are skipped.
+* A call whose worst-case cost would cross a budget raises
+  :class:`BudgetExceeded` instead of being sent. Admitted calls reserve
+  their worst case until their usage is recorded, so calls in flight
+  together cannot overshoot.
+
+CLI:
+    python -m src.usage [YYYY-MM-DD]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: (input, cached input, output); thinking tokens bill as output
+_DEFAULT_PRICES: dict[str, tuple[float, float, float]] = {
+    "gemini-2.5-pro": (1.25, 0.31, 10.0),
+    "gemini-2.5-flash": (0.30, 0.075, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.025, 0.40),
+    "gemini-2.0-flash": (0.10, 0.025, 0.40),
+}
+_DEFAULT_DOWNGRADE = {
+    "gemini-2.5-pro": "gemini-2.5-flash",
+    "gemini-2.5-flash": "gemini-2.5-flash-lite",
+}
+
+_active: UsageLedger | None = None
+
+
+class BudgetExceeded(RuntimeError):
+    """A call would take the run or the day over its token budget."""
+
+
+@dataclass(slots=True)
+class Usage:
+    ts: float
+    run: str
+    stage: str
+    show: str
+    purpose: str
+    model: str
+    ok: bool
+    latency: float
+    prompt_tokens: int
+    cached_tokens: int
+    output_tokens: int
+    cost: float
+
+
+class UsageLedger:
+    """Append-only usage log for one day plus the budget policy for one run."""
+
+    def __init__(
+        self,
+        data_dir: Path,
+        date: str,
+        run_id: str,
+        run_budget: float = 0.0,
+        day_budget: float = 0.0,
+        prices: dict[str, tuple[float, float, float]] | None = None,
+        downgrade: dict[str, str] | None = None,
+        downgrade_at: float = 0.7,
+        trim_at: float = 0.8,
+        trim_factor: float = 0.5,
+        skip_low_priority_at: float = 0.9,
+    ):
+        self.path = Path(data_dir) / "usage" / f"{date}.jsonl"
+        self.run_id = run_id
+        self.run_budget = run_budget
+        self.day_budget = day_budget
+        self.prices = {**_DEFAULT_PRICES, **(prices or {})}
+        self.downgrade = _DEFAULT_DOWNGRADE if downgrade is None else downgrade
+        self.downgrade_at = downgrade_at
+        self.trim_at = trim_at
+        self.trim_factor = trim_factor
+        self.skip_low_priority_at = skip_low_priority_at
+        self._lock = threading.Lock()
+        self._scope = ("", "")
+        self._offset = 0
+        self._day = 0.0
+        self._run = 0.0
+        self._reserved = 0.0  # worst-case cost of this process's calls still in flight
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    # --- Accounting ---
+
+    def price(self, model: str, prompt_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+        # Unknown models are priced like the most expensive known one
+        p_in, p_cached, p_out = self.prices.get(model) or max(self.prices.values())
+        return (
+            (prompt_tokens - cached_tokens) * p_in + cached_tokens * p_cached + output_tokens * p_out
+        ) / 1e6
+
+    def _refresh(self) -> None:
+        """Fold in lines appended since the last read (by any process)."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        for line in data[:end].splitlines():
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            self._day += row["cost"]
+            if row["run"] == self.run_id:
+                self._run += row["cost"]
+
+    def record(
+        self,
+        purpose: str,
+        model: str,
+        ok: bool,
+        latency: float,
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        output_tokens: int = 0,
+        reserved: float = 0.0,
+    ) -> Usage:
+        """Append one call's usage and release the ``reserved`` amount :meth:`admit` held for it."""
+        with self._lock:
+            stage, show = self._scope
+        usage = Usage(
+            time.time(), self.run_id, stage, show, purpose, model, ok, round(latency, 3),
+            prompt_tokens, cached_tokens, output_tokens,
+            self.price(model, prompt_tokens, cached_tokens, output_tokens),
+        )
+        line = json.dumps(asdict(usage), ensure_ascii=False).encode() + b"\n"
+        # One O_APPEND write per line keeps concurrent writers' lines whole
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        # Released only once the real cost is in the file, so spend never dips
+        self.release(reserved)
+        return usage
+
+    def release(self, reserved: float) -> None:
+        if reserved:
+            with self._lock:
+                self._reserved = max(self._reserved - reserved, 0.0)
+
+    # --- Budget policy ---
+
+    @property
+    def budgeted(self) -> bool:
+        return bool(self.run_budget or self.day_budget)
+
+    def spent(self) -> tuple[float, float]:
+        """(run, day) spend in USD so far."""
+        with self._lock:
+            self._refresh()
+            return self._run, self._day
+
+    def pressure(self) -> float:
+        """Fraction of the tighter budget already spent (0 when unbudgeted)."""
+        run, day = self.spent()
+        return max(
+            run / self.run_budget if self.run_budget else 0.0,
+            day / self.day_budget if self.day_budget else 0.0,
+        )
+
+    def admit(
+        self, purpose: str, model: str, input_tokens: int, max_output_tokens: int,
+    ) -> tuple[str, float]:
+        """Pick the model for a call and reserve its worst case, or refuse it.
+
+        The reservation counts against both budgets until the call's usage
+        is recorded (``record(..., reserved=...)``), so concurrent calls
+        cannot all pass on the same remaining budget.
+
+        Args:
+            purpose: Call site label.
+            model: Requested model.
+            input_tokens: Estimated prompt tokens, media included.
+            max_output_tokens: Output cap, the worst case for output cost.
+
+        Returns:
+            (model to call, possibly a cheaper one than requested; amount reserved).
+
+        Raises:
+            BudgetExceeded: If the call's worst-case cost does not fit.
+        """
+        if not self.budgeted:
+            return model, 0.0
+        pressure = self.pressure()
+        if pressure >= self.downgrade_at and model in self.downgrade:
+            logger.warning(
+                "Usage: %.0f%% of budget spent, downgrading %s from %s to %s",
+                pressure * 100, purpose, model, self.downgrade[model],
+            )
+            model = self.downgrade[model]
+        with self._lock:
+            self._refresh()
+            run, day = self._run + self._reserved, self._day + self._reserved
+            while True:
+                worst = self.price(model, input_tokens, 0, max_output_tokens)
+                over = [
+                    (label, spent, budget)
+                    for label, spent, budget in (("run", run, self.run_budget), ("day", day, self.day_budget))
+                    if budget and spent + worst > budget
+                ]
+                if not over:
+                    self._reserved += worst
+                    return model, worst
+                cheaper = self.downgrade.get(model)
+                if not cheaper or cheaper == model:
+                    label, spent, budget = over[0]
+                    raise BudgetExceeded(
+                        f"{purpose} on {model} could cost ${worst:.3f}; {label} budget "
+                        f"${budget:.2f} has ${max(budget - spent, 0):.3f} left (in-flight calls included)"
+                    )
+                logger.warning("Usage: %s does not fit the budget on %s, trying %s", purpose, model, cheaper)
+                model = cheaper
+
+    def prompt_budget(self, tokens: int) -> int:
+        """Token budget for a packed prompt, trimmed under budget pressure."""
+        if tokens and self.budgeted and self.pressure() >= self.trim_at:
+            trimmed = int(tokens * self.trim_factor)
+            logger.warning("Usage: budget pressure, packing prompt to %d tokens instead of %d", trimmed, tokens)
+            return trimmed
+        return tokens
+
+    def allow_low_priority(self) -> bool:
+        return not self.budgeted or self.pressure() < self.skip_low_priority_at
+
+    @contextlib.contextmanager
+    def scope(self, stage: str, show: str = "") -> Iterator[None]:
+        """Attribute calls made inside the block to ``stage`` / ``show``.
+
+        The scope is process-wide, not per thread: calls run on worker
+        pools, and the pipeline works on one digest or show at a time.
+        """
+        with self._lock:
+            previous, self._scope = self._scope, (stage, show)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._scope = previous
+
+    # --- Reporting ---
+
+    def rows(self, run_only: bool = False) -> list[dict]:
+        try:
+            lines = self.path.read_bytes().splitlines()
+        except FileNotFoundError:
+            return []
+        rows = []
+        for line in lines:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if not run_only or row["run"] == self.run_id:
+                rows.append(row)
+        return rows
+
+    def report(self, run_only: bool = True) -> list[str]:
+        return _report(self.rows(run_only))
+
+
+def _report(rows: list[dict]) -> list[str]:
+    """Token and cost totals grouped by stage, show and model."""
+    groups: dict[tuple[str, str, str], list[float]] = defaultdict(lambda: [0, 0, 0, 0, 0.0, 0.0])
+    for row in rows:
+        g = groups[(row["stage"] or "-", row["show"] or "-", row["model"])]
+        g[0] += 1
+        g[1] += row["prompt_tokens"]
+        g[2] += row["cached_tokens"]
+        g[3] += row["output_tokens"]
+        g[4] += row["latency"]
+        g[5] += row["cost"]
+    lines = []
+    for (stage, show, model), (calls, prompt, cached, output, latency, cost) in sorted(groups.items()):
+        lines.append(
+            f"{stage:<16} {show:<16} {model:<24} calls={calls:<4} in={prompt:<9} cached={cached:<9} "
+            f"out={output:<8} {latency:7.1f}s  ${cost:.4f}"
+        )
+    if rows:
+        lines.append(f"total: {len(rows)} calls, ${sum(r['cost'] for r in rows):.4f}")
+    return lines
+
+
+# --- Process-wide ledger used by llm and the pipeline ---
+
+def enable(ledger: UsageLedger) -> UsageLedger:
+    global _active
+    _active = ledger
+    return ledger
+
+
+def active() -> UsageLedger | None:
+    return _active
+
+
+def scope(stage: str, show: str = ""):
+    """Attribute calls to a stage / show; a no-op unless a ledger is enabled."""
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.scope(stage, show)
+
+
+def prompt_budget(tokens: int) -> int:
+    return tokens if _active is None else _active.prompt_budget(tokens)
+
+
+def allow_low_priority() -> bool:
+    return _active is None or _active.allow_low_priority()
+
+
+def log_report() -> None:
+    if _active is None:
+        return
+    lines = _active.report()
+    run, day = _active.spent()
+    logger.info("Usage: this run $%.4f, today $%.4f", run, day)
+    for line in lines:
+        logger.info("Usage: %s", line)
+
+
+def _cli(argv: list[str] | None = None) -> None:
+    from datetime import date
+
+    from src import config
+
+    parser = argparse.ArgumentParser(prog="python -m src.usage", description=__doc__.split("\n")[0])
+    parser.add_argument("date", nargs="?", default=date.today().isoformat(), help="day to report (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+    ledger = UsageLedger(config.DATA_DIR, args.date, "")
+    lines = ledger.report(run_only=False)
+    print("\n".join(lines) if lines else f"No usage recorded for {args.date}")
+
+
+if __name__ == "__main__":
+    _cli()
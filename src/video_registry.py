@@ -0,0 +1,125 @@
+"""Per-run registry of YouTube videos shared by all shows.
+
+Shows that cross-post the same video, or follow one channel on different
+``schedule_times``, would otherwise transcribe and summarize it once each.
+The registry keys that work by video: the first show to ask computes it,
+callers asking while it is in flight wait for that result, and later shows
+reuse it. Summaries are keyed by video plus everything that shapes them
+(model, prompt, chunking), so shows with their own prompt still get their
+own summary. Failures are not kept; the next ask retries.
+
+Results are stored in the run's checkpoint directory under
+``videos/<video_id>/``, so a resumed run reuses them too. In queue mode the
+work is also leased in the queue database: a worker whose show needs a
+video another worker is already processing waits for that worker's
+checkpoint instead of redoing it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
+
+from src.checkpoint import RunCheckpoint, stage_key
+from src.jobqueue import JobQueue, worker_id
+from src.transcript import Transcript
+
+logger = logging.getLogger(__name__)
+
+# How often a worker waiting on another worker's lease checks for its result
+_POLL_SECONDS = 2.0
+
+
+class VideoRegistry:
+    """Transcripts and summaries computed once per run; thread-safe."""
+
+    def __init__(self, ckpt: RunCheckpoint, queue: JobQueue | None = None) -> None:
+        self.ckpt = ckpt
+        self.queue = queue
+        self.run_id = ckpt.run_id
+        self._lock = threading.Lock()
+        self._futures: dict[str, Future] = {}
+        self.shared = 0  # requests answered from earlier work (another show, worker or attempt)
+
+    def _once(self, key: str, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            fut = self._futures.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._futures[key] = Future()
+            else:
+                self.shared += 1
+        if not owner:
+            return fut.result()
+        try:
+            result = self._stored(key, compute)
+        except BaseException as exc:
+            with self._lock:
+                del self._futures[key]
+            fut.set_exception(exc)
+            raise
+        fut.set_result(result)
+        return result
+
+    def _stored(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Load ``key`` from the checkpoints, or compute it under the queue lease."""
+        owner = worker_id()
+        lease_key = f"{self.run_id}/{key}"
+        waited = False
+        while True:
+            result = self.ckpt.load(key)
+            if result is not None:
+                with self._lock:
+                    self.shared += 1
+                return result
+            state = "claimed" if self.queue is None else self.queue.lease_work(lease_key, owner)
+            if state == "claimed":
+                if self.queue is None:
+                    result = compute()
+                    self.ckpt.save(key, result)
+                else:
+                    # Checkpoint before the lease is marked done, so waiters find it
+                    with self.queue.holding(lease_key, owner):
+                        result = compute()
+                        self.ckpt.save(key, result)
+                return result
+            if state == "done":
+                # Finished but its checkpoint is unreadable: redo it here
+                logger.warning("Video registry: %s done elsewhere but not readable, recomputing", key)
+                result = compute()
+                self.ckpt.save(key, result)
+                return result
+            if not waited:
+                logger.info("Video registry: waiting for another worker to finish %s", key)
+                waited = True
+            time.sleep(_POLL_SECONDS)
+
+    @staticmethod
+    def _transcript_key(video_id: str) -> str:
+        return f"videos/{stage_key(video_id)}/transcript"
+
+    def transcribed(self, video_id: str) -> bool:
+        """Whether the video's transcript is done or in flight (here or in the checkpoints)."""
+        key = self._transcript_key(video_id)
+        with self._lock:
+            if key in self._futures:
+                return True
+        return self.ckpt.done(key)
+
+    def transcript(
+        self,
+        video_id: str,
+        compute: Callable[[], tuple[str, Transcript | None]],
+    ) -> tuple[str, Transcript | None]:
+        """The video's (text, segments), computing it only if no show has yet."""
+        return self._once(self._transcript_key(video_id), compute)
+
+    def summary(self, video_id: str, settings: Hashable, compute: Callable[[], str]) -> str:
+        """The video's summary for ``settings`` (model, prompt, chunking), computed once."""
+        digest = hashlib.sha1(repr(settings).encode()).hexdigest()[:16]
+        return self._once(f"videos/{stage_key(video_id)}/summary-{digest}", compute)
@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-from google import genai
-from google.genai import types
-
+from src import llm
 from src.models import Video
+from src.transcript import Transcript
+from src.video_registry import VideoRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -21,42 +23,261 @@ _DEFAULT_PROMPT = (
     "- 使用 markdown 格式\n"
 )
 
+_PARTIAL_PROMPT = (
+    "使用者提供的是一部長影片逐字稿的其中一段。請條列本段的重點（觀點、數據、"
+    "提及的公司或股票代號），保留關鍵數字，不需要開場白或總結。使用繁體中文。"
+)
+
+# Closes each prompt; the instructions themselves are the (cacheable) system instruction
+_INSTRUCTION_POINTER = "請依照系統指示處理以上內容。"
+
+_TIMESTAMP_HINT = "逐字稿中的 [分:秒] 為時間標記，請在每個重點旁標上其對應時間，格式如 [12:34]。"
+_MERGE_TIMESTAMP_HINT = "筆記中的 [分:秒] 時間標記請保留在對應的重點旁。"
+
+# Spacing of [m:ss] markers inserted into timed transcript chunks
+_MARKER_SECONDS = 120
+
+# Transcripts longer than this are summarized in parallel chunks
+DEFAULT_CHUNK_CHARS = 15000
+DEFAULT_CHUNK_OVERLAP_CHARS = 500
+DEFAULT_MAX_PARALLEL_CHUNKS = 4
+
+
+def _format_ts(seconds: float) -> str:
+    """Format seconds as ``M:SS`` or ``H:MM:SS``."""
+    s = int(seconds)
+    h, rem = divmod(s, 3600)
+    m, sec = divmod(rem, 60)
+    return f"{h}:{m:02d}:{sec:02d}" if h else f"{m}:{sec:02d}"
+
+
+def _timed_text(tr: Transcript, i: int, j: int) -> str:
+    """Text of segments ``[i, j)`` with a [m:ss] marker every couple of minutes."""
+    parts: list[str] = []
+    run_start = i
+    next_marker = tr.start(i)
+    for k in range(i, j):
+        if tr.start(k) >= next_marker:
+            if k > run_start:
+                parts.append(tr.text_range(run_start, k))
+            parts.append(f"[{_format_ts(tr.start(k))}]")
+            run_start = k
+            next_marker = tr.start(k) + _MARKER_SECONDS
+    parts.append(tr.text_range(run_start, j))
+    return " ".join(parts)
+
+
+def _chunk_segments(
+    tr: Transcript,
+    chunk_chars: int,
+    overlap_chars: int,
+) -> list[tuple[float | None, str]]:
+    """Cut a timed transcript into chunks on segment boundaries."""
+    chunks: list[tuple[float | None, str]] = []
+    n = len(tr)
+    i = j = 0
+    while j < n:
+        # Always take at least one new segment, then grow up to chunk_chars
+        j += 1
+        while j < n:
+            a, b = tr.char_span(i, j + 1)
+            if b - a > chunk_chars:
+                break
+            j += 1
+        chunks.append((tr.start(i), _timed_text(tr, i, j)))
+
+        # Step back over trailing segments to overlap with the next chunk
+        k = j
+        carried = 0
+        while k > i + 1 and carried < overlap_chars:
+            a, b = tr.char_span(k - 1, k)
+            if carried + (b - a) > 2 * overlap_chars:
+                break
+            carried += b - a + 1
+            k -= 1
+        i = k
+    return chunks
+
 
-def _build_prompt(video: Video, custom_prompt: str) -> str:
-    """Build summarization prompt for a single video."""
+def _chunk_transcript(
+    video: Video,
+    chunk_chars: int,
+    overlap_chars: int,
+) -> list[tuple[float | None, str]]:
+    """Split a transcript into overlapping chunks of about ``chunk_chars``.
+
+    With timing segments, chunks are cut on segment boundaries, carry the
+    start time of their first segment and embed [m:ss] markers; the last
+    segments of each chunk are repeated at the start of the next to cover
+    ``overlap_chars``. Without timing, the plain text is cut on whitespace
+    where possible.
+
+    Returns:
+        (start_seconds or None, chunk_text) pairs.
+    """
+    if video.segments is not None and len(video.segments):
+        return _chunk_segments(video.segments, chunk_chars, overlap_chars)
+
+    text = video.transcript
+    chunks: list[tuple[float | None, str]] = []
+    pos = 0
+    while pos < len(text):
+        end = min(pos + chunk_chars, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", pos + chunk_chars // 2, end)
+            if cut == -1:
+                cut = text.rfind("\n", pos + chunk_chars // 2, end)
+            end = cut if cut != -1 else end
+        chunks.append((None, text[pos:end]))
+        if end >= len(text):
+            break
+        pos = max(end - overlap_chars, pos + 1)
+    return chunks
+
+
+def _build_prompt(video: Video) -> str:
+    """Build summarization prompt for a single video.
+
+    The show's summary prompt is sent separately as the system instruction.
+    """
+    timed = video.segments is not None and len(video.segments) > 0
     lines = [
         f"影片標題：{video.title}",
         f"頻道：{video.channel}",
         f"連結：{video.url}",
         "",
         "--- 逐字稿開始 ---",
-        video.transcript,
+        _timed_text(video.segments, 0, len(video.segments)) if timed else video.transcript,
         "--- 逐字稿結束 ---",
         "",
-        custom_prompt,
+        _INSTRUCTION_POINTER,
     ]
+    if timed:
+        lines.append(_TIMESTAMP_HINT)
     return "\n".join(lines)
 
 
+def _build_partial_prompt(video: Video, index: int, total: int, start: float | None, text: str) -> str:
+    """Build the prompt for one transcript chunk."""
+    where = f"第 {index}/{total} 段"
+    if start is not None:
+        where += f"（約 {_format_ts(start)} 起）"
+    lines = [
+        f"影片標題：{video.title}",
+        f"頻道：{video.channel}",
+        "",
+        f"--- 逐字稿{where}開始 ---",
+        text,
+        f"--- 逐字稿{where}結束 ---",
+        "",
+        _INSTRUCTION_POINTER,
+    ]
+    if start is not None:
+        lines.append(_TIMESTAMP_HINT)
+    return "\n".join(lines)
+
+
+def _build_merge_prompt(
+    video: Video,
+    partials: list[tuple[float | None, str]],
+) -> str:
+    """Build the final prompt that merges per-chunk notes into one summary."""
+    lines = [
+        f"影片標題：{video.title}",
+        f"頻道：{video.channel}",
+        f"連結：{video.url}",
+        "",
+        "以下是這部影片依時間順序分段整理的重點筆記（相鄰段落有少量重疊，請去除重複）。",
+        "",
+    ]
+    for i, (start, notes) in enumerate(partials, 1):
+        label = f"第 {i} 段" + (f"（{_format_ts(start)} 起）" if start is not None else "")
+        lines += [f"--- {label} ---", notes, ""]
+    lines.append(_INSTRUCTION_POINTER)
+    if any(start is not None for start, _ in partials):
+        lines.append(_MERGE_TIMESTAMP_HINT)
+    return "\n".join(lines)
+
+
+def _generate(model: str, system_instruction: str, prompt: str) -> str:
+    return llm.generate(
+        "video_summary", model, prompt,
+        temperature=0.3, max_output_tokens=16384, system_instruction=system_instruction,
+    )
+
+
+def _summarize_chunked(
+    video: Video,
+    summary_model: str,
+    prompt_template: str,
+    chunks: list[tuple[float | None, str]],
+    max_workers: int,
+) -> str:
+    """Summarize chunks concurrently, then merge the notes in one final call."""
+    total = len(chunks)
+    prompts = [
+        _build_partial_prompt(video, i, total, start, text)
+        for i, (start, text) in enumerate(chunks, 1)
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as pool:
+        notes = list(pool.map(lambda p: _generate(summary_model, _PARTIAL_PROMPT, p), prompts))
+    partials = [(start, n) for (start, _), n in zip(chunks, notes)]
+    return _generate(summary_model, prompt_template, _build_merge_prompt(video, partials))
+
+
+def _summarize_video(
+    video: Video,
+    summary_model: str,
+    prompt_template: str,
+    show_name: str,
+    chunk_chars: int,
+    chunk_overlap_chars: int,
+    max_parallel_chunks: int,
+) -> str:
+    """Summarize one transcript, in parallel chunks when it is long."""
+    chunks = (
+        _chunk_transcript(video, chunk_chars, chunk_overlap_chars)
+        if len(video.transcript) > chunk_chars else []
+    )
+    logger.info(
+        "Summarizing [%s] %s (%d chars transcript, %d chunks)",
+        show_name, video.title, len(video.transcript), max(1, len(chunks)),
+    )
+    if len(chunks) > 1:
+        return _summarize_chunked(video, summary_model, prompt_template, chunks, max_parallel_chunks)
+    return _generate(summary_model, prompt_template, _build_prompt(video))
+
+
 def summarize_videos(
     videos: list[Video],
     summary_model: str,
     summary_prompt: str | None = None,
     show_name: str = "",
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    chunk_overlap_chars: int = DEFAULT_CHUNK_OVERLAP_CHARS,
+    max_parallel_chunks: int = DEFAULT_MAX_PARALLEL_CHUNKS,
+    shared: VideoRegistry | None = None,
 ) -> list[tuple[Video, str]]:
     """Summarize each video's transcript with Gemini.
 
+    Transcripts longer than ``chunk_chars`` are split into overlapping
+    chunks that are summarized concurrently and merged in a final pass.
+
     Args:
         videos: List of Video objects with transcripts filled in.
         summary_model: Gemini model name for summarization.
         summary_prompt: Custom prompt, or None to use default.
         show_name: Show name for logging.
+        chunk_chars: Chunk size in characters for long transcripts.
+        chunk_overlap_chars: Characters repeated between adjacent chunks.
+        max_parallel_chunks: Maximum concurrent chunk summaries per video.
+        shared: Run-wide registry; a video another show (or worker) already
+            summarized with the same model, prompt and chunking reuses that summary.
 
     Returns:
         List of (video, summary_text) tuples.
     """
     prompt_template = summary_prompt or _DEFAULT_PROMPT
-    client = genai.Client()
     results: list[tuple[Video, str]] = []
 
     for video in videos:
@@ -64,23 +285,18 @@ def summarize_videos(
             logger.warning("Skipping %s — no transcript", video.title)
             continue
 
-        prompt = _build_prompt(video, prompt_template)
-        logger.info(
-            "Summarizing [%s] %s (%d chars transcript)",
-            show_name, video.title, len(video.transcript),
+        summarize = partial(
+            _summarize_video, video, summary_model, prompt_template, show_name,
+            chunk_chars, chunk_overlap_chars, max_parallel_chunks,
         )
-
         try:
-            response = client.models.generate_content(
-                model=summary_model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=16384,
-                ),
-            )
-            results.append((video, response.text))
-            logger.info("Summary for %s: %d chars", video.title, len(response.text))
+            if shared is None:
+                text = summarize()
+            else:
+                settings = (summary_model, prompt_template, chunk_chars, chunk_overlap_chars)
+                text = shared.summary(video.video_id, settings, summarize)
+            results.append((video, text))
+            logger.info("Summary for %s: %d chars", video.title, len(text))
         except Exception:
             logger.exception("Failed to summarize %s", video.title)
             results.append((video, "⚠️ 摘要生成失敗"))